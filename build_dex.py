@@ -0,0 +1,23 @@
+"""
+Build the offline dex snapshot used by pokemon_mcp.py in offline modes.
+
+Usage:
+    uv run build_dex.py /path/to/api-data [--output data/dex.sqlite3]
+"""
+
+import argparse
+from modules.snapshot import DEFAULT_SNAPSHOT, build_snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a local Pokémon dex snapshot from PokeAPI-format JSON.")
+    parser.add_argument("source", help="Directory of PokeAPI JSON, e.g. a clone of PokeAPI/api-data")
+    parser.add_argument("--output", default=str(DEFAULT_SNAPSHOT), help="Path of the SQLite snapshot to write")
+    args = parser.parse_args()
+
+    counts = build_snapshot(args.source, args.output)
+    print(f"Wrote {args.output}")
+    for kind, count in counts.items():
+        print(f"- {kind}: {count}")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from langchain_groq import ChatGroq
 from contextlib import asynccontextmanager
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.prebuilt import create_react_agent
+from query_router import answer_query, load_name_index
 import asyncio
 import os
 import logging
@@ -60,13 +61,17 @@ async def main():
         Always use the available tools when you need information about specific Pokémon."""
     )
     
-    yield agent
+    # Names the router may route; without the index every question goes to the agent
+    names = await load_name_index()
+
+    yield agent, {tool.name: tool for tool in tools}, names
 
 async def invoke_agent(query):
-    async with main() as agent:
-        agent_response = await agent.ainvoke({"messages": query})
+    async with main() as (agent, tools_by_name, names):
+        # Routable questions are answered with one LLM call; POKEMON_QUERY_ROUTER=0 always uses the agent
+        answer = await answer_query(query, llm, tools_by_name, agent, names)
         print("==== Final Answer ====")
-        print(agent_response['messages'][-1].content)
+        print(answer)
 
 if __name__ == "__main__":
     # Example queries for different functionalities
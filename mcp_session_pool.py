@@ -0,0 +1,179 @@
+"""
+A pool of persistent, initialized MCP client sessions.
+
+Without a held session, langchain-mcp-adapters opens a new SSE connection
+and runs the MCP initialize handshake for every tool call. The pool keeps
+a few sessions open in background tasks instead, pings them while they
+sit idle, and reconnects with exponential backoff when one drops. Tool
+calls share the open sessions, so no connection setup is left on the
+request path.
+"""
+
+import asyncio
+import os
+import random
+from typing import Any, Dict, List, Optional
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.sessions import Connection, create_session
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp import ClientSession
+from mcp.types import CallToolResult
+
+class _Slot:
+    """One pooled session; its connection lives in the task that holds it."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.session: Optional[ClientSession] = None
+        self.in_flight = 0
+        self.ready = asyncio.Event()
+        self.broken = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+class MCPSessionPool:
+    """Shares a fixed number of long-lived MCP sessions between tool calls.
+
+    An MCP session multiplexes concurrent requests, so calls are not
+    checked out exclusively; each call goes to the open session with the
+    fewest calls in flight.
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        size: int = 4,
+        ping_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+        max_backoff: float = 30.0,
+        acquire_timeout: float = 10.0
+    ):
+        self.connection = connection
+        self.size = max(1, size)
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.max_backoff = max_backoff
+        self.acquire_timeout = acquire_timeout
+        self._slots: List[_Slot] = []
+        self.calls = 0
+        self.connects = 0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls) -> "MCPSessionPool":
+        """Build a pool for POKEMON_MCP_URL, sized and tuned by POKEMON_MCP_POOL_* variables."""
+        return cls(
+            connection={
+                "url": os.getenv("POKEMON_MCP_URL", "http://localhost:8000/sse"),
+                "transport": "sse"
+            },
+            size=int(os.getenv("POKEMON_MCP_POOL_SIZE", "4")),
+            ping_interval=float(os.getenv("POKEMON_MCP_PING_INTERVAL", "30")),
+            max_backoff=float(os.getenv("POKEMON_MCP_MAX_BACKOFF", "30")),
+            acquire_timeout=float(os.getenv("POKEMON_MCP_ACQUIRE_TIMEOUT", "10"))
+        )
+
+    async def start(self) -> None:
+        """Open the sessions in the background and wait until the first one is ready."""
+        if not self._slots:
+            self._slots = [_Slot(i) for i in range(self.size)]
+            for slot in self._slots:
+                slot.task = asyncio.create_task(self._hold(slot))
+        await self._acquire()
+
+    async def close(self) -> None:
+        """Close every session and stop reconnecting."""
+        slots, self._slots = self._slots, []
+        for slot in slots:
+            slot.task.cancel()
+        await asyncio.gather(*(slot.task for slot in slots), return_exceptions=True)
+
+    async def _hold(self, slot: _Slot) -> None:
+        # The transport's cancel scopes must be entered and exited in the same task,
+        # so each session lives for the whole of one iteration of this loop
+        attempt = 0
+        while True:
+            try:
+                async with create_session(self.connection) as session:
+                    await asyncio.wait_for(session.initialize(), self.acquire_timeout)
+                    slot.session = session
+                    slot.ready.set()
+                    self.connects += 1
+                    attempt = 0
+                    await self._watch(slot, session)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Connection refused, handshake timeout or a dropped stream; back off and reconnect
+                self.failures += 1
+            finally:
+                slot.session = None
+                slot.ready.clear()
+                slot.broken.clear()
+            attempt += 1
+            delay = min(self.max_backoff, 0.5 * 2 ** (attempt - 1))
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def _watch(self, slot: _Slot, session: ClientSession) -> None:
+        """Return when the session fails a health check or a call reports it broken."""
+        while True:
+            try:
+                await asyncio.wait_for(slot.broken.wait(), self.ping_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            # Sessions busy with calls have just proven themselves healthy
+            if slot.in_flight == 0:
+                await asyncio.wait_for(session.send_ping(), self.ping_timeout)
+
+    async def _acquire(self) -> _Slot:
+        """The open session with the fewest calls in flight, waiting for one to (re)connect if needed."""
+        if not self._slots:
+            raise RuntimeError("MCP session pool is not started")
+        ready = [slot for slot in self._slots if slot.session is not None]
+        if not ready:
+            waiters = [asyncio.ensure_future(slot.ready.wait()) for slot in self._slots]
+            try:
+                await asyncio.wait(waiters, timeout=self.acquire_timeout, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+            ready = [slot for slot in self._slots if slot.session is not None]
+            if not ready:
+                raise ConnectionError(f"No MCP session available after {self.acquire_timeout:g}s")
+        return min(ready, key=lambda slot: slot.in_flight)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> CallToolResult:
+        """Call a tool on a pooled session, retrying once on another session if the connection fails."""
+        self.calls += 1
+        for retry in (False, True):
+            slot = await self._acquire()
+            session = slot.session
+            slot.in_flight += 1
+            try:
+                return await session.call_tool(name, arguments)
+            except Exception:
+                # Tool errors come back as results, so an exception means the session itself failed
+                if slot.session is session:
+                    slot.broken.set()
+                if retry:
+                    raise
+            finally:
+                slot.in_flight -= 1
+
+    async def get_tools(self) -> List[BaseTool]:
+        """LangChain tools whose calls go through the pool."""
+        slot = await self._acquire()
+        result = await slot.session.list_tools()
+        # The adapter only needs call_tool() from the session it is given
+        return [convert_mcp_tool_to_langchain_tool(self, tool) for tool in result.tools]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': self.size,
+            'connected': sum(slot.session is not None for slot in self._slots),
+            'in_flight': sum(slot.in_flight for slot in self._slots),
+            'calls': self.calls,
+            'connects': self.connects,
+            'failures': self.failures
+        }
@@ -2,10 +2,43 @@ from .info_retrieval import InfoRetrievalModule
 from .comparison import ComparisonModule
 from .strategy import StrategyModule
 from .team_composition import TeamCompositionModule
+from .search import SearchModule
+from .battle import BattleModule
+from .movesets import MovesetModule
+from .records import PokemonRecord
+from .type_chart import TypeChart
+from .dex import DexTable
+from .move_db import MoveDatabase
+from .team_optimizer import TeamConstraints, TeamOptimizer
+from .roles import RoleHeuristics, RoleIndex
+from .cache import LRUCache, SQLiteCache, TieredCache
+from .refresher import RefreshQueue
+from .http_client import get_http_client, close_http_client
+from .executor import ComputeExecutor, get_executor, shutdown_executor
 
 __all__ = [
     'InfoRetrievalModule',
     'ComparisonModule',
     'StrategyModule',
-    'TeamCompositionModule'
+    'TeamCompositionModule',
+    'SearchModule',
+    'BattleModule',
+    'MovesetModule',
+    'PokemonRecord',
+    'TypeChart',
+    'DexTable',
+    'MoveDatabase',
+    'TeamConstraints',
+    'TeamOptimizer',
+    'RoleHeuristics',
+    'RoleIndex',
+    'LRUCache',
+    'SQLiteCache',
+    'TieredCache',
+    'RefreshQueue',
+    'get_http_client',
+    'close_http_client',
+    'ComputeExecutor',
+    'get_executor',
+    'shutdown_executor'
 ] 
\ No newline at end of file
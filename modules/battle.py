@@ -0,0 +1,259 @@
+import asyncio
+import math
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import numpy as np
+from .damage import battle_stats, damage_rolls, move_arrays
+from .executor import ComputeExecutor, JobCancelled
+from .info_retrieval import InfoRetrievalModule
+from .records import STAT_NAMES
+from .strategy import StrategyModule
+
+# Battles still running after this many turns count as draws
+MAX_TURNS = 500
+
+# Battles simulated per worker job; large enough to amortize the vectorized turn loop
+CHUNK_SIZE = 250
+
+_SPEED = STAT_NAMES.index('speed')
+
+ProgressCallback = Callable[[int, int, str], Awaitable[None]]
+
+class BattleSetup:
+    """Everything a worker needs to simulate one team against another, as plain arrays.
+
+    Each member always uses its move with the highest expected damage
+    against the current opponent, and fainted members are replaced by the
+    teammate with the best matchup against the opposing active Pokémon.
+    """
+
+    def __init__(
+        self,
+        hp: List[np.ndarray],
+        speed: List[np.ndarray],
+        damage: List[np.ndarray],
+        accuracy: List[np.ndarray]
+    ):
+        # Index 0 is team A, index 1 team B; damage[s] is (own, opponent, 16 rolls)
+        self.hp = hp
+        self.speed = speed
+        self.damage = damage
+        self.accuracy = accuracy
+        expected = [damage[s].mean(axis=2) * accuracy[s] for s in (0, 1)]
+        # switch_score[s][i, j]: how well member i of side s fares against opposing member j
+        self.switch_score = [
+            expected[s] / hp[1 - s][None, :] - expected[1 - s].T / hp[s][:, None] for s in (0, 1)
+        ]
+
+def simulate_battles(setup: BattleSetup, battles: int, seed: int) -> Dict[str, np.ndarray]:
+    """Simulate many battles at once, one vectorized step per turn; returns summed results."""
+    rng = np.random.default_rng(seed)
+    sizes = [len(setup.hp[0]), len(setup.hp[1])]
+    hp = [np.tile(setup.hp[s], (battles, 1)) for s in (0, 1)]
+    active = [rng.integers(0, sizes[s], battles) for s in (0, 1)]
+    kos = [np.zeros(sizes[s], dtype=np.int64) for s in (0, 1)]
+    dealt = [np.zeros(sizes[s]) for s in (0, 1)]
+    turns = np.zeros(battles, dtype=np.int64)
+    winner = np.full(battles, -1, dtype=np.int64)
+    live = np.arange(battles)
+
+    for turn in range(1, MAX_TURNS + 1):
+        if not len(live):
+            break
+        a, b = active[0][live], active[1][live]
+        rolls = rng.integers(0, 16, (2, len(live)))
+        hits = rng.random((2, len(live)))
+        damage = [
+            setup.damage[0][a, b, rolls[0]] * (hits[0] < setup.accuracy[0][a, b]),
+            setup.damage[1][b, a, rolls[1]] * (hits[1] < setup.accuracy[1][b, a])
+        ]
+        speed_a, speed_b = setup.speed[0][a], setup.speed[1][b]
+        a_first = (speed_a > speed_b) | ((speed_a == speed_b) & (rng.random(len(live)) < 0.5))
+
+        hp_a, hp_b = hp[0][live, a], hp[1][live, b]
+        # The slower side only acts if the faster one did not knock it out
+        b_ko_first = a_first & (damage[0] >= hp_b)
+        a_ko_first = ~a_first & (damage[1] >= hp_a)
+        taken_b = np.where(a_ko_first, 0, np.minimum(damage[0], hp_b))
+        taken_a = np.where(b_ko_first, 0, np.minimum(damage[1], hp_a))
+        hp[1][live, b] = hp_b - taken_b
+        hp[0][live, a] = hp_a - taken_a
+        np.add.at(dealt[0], a, taken_b / setup.hp[1][b])
+        np.add.at(dealt[1], b, taken_a / setup.hp[0][a])
+
+        fainted = [hp[0][live, a] <= 0, hp[1][live, b] <= 0]
+        np.add.at(kos[0], a[fainted[1]], 1)
+        np.add.at(kos[1], b[fainted[0]], 1)
+
+        for side in (0, 1):
+            rows = live[fainted[side]]
+            if not len(rows):
+                continue
+            alive = hp[side][rows] > 0
+            opponent = active[1 - side][rows]
+            score = np.where(alive, setup.switch_score[side][:, opponent].T, -np.inf)
+            active[side][rows] = score.argmax(axis=1)
+            lost = ~alive.any(axis=1)
+            winner[rows[lost]] = 1 - side
+            turns[rows[lost]] = turn
+
+        live = live[winner[live] < 0]
+
+    turns[live] = MAX_TURNS
+    return {
+        'wins': np.array([(winner == 0).sum(), (winner == 1).sum()]),
+        'draws': np.array(int((winner < 0).sum())),
+        'turns': np.array(int(turns.sum())),
+        'kos_a': kos[0],
+        'kos_b': kos[1],
+        'dealt_a': dealt[0],
+        'dealt_b': dealt[1]
+    }
+
+class BattleModule:
+    def __init__(
+        self,
+        info_module: Optional[InfoRetrievalModule] = None,
+        strategy_module: Optional[StrategyModule] = None
+    ):
+        self.info_module = info_module if info_module is not None else InfoRetrievalModule()
+        self.strategy_module = strategy_module if strategy_module is not None else StrategyModule(self.info_module)
+        self.executor: Optional[ComputeExecutor] = None
+
+    def get_executor(self) -> ComputeExecutor:
+        """Return the process pool that runs simulations, one worker per core by default."""
+        if self.executor is None:
+            workers = int(os.getenv("POKEMON_BATTLE_WORKERS", "0")) or os.cpu_count() or 1
+            self.executor = ComputeExecutor(
+                kind='process', max_workers=workers, timeout=float(os.getenv("POKEMON_BATTLE_TIMEOUT", "120"))
+            )
+        return self.executor
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    async def build_setup(self, team_a: List[Any], team_b: List[Any], level: int) -> Optional[BattleSetup]:
+        """Precompute damage of every member against every opponent for both sides."""
+        chart, movesets = await asyncio.gather(
+            self.strategy_module.get_type_chart(),
+            self.strategy_module.get_movesets(list(team_a) + list(team_b))
+        )
+        if chart is None:
+            return None
+        teams = [team_a, team_b]
+        sides = [movesets[:len(team_a)], movesets[len(team_a):]]
+        stats = [battle_stats(np.array([r.stats for r in team], dtype=np.float64), level) for team in teams]
+        types = [np.array([chart.pair_indices(r.types) for r in team]) for team in teams]
+
+        damage, accuracy = [], []
+        for s in (0, 1):
+            width = max(1, max(len(moveset) for moveset in sides[s]))
+            arrays = move_arrays(sides[s], width)
+            rolls = damage_rolls(
+                chart, stats[s], types[s], stats[1 - s], types[1 - s],
+                arrays['power'], arrays['type'], arrays['physical'], level
+            )
+            move_accuracy = np.array([
+                [(move.get('accuracy') or 100) / 100 for move in moveset] + [1.0] * (width - len(moveset))
+                for moveset in sides[s]
+            ])
+            expected = rolls.mean(axis=3) * move_accuracy[:, None, :]
+            best = expected.argmax(axis=2)
+            own, opponent = np.meshgrid(np.arange(len(teams[s])), np.arange(len(teams[1 - s])), indexing='ij')
+            damage.append(rolls[own, opponent, best])
+            accuracy.append(move_accuracy[own, best])
+
+        return BattleSetup(
+            hp=[stats[s][:, 0] for s in (0, 1)],
+            speed=[stats[s][:, _SPEED] for s in (0, 1)],
+            damage=damage,
+            accuracy=accuracy
+        )
+
+    async def simulate_battle(
+        self,
+        team_a: List[str],
+        team_b: List[str],
+        battles: int = 2000,
+        level: int = 50,
+        progress: Optional[ProgressCallback] = None
+    ) -> str:
+        """Estimate the win probability of one team against another with Monte Carlo battles."""
+        if not team_a or not team_b:
+            return "Please provide two teams of at least one Pokémon each."
+        battles = max(1, min(int(battles), 100000))
+        level = max(1, min(int(level), 100))
+
+        records = await self.info_module.make_pokemon_requests(list(team_a) + list(team_b))
+        for name, record in zip(list(team_a) + list(team_b), records):
+            if not record:
+                return self.info_module.not_found_message(name)
+        members = [records[:len(team_a)], records[len(team_a):]]
+
+        setup = await self.build_setup(members[0], members[1], level)
+        if setup is None:
+            return "Type data is currently unavailable. Please try again later."
+
+        executor = self.get_executor()
+        chunks = [min(CHUNK_SIZE, battles - start) for start in range(0, battles, CHUNK_SIZE)]
+        seeds = np.random.SeedSequence().spawn(len(chunks))
+        totals: Dict[str, np.ndarray] = {}
+        done = 0
+        started = time.perf_counter()
+        jobs = [
+            asyncio.ensure_future(executor.run(simulate_battles, setup, size, seed.generate_state(1)[0]))
+            for size, seed in zip(chunks, seeds)
+        ]
+        try:
+            for job in asyncio.as_completed(jobs):
+                result = await job
+                for key, value in result.items():
+                    totals[key] = totals[key] + value if key in totals else value
+                done += int(result['wins'].sum() + result['draws'])
+                if progress is not None:
+                    await progress(done, battles, f"Team A win rate so far: {totals['wins'][0] / done:.1%}")
+        except (asyncio.TimeoutError, JobCancelled):
+            return "The battle simulation timed out. Try fewer battles."
+        finally:
+            for job in jobs:
+                job.cancel()
+        elapsed = time.perf_counter() - started
+
+        wins_a, wins_b = (int(w) for w in totals['wins'])
+        draws = int(totals['draws'])
+        rate = wins_a / battles
+        # 95% normal-approximation interval
+        margin = 1.96 * math.sqrt(rate * (1 - rate) / battles)
+
+        def mvp_lines(side: int) -> List[str]:
+            team = members[side]
+            kos, dealt = totals['kos_a' if side == 0 else 'kos_b'], totals['dealt_a' if side == 0 else 'dealt_b']
+            order = np.lexsort((-dealt, -kos))
+            return [
+                f"- {team[i].display_name}: {kos[i] / battles:.2f} KOs and {dealt[i] / battles:.0%} HP dealt per battle"
+                for i in order[:3]
+            ]
+
+        return f"""
+Battle Simulation: {', '.join(r.display_name for r in members[0])} vs {', '.join(r.display_name for r in members[1])}
+====================================
+
+Results over {battles} battles (level {level}):
+- Team A wins: {wins_a} ({rate:.1%} ± {margin:.1%})
+- Team B wins: {wins_b} ({wins_b / battles:.1%})
+- Draws: {draws}
+- Average length: {int(totals['turns']) / battles:.1f} turns
+
+Team A MVPs:
+{chr(10).join(mvp_lines(0))}
+
+Team B MVPs:
+{chr(10).join(mvp_lines(1))}
+
+Throughput: {battles / elapsed:,.0f} battles/sec on {executor.max_workers} worker process(es)
+
+Note: Each Pokémon always uses its strongest move against the current opponent and switches only when it faints. Abilities, items, status and stat changes are not simulated.
+"""
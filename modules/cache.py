@@ -0,0 +1,355 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from .fastjson import dumps, loads
+
+DEFAULT_CACHE_DB = Path(__file__).resolve().parent.parent / ".cache" / "pokeapi.sqlite3"
+
+class LRUCache:
+    """Bounded in-memory LRU cache whose entries expire after a TTL.
+
+    Expired entries are kept for a further stale_ttl seconds, during which
+    lookup() still returns them, flagged as stale, so callers can serve
+    them while refreshing in the background.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 3600.0, stale_ttl: float = 0.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # key -> (value, stored_at, etag)
+        self._entries: OrderedDict[str, tuple[Any, float, Optional[str]]] = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, count=False) is not None
+
+    def _entry(self, key: str) -> Optional[tuple[Any, bool, Optional[str]]]:
+        """Return (value, fresh, etag) for key, dropping it once past the stale window."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at, etag = entry
+        age = time.monotonic() - stored_at
+        fresh = self.ttl is None or age <= self.ttl
+        if not fresh and age > self.ttl + self.stale_ttl:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value, fresh, etag
+
+    def get(self, key: str, count: bool = True) -> Optional[Any]:
+        """Return the cached value for key, or None if it is missing or expired."""
+        entry = self._entry(key)
+        if entry is None or not entry[1]:
+            if count:
+                self.misses += 1
+            return None
+        if count:
+            self.hits += 1
+        return entry[0]
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Return (value, fresh); expired values within the stale window come back with fresh False."""
+        entry = self._entry(key)
+        if entry is None:
+            self.misses += 1
+            return None, False
+        if entry[1]:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry[0], entry[1]
+
+    def etag(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        return entry[2] if entry is not None else None
+
+    def touch(self, key: str) -> None:
+        """Mark an entry fresh again without changing its value, e.g. after a 304 Not Modified."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries[key] = (entry[0], time.monotonic(), entry[2])
+
+    def set(self, key: str, value: Any, etag: Optional[str] = None) -> None:
+        """Store value under key, evicting the least recently used entries."""
+        self._entries[key] = (value, time.monotonic(), etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+
+class SQLiteCache:
+    """Persistent key/value cache stored in a local SQLite database.
+
+    Like LRUCache, expired rows stay readable through lookup() for stale_ttl seconds.
+    """
+
+    def __init__(self, path: str | os.PathLike, ttl: Optional[float] = 30 * 86400.0, stale_ttl: float = 0.0):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, etag TEXT)"
+        )
+        # Databases created before ETags were stored lack the column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache)")}
+        if 'etag' not in columns:
+            self._conn.execute("ALTER TABLE cache ADD COLUMN etag TEXT")
+        self._conn.commit()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    def _row(self, key: str) -> Optional[tuple[str, bool, Optional[str]]]:
+        """Return (payload, fresh, etag) for key, deleting it once past the stale window."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at, etag FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, stored_at, etag = row
+            age = time.time() - stored_at
+            fresh = self.ttl is None or age <= self.ttl
+            if not fresh and age > self.ttl + self.stale_ttl:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+        return value, fresh, etag
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the decoded JSON value for key, or None if missing or expired."""
+        row = self._row(key)
+        return loads(row[0]) if row is not None and row[1] else None
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], bool, Optional[str]]:
+        """Return (value, fresh, etag); expired values within the stale window come back with fresh False."""
+        row = self._row(key)
+        if row is None:
+            return None, False, None
+        return loads(row[0]), row[1], row[2]
+
+    def etag(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT etag FROM cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def touch(self, key: str) -> None:
+        """Mark a row fresh again without rewriting its value."""
+        with self._lock:
+            self._conn.execute("UPDATE cache SET stored_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def set(self, key: str, value: Any, etag: Optional[str] = None) -> None:
+        """Store a JSON-serializable value under key."""
+        payload = dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at, etag) VALUES (?, ?, ?, ?)",
+                (key, payload, time.time(), etag)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {
+            'size': size,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'expirations': self.expirations
+        }
+
+class TieredCache:
+    """Two-tier cache: an in-memory LRU in front of an optional SQLite store.
+
+    Async callers should use the a-prefixed methods, which answer from memory
+    inline and run SQLite reads and writes in a worker thread, so a slow disk
+    never stalls the event loop.
+    """
+
+    def __init__(self, memory: Optional[LRUCache] = None, disk: Optional[SQLiteCache] = None):
+        self.memory = memory if memory is not None else LRUCache()
+        self.disk = disk
+
+    @classmethod
+    def from_env(cls) -> "TieredCache":
+        """Build a cache from POKEMON_CACHE_* environment variables.
+
+        Setting POKEMON_CACHE_DB to an empty string disables the disk tier.
+        """
+        stale_ttl = float(os.getenv("POKEMON_CACHE_STALE_TTL", str(7 * 86400)))
+        memory = LRUCache(
+            maxsize=int(os.getenv("POKEMON_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("POKEMON_CACHE_TTL", "86400")),
+            stale_ttl=stale_ttl
+        )
+        db_path = os.getenv("POKEMON_CACHE_DB", str(DEFAULT_CACHE_DB))
+        disk = None
+        if db_path:
+            disk = SQLiteCache(
+                db_path, ttl=float(os.getenv("POKEMON_CACHE_DB_TTL", str(30 * 86400))), stale_ttl=stale_ttl
+            )
+        return cls(memory, disk)
+
+    def lookup(self, key: str, decode: Optional[Callable[[Any], Any]] = None) -> Tuple[Optional[Any], bool]:
+        """Look key up in memory, then on disk, returning (value, fresh).
+
+        Fresh disk hits are promoted into memory. A stale value is returned
+        only when neither tier has a fresh one; it is not promoted, so the
+        next lookup still reports it as stale.
+        """
+        value, fresh = self.memory.lookup(key)
+        if fresh or self.disk is None:
+            return value, fresh
+        return self._merge(key, value, self.disk.lookup(key), decode)
+
+    async def alookup(self, key: str, decode: Optional[Callable[[Any], Any]] = None) -> Tuple[Optional[Any], bool]:
+        """lookup() with the disk read run in a worker thread."""
+        value, fresh = self.memory.lookup(key)
+        if fresh or self.disk is None:
+            return value, fresh
+        return self._merge(key, value, await asyncio.to_thread(self.disk.lookup, key), decode)
+
+    def _merge(
+        self,
+        key: str,
+        value: Optional[Any],
+        row: Tuple[Optional[Any], bool, Optional[str]],
+        decode: Optional[Callable[[Any], Any]]
+    ) -> Tuple[Optional[Any], bool]:
+        # Combine a memory miss or stale hit with the disk tier's (value, fresh, etag)
+        disk_value, disk_fresh, etag = row
+        if disk_value is not None:
+            if decode is not None:
+                disk_value = decode(disk_value)
+            if disk_fresh:
+                self.memory.set(key, disk_value, etag)
+                return disk_value, True
+            if value is None:
+                return disk_value, False
+        return value, False
+
+    def get(self, key: str, decode: Optional[Callable[[Any], Any]] = None) -> Optional[Any]:
+        """Return a fresh value for key from either tier, or None."""
+        value, fresh = self.lookup(key, decode)
+        return value if fresh else None
+
+    async def aget(self, key: str, decode: Optional[Callable[[Any], Any]] = None) -> Optional[Any]:
+        value, fresh = await self.alookup(key, decode)
+        return value if fresh else None
+
+    def etag(self, key: str) -> Optional[str]:
+        """The ETag of the upstream response the cached value came from, if known."""
+        etag = self.memory.etag(key)
+        if etag is None and self.disk is not None:
+            etag = self.disk.etag(key)
+        return etag
+
+    async def aetag(self, key: str) -> Optional[str]:
+        etag = self.memory.etag(key)
+        if etag is None and self.disk is not None:
+            etag = await asyncio.to_thread(self.disk.etag, key)
+        return etag
+
+    def touch(self, key: str) -> None:
+        """Mark key fresh again in both tiers, e.g. after upstream answered 304 Not Modified."""
+        self.memory.touch(key)
+        if self.disk is not None:
+            self.disk.touch(key)
+
+    async def atouch(self, key: str) -> None:
+        self.memory.touch(key)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.touch, key)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        encode: Optional[Callable[[Any], Any]] = None,
+        etag: Optional[str] = None
+    ) -> None:
+        """Store value in both tiers; encode converts it to JSON data for disk."""
+        self.memory.set(key, value, etag)
+        if self.disk is not None:
+            self.disk.set(key, encode(value) if encode is not None else value, etag)
+
+    async def aset(
+        self,
+        key: str,
+        value: Any,
+        encode: Optional[Callable[[Any], Any]] = None,
+        etag: Optional[str] = None
+    ) -> None:
+        """set() with the disk write run in a worker thread; the memory tier is updated at once."""
+        self.memory.set(key, value, etag)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, encode(value) if encode is not None else value, etag)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return hit/miss/eviction counters for each tier."""
+        stats = {'memory': self.memory.stats()}
+        if self.disk is not None:
+            stats['disk'] = self.disk.stats()
+        return stats
@@ -1,100 +1,234 @@
-from typing import Any, Optional
+from typing import Any, Optional, List
+import numpy as np
+from .dex import PERCENTILE_COLUMNS, column_name
 from .info_retrieval import InfoRetrievalModule
+from .records import STAT_NAMES
+from .search import SearchModule, parse_filters
+
+STAT_LABELS = {
+    'hp': 'HP',
+    'attack': 'Attack',
+    'defense': 'Defense',
+    'special-attack': 'Sp. Attack',
+    'special-defense': 'Sp. Defense',
+    'speed': 'Speed'
+}
+
+MAX_SIMILAR = 25
+
+def _ordinal(n: int) -> str:
+    suffix = 'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f"{n}{suffix}"
 
 class ComparisonModule:
-    def __init__(self):
-        self.info_module = InfoRetrievalModule()
-    
+    def __init__(
+        self,
+        info_module: Optional[InfoRetrievalModule] = None,
+        search_module: Optional[SearchModule] = None
+    ):
+        self.info_module = info_module if info_module is not None else InfoRetrievalModule()
+        self.search_module = search_module if search_module is not None else SearchModule(self.info_module)
+
     async def compare_pokemon(self, pokemon1: str, pokemon2: str) -> str:
         """Compare attributes of two Pokémon."""
-        data1 = await self.info_module.make_pokemon_request(pokemon1)
-        data2 = await self.info_module.make_pokemon_request(pokemon2)
-        
-        if not data1:
-            return f"Unable to find Pokémon '{pokemon1}'. Please check the spelling and try again."
-        if not data2:
-            return f"Unable to find Pokémon '{pokemon2}'. Please check the spelling and try again."
-        
-        name1 = data1.get('name', 'Unknown').title()
-        name2 = data2.get('name', 'Unknown').title()
-        
-        # Extract stats for comparison
-        stats1 = {stat['stat']['name']: stat['base_stat'] for stat in data1.get('stats', [])}
-        stats2 = {stat['stat']['name']: stat['base_stat'] for stat in data2.get('stats', [])}
-        
-        # Extract moves (limited to first 5)
-        moves1 = [move['move']['name'].title() for move in data1.get('moves', [])[:5]]
-        moves2 = [move['move']['name'].title() for move in data2.get('moves', [])[:5]]
-        
-        # Get held items
-        held_items1 = [item['item']['name'].title() for item in data1.get('held_items', [])]
-        held_items2 = [item['item']['name'].title() for item in data2.get('held_items', [])]
-        
-        # Calculate total stats
-        total_stats1 = sum(stats1.values())
-        total_stats2 = sum(stats2.values())
-        
+        return await self.compare_many([pokemon1, pokemon2])
+
+    async def compare_many(self, names: List[str]) -> str:
+        """Compare the stats and attributes of any number of Pokémon side by side."""
+        if len(names) < 2:
+            return "Please provide at least two Pokémon to compare."
+
+        records = await self.info_module.make_pokemon_requests(names)
+        for name, record in zip(names, records):
+            if not record:
+                return self.info_module.not_found_message(name)
+
+        display_names = [record.display_name for record in records]
+
+        # Pokémon x (six base stats + total) matrix
+        stats = np.array([record.stats for record in records], dtype=np.int64)
+        matrix = np.column_stack([stats, stats.sum(axis=1)])
+        labels = [STAT_LABELS[name] for name in STAT_NAMES] + ['Total']
+
+        # Rank 1 is the highest value; ties share the better rank
+        ranks = (matrix[None, :, :] > matrix[:, None, :]).sum(axis=1) + 1
+        deltas = matrix - matrix.max(axis=0)
+
+        def cell(i: int, j: int) -> str:
+            text = f"{matrix[i, j]} #{ranks[i, j]}"
+            return f"{text} ({deltas[i, j]:+d})" if deltas[i, j] else text
+
+        label_width = max(len(label) for label in labels)
+        widths = [
+            max(len(display_names[i]), *(len(cell(i, j)) for j in range(len(labels))))
+            for i in range(len(records))
+        ]
+        header = ' | '.join([' ' * label_width] + [n.ljust(w) for n, w in zip(display_names, widths)]).rstrip()
+        table = [header, '-' * len(header)]
+        for j, label in enumerate(labels):
+            table.append(' | '.join([label.ljust(label_width)] + [cell(i, j).ljust(w) for i, w in enumerate(widths)]).rstrip())
+
+        leaders = [
+            f"- {label}: {', '.join(display_names[i] for i in np.flatnonzero(ranks[:, j] == 1))} ({matrix[:, j].max()})"
+            for j, label in enumerate(labels)
+        ]
+        overall = [
+            f"{position}. {display_names[i]} ({matrix[i, -1]})"
+            for position, i in enumerate(np.argsort(-matrix[:, -1], kind='stable'), start=1)
+        ]
+
+        def optional(value: Any) -> Any:
+            return value if value is not None else 'Unknown'
+
+        def bullet_list(items: List[str], empty: str) -> str:
+            return chr(10).join([f"- {item.title()}" for item in items]) if items else empty
+
         comparison = f"""
-Detailed Comparison: {name1} vs {name2}
+Detailed Comparison: {' vs '.join(display_names)}
 ====================================
 
+Base Stats Comparison (value, rank, difference from best):
+--------------------
+{chr(10).join(table)}
+
+Stat Leaders:
+------------
+{chr(10).join(leaders)}
+
+Overall Ranking by Total:
+------------------------
+{chr(10).join(overall)}
+
 Basic Information:
 -----------------
-{name1}: Height {data1.get('height', 0) / 10}m, Weight {data1.get('weight', 0) / 10}kg
-{name2}: Height {data2.get('height', 0) / 10}m, Weight {data2.get('weight', 0) / 10}kg
+{chr(10).join(f"{name}: Height {r.height / 10}m, Weight {r.weight / 10}kg" for name, r in zip(display_names, records))}
 
 Types:
 ------
-{name1}: {', '.join([t['type']['name'].title() for t in data1.get('types', [])])}
-{name2}: {', '.join([t['type']['name'].title() for t in data2.get('types', [])])}
+{chr(10).join(f"{name}: {', '.join([t.title() for t in r.types])}" for name, r in zip(display_names, records))}
 
 Abilities:
 ----------
-{name1}:
-{chr(10).join([f"- {a['ability']['name'].title()}" for a in data1.get('abilities', [])])}
-{name2}:
-{chr(10).join([f"- {a['ability']['name'].title()}" for a in data2.get('abilities', [])])}
-
-Base Stats Comparison:
---------------------
-HP: {name1} {stats1.get('hp', 0)} vs {name2} {stats2.get('hp', 0)}
-Attack: {name1} {stats1.get('attack', 0)} vs {name2} {stats2.get('attack', 0)}
-Defense: {name1} {stats1.get('defense', 0)} vs {name2} {stats2.get('defense', 0)}
-Sp. Attack: {name1} {stats1.get('special-attack', 0)} vs {name2} {stats2.get('special-attack', 0)}
-Sp. Defense: {name1} {stats1.get('special-defense', 0)} vs {name2} {stats2.get('special-defense', 0)}
-Speed: {name1} {stats1.get('speed', 0)} vs {name2} {stats2.get('speed', 0)}
-Total: {name1} {total_stats1} vs {name2} {total_stats2}
+{chr(10).join(f"{name}:{chr(10)}{bullet_list(list(r.abilities), 'Unknown')}" for name, r in zip(display_names, records))}
 
 Sample Moves:
 ------------
-{name1}:
-{chr(10).join([f"- {move}" for move in moves1]) if moves1 else 'No moves available'}
-{name2}:
-{chr(10).join([f"- {move}" for move in moves2]) if moves2 else 'No moves available'}
+{chr(10).join(f"{name}:{chr(10)}{bullet_list(list(r.moves[:5]), 'No moves available')}" for name, r in zip(display_names, records))}
 
 Held Items:
 ----------
-{name1}:
-{chr(10).join([f"- {item}" for item in held_items1]) if held_items1 else 'No held items'}
-{name2}:
-{chr(10).join([f"- {item}" for item in held_items2]) if held_items2 else 'No held items'}
+{chr(10).join(f"{name}:{chr(10)}{bullet_list(list(r.held_items), 'No held items')}" for name, r in zip(display_names, records))}
 
 Additional Information:
 ---------------------
-{name1}:
-- Order: #{data1.get('order', 'Unknown')}
-- Base Experience: {data1.get('base_experience', 'Unknown')}
-- Base Happiness: {data1.get('base_happiness', 'Unknown')}
-- Capture Rate: {data1.get('capture_rate', 'Unknown')}
-- Is Legendary: {'Yes' if data1.get('is_legendary', False) else 'No'}
-- Is Mythical: {'Yes' if data1.get('is_mythical', False) else 'No'}
-
-{name2}:
-- Order: #{data2.get('order', 'Unknown')}
-- Base Experience: {data2.get('base_experience', 'Unknown')}
-- Base Happiness: {data2.get('base_happiness', 'Unknown')}
-- Capture Rate: {data2.get('capture_rate', 'Unknown')}
-- Is Legendary: {'Yes' if data2.get('is_legendary', False) else 'No'}
-- Is Mythical: {'Yes' if data2.get('is_mythical', False) else 'No'}
+{(chr(10) * 2).join(f'''{name}:
+- Order: #{optional(r.order)}
+- Base Experience: {optional(r.base_experience)}
+- Base Happiness: {optional(r.base_happiness)}
+- Capture Rate: {optional(r.capture_rate)}
+- Is Legendary: {'Yes' if r.is_legendary else 'No'}
+- Is Mythical: {'Yes' if r.is_mythical else 'No'}
+- Evolution Chain: {' → '.join(stage.title() for stage in r.evolution_chain) if r.evolution_chain else 'Unknown'}''' for name, r in zip(display_names, records))}
+"""
+        return comparison
+
+    async def similar_pokemon(
+        self,
+        pokemon_name: str,
+        limit: int = 5,
+        better_stat: Optional[str] = None,
+        filters: str = ""
+    ) -> str:
+        """Find the Pokémon whose base stat spread is closest to a given Pokémon."""
+        pokemon_data = await self.info_module.make_pokemon_request(pokemon_name)
+        if not pokemon_data:
+            return self.info_module.not_found_message(pokemon_name)
+        
+        table = await self.search_module.get_table()
+        if table is None:
+            return "Similarity search needs the offline dex snapshot. Build it with build_dex.py and set POKEMON_SNAPSHOT."
+        
+        try:
+            predicates = parse_filters(filters or "")
+            stat = column_name(better_stat) if better_stat else None
+            if better_stat and stat not in STAT_NAMES + ('total',):
+                raise ValueError(f"Unknown stat '{better_stat}'. Use one of: {', '.join(STAT_NAMES + ('total',))}")
+            mask = None
+            if predicates or stat:
+                mask = np.ones(len(table), dtype=bool)
+                for _, predicate in predicates:
+                    mask &= predicate(table)
+                if stat:
+                    reference = pokemon_data.total_stats if stat == 'total' else pokemon_data.stat(stat)
+                    mask &= table.columns[stat] > reference
+        except ValueError as e:
+            return str(e)
+        
+        limit = max(1, min(int(limit), MAX_SIMILAR))
+        rows, distances = table.nearest(
+            pokemon_data.stats, limit, mask=mask, exclude=table.rows.get(pokemon_data.name)
+        )
+        if not len(rows):
+            return f"No Pokémon similar to {pokemon_data.display_name} match those conditions."
+        
+        labels = [STAT_LABELS[name] for name in STAT_NAMES]
+        
+        def spread(stats) -> str:
+            return ' / '.join(f"{label} {value}" for label, value in zip(labels, stats))
+        
+        def deltas(stats) -> str:
+            return ', '.join(
+                f"{label} {value}" + (f" ({value - base:+d})" if value != base else '')
+                for label, value, base in zip(labels, stats, pokemon_data.stats)
+            )
+        
+        conditions = [description for description, _ in predicates]
+        if stat:
+            conditions.append(f"higher {STAT_LABELS.get(stat, 'Total')} than {pokemon_data.display_name}")
+        results = [
+            f"{position}. {table.records[row].display_name} ({'/'.join(t.title() for t in table.records[row].types)}) - distance {distance:.2f}\n"
+            f"   {deltas(table.records[row].stats)} | Total {table.records[row].total_stats}"
+            for position, (row, distance) in enumerate(zip(rows, distances), start=1)
+        ]
+        
+        return f"""
+Pokémon Similar to {pokemon_data.display_name}
+====================================
+
+{pokemon_data.display_name}: {spread(pokemon_data.stats)} (Total {pokemon_data.total_stats})
+Conditions: {', '.join(conditions) if conditions else 'None'}
+
+Closest Stat Spreads (differences from {pokemon_data.display_name}):
+{chr(10).join(results)}
+"""
+    
+    async def stat_percentiles(self, pokemon_name: str) -> str:
+        """Show where each of a Pokémon's base stats ranks within the whole dex."""
+        pokemon_data = await self.info_module.make_pokemon_request(pokemon_name)
+        if not pokemon_data:
+            return self.info_module.not_found_message(pokemon_name)
+        
+        table = await self.search_module.get_table()
+        if table is None:
+            return "Stat percentiles need the offline dex snapshot. Build it with build_dex.py and set POKEMON_SNAPSHOT."
+        
+        row = table.rows.get(pokemon_data.name)
+        values = list(pokemon_data.stats) + [pokemon_data.total_stats]
+        lines = []
+        for column, value in zip(PERCENTILE_COLUMNS, values):
+            # Indexed Pokémon use the precomputed percentile; other forms are placed by binary search
+            percentile = table.percentiles[column][row] if row is not None else table.percentile(column, value)
+            rank = table.rank(column, value)
+            lines.append(
+                f"- {STAT_LABELS.get(column, 'Total')}: {value} "
+                f"({_ordinal(int(percentile))} percentile, rank {rank} of {len(table)})"
+            )
+        
+        return f"""
+Stat Percentiles for {pokemon_data.display_name}
+====================================
+
+Percentile = share of the {len(table)} Pokémon in the dex with an equal or lower value.
+
+{chr(10).join(lines)}
 """
-        return comparison 
\ No newline at end of file
@@ -0,0 +1,123 @@
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from .records import STAT_NAMES
+from .type_chart import TYPE_INDEX, TypeChart
+
+# Damage is multiplied by one of these 16 rolls at random
+DAMAGE_ROLLS = np.arange(85, 101) / 100
+
+STAB_MULTIPLIER = 1.5
+
+DAMAGE_CLASSES = ('physical', 'special')
+
+# Moves left out when picking moves automatically: self-KO, recharge or charge-turn moves
+AUTO_MOVE_EXCLUDES = frozenset({
+    'explosion', 'self-destruct', 'misty-explosion', 'memento', 'final-gambit',
+    'hyper-beam', 'giga-impact', 'blast-burn', 'hydro-cannon', 'frenzy-plant', 'rock-wrecker',
+    'roar-of-time', 'prismatic-laser', 'eternabeam', 'meteor-assault',
+    'solar-beam', 'solar-blade', 'sky-attack', 'skull-bash', 'razor-wind', 'freeze-shock', 'ice-burn',
+    'geomancy', 'focus-punch', 'dream-eater', 'belch', 'last-resort', 'synchronoise', 'shell-trap'
+})
+
+_ATTACK = STAT_NAMES.index('attack')
+_DEFENSE = STAT_NAMES.index('defense')
+_SP_ATTACK = STAT_NAMES.index('special-attack')
+_SP_DEFENSE = STAT_NAMES.index('special-defense')
+
+def battle_stats(base_stats: np.ndarray, level: int = 50, iv: int = 31, ev: int = 0) -> np.ndarray:
+    """Actual stats at a level for an (n, 6) base stat matrix, assuming a neutral nature."""
+    base = np.asarray(base_stats, dtype=np.float64)
+    scaled = np.floor((2 * base + iv + ev // 4) * level / 100)
+    stats = scaled + 5
+    stats[:, 0] = scaled[:, 0] + level + 10
+    return stats
+
+def move_arrays(moves: Sequence[Sequence[Optional[dict]]], width: int) -> Dict[str, np.ndarray]:
+    """Pack per-attacker move payloads into (attackers, width) arrays; missing or status moves get zero power."""
+    shape = (len(moves), width)
+    arrays = {
+        'power': np.zeros(shape),
+        'type': np.zeros(shape, dtype=np.int64),
+        'physical': np.zeros(shape, dtype=bool)
+    }
+    for i, attacker_moves in enumerate(moves):
+        for j, move in enumerate(attacker_moves[:width]):
+            if not move or move.get('power') is None:
+                continue
+            damage_class = (move.get('damage_class') or {}).get('name')
+            type_name = (move.get('type') or {}).get('name')
+            if damage_class not in DAMAGE_CLASSES or type_name not in TYPE_INDEX:
+                continue
+            arrays['power'][i, j] = move['power']
+            arrays['type'][i, j] = TYPE_INDEX[type_name]
+            arrays['physical'][i, j] = damage_class == 'physical'
+    return arrays
+
+def damage_rolls(
+    chart: TypeChart,
+    attacker_stats: np.ndarray,
+    attacker_types: np.ndarray,
+    defender_stats: np.ndarray,
+    defender_types: np.ndarray,
+    power: np.ndarray,
+    move_types: np.ndarray,
+    physical: np.ndarray,
+    level: int = 50
+) -> np.ndarray:
+    """Damage of every roll for every attacker x defender x move, shape (a, d, m, 16).
+
+    attacker_stats and defender_stats are (n, 6) actual stats, attacker_types
+    and defender_types are (n, 2) type index pairs (-1 for no second type)
+    and the move arrays are (a, m). Each modifier is applied and floored in
+    game order: base damage, random roll, STAB, then type effectiveness.
+    """
+    # (a, m) attacking stat and (a, d, m) defending stat, chosen by each move's damage class
+    attack = np.where(physical, attacker_stats[:, [_ATTACK]], attacker_stats[:, [_SP_ATTACK]])
+    defense = np.where(
+        physical[:, None, :],
+        defender_stats[None, :, _DEFENSE, None],
+        defender_stats[None, :, _SP_DEFENSE, None]
+    )
+    base = np.floor(np.floor(np.floor(2 * level / 5 + 2) * power[:, None, :] * attack[:, None, :] / defense) / 50) + 2
+    damage = np.floor(base[..., None] * DAMAGE_ROLLS)
+
+    stab = (move_types[:, :, None] == attacker_types[:, None, :]).any(axis=2)
+    damage = np.floor(damage * np.where(stab, STAB_MULTIPLIER, 1.0)[:, None, :, None])
+
+    # (d, n_types) multipliers taken, looked up by each move's type
+    effectiveness = chart.defensive_profiles(defender_types)[:, move_types]
+    damage = np.floor(damage * effectiveness.transpose(1, 0, 2)[..., None])
+
+    # Damaging moves always deal at least 1 unless the target is immune
+    damage = np.where((damage < 1) & (effectiveness.transpose(1, 0, 2)[..., None] > 0), 1, damage)
+    return np.where(power[:, None, :, None] > 0, damage, 0)
+
+def hits_to_ko(damage: np.ndarray, hp: np.ndarray) -> np.ndarray:
+    """Hits needed to KO for each damage value against (d,) defender HP; inf when no damage."""
+    with np.errstate(divide='ignore'):
+        return np.ceil(hp[None, :, None, None] / damage)
+
+def pick_moves(
+    attacker_stats: Sequence[float],
+    attacker_types: Sequence[str],
+    moves: Sequence[dict],
+    count: int = 4
+) -> List[dict]:
+    """Choose an attacker's strongest damaging moves, at most one per type for coverage."""
+    best_by_type: Dict[str, tuple] = {}
+    for move in moves:
+        if not move or move.get('power') is None or move.get('name') in AUTO_MOVE_EXCLUDES:
+            continue
+        damage_class = (move.get('damage_class') or {}).get('name')
+        type_name = (move.get('type') or {}).get('name')
+        if damage_class not in DAMAGE_CLASSES or type_name not in TYPE_INDEX:
+            continue
+        stat = attacker_stats[_ATTACK if damage_class == 'physical' else _SP_ATTACK]
+        score = (
+            move['power'] * (move.get('accuracy') or 100) / 100 * stat
+            * (STAB_MULTIPLIER if type_name in attacker_types else 1.0)
+        )
+        if type_name not in best_by_type or score > best_by_type[type_name][0]:
+            best_by_type[type_name] = (score, move)
+    ranked = sorted(best_by_type.values(), key=lambda item: (-item[0], item[1]['name']))
+    return [move for _, move in ranked[:count]]
@@ -0,0 +1,179 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .records import STAT_NAMES, PokemonRecord
+from .type_chart import TYPE_INDEX, TYPE_NAMES
+
+# scipy's KD-tree is an optional speed-up (pip install "pokemon[fast]"); fall back to brute force
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# Columns with precomputed percentiles
+PERCENTILE_COLUMNS = STAT_NAMES + ('total',)
+
+# Numeric columns and the spellings users tend to type for them
+NUMERIC_ALIASES = {
+    'hp': 'hp',
+    'attack': 'attack', 'atk': 'attack',
+    'defense': 'defense', 'def': 'defense',
+    'special-attack': 'special-attack', 'sp-atk': 'special-attack', 'spatk': 'special-attack',
+    'sp-attack': 'special-attack', 'spa': 'special-attack',
+    'special-defense': 'special-defense', 'sp-def': 'special-defense', 'spdef': 'special-defense',
+    'sp-defense': 'special-defense', 'spd': 'special-defense',
+    'speed': 'speed', 'spe': 'speed',
+    'total': 'total', 'bst': 'total',
+    'bulk': 'bulk', 'physical-bulk': 'physical-bulk', 'special-bulk': 'special-bulk',
+    'height': 'height', 'weight': 'weight', 'id': 'id',
+    'base-experience': 'base-experience', 'capture-rate': 'capture-rate', 'base-happiness': 'base-happiness'
+}
+FLAG_NAMES = ('legendary', 'mythical', 'baby')
+FLAG_PLURALS = {'legendary': 'legendaries', 'mythical': 'mythicals', 'baby': 'babies'}
+# Every word that names a flag, shared by search filters and team descriptions
+FLAG_WORDS = {
+    **{flag: flag for flag in FLAG_NAMES},
+    **{plural: flag for flag, plural in FLAG_PLURALS.items()},
+    'legend': 'legendary', 'legends': 'legendary', 'mythic': 'mythical', 'mythics': 'mythical'
+}
+
+def flag_name(word: str) -> Optional[str]:
+    """Map a word such as 'legendaries' or 'babies' to its flag, or None."""
+    return FLAG_WORDS.get(word.strip().lower())
+
+def column_name(name: str) -> Optional[str]:
+    """Map a user-typed column name such as 'Sp. Atk' to its column, or None."""
+    key = name.strip().lower().replace('.', '').replace('_', '-').replace(' ', '-')
+    return NUMERIC_ALIASES.get(key)
+
+class DexTable:
+    """Column-oriented NumPy table of the whole dex: stats, types, abilities and flags.
+
+    Rows follow the order of the records it was built from. Filters are
+    evaluated as boolean masks over whole columns, so a query over every
+    species costs a few vector operations.
+    """
+
+    def __init__(self, records: Sequence[PokemonRecord]):
+        self.records = list(records)
+        self.names = [record.name for record in self.records]
+        self.rows = {name: i for i, name in enumerate(self.names)}
+
+        stats = np.array([record.stats for record in self.records], dtype=np.float64).reshape(-1, len(STAT_NAMES))
+        self.stats = stats
+        self.columns: Dict[str, np.ndarray] = {name: stats[:, i] for i, name in enumerate(STAT_NAMES)}
+        self.columns['total'] = stats.sum(axis=1)
+        hp, defense, sp_defense = (self.columns[name] for name in ('hp', 'defense', 'special-defense'))
+        self.columns['physical-bulk'] = hp * defense
+        self.columns['special-bulk'] = hp * sp_defense
+        self.columns['bulk'] = hp * (defense + sp_defense)
+
+        def numeric(values) -> np.ndarray:
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+        self.columns['id'] = numeric(record.id for record in self.records)
+        # Heights and weights are stored in decimetres and hectograms
+        self.columns['height'] = numeric(record.height for record in self.records) / 10
+        self.columns['weight'] = numeric(record.weight for record in self.records) / 10
+        self.columns['base-experience'] = numeric(record.base_experience for record in self.records)
+        self.columns['capture-rate'] = numeric(record.capture_rate for record in self.records)
+        self.columns['base-happiness'] = numeric(record.base_happiness for record in self.records)
+
+        self.types = np.zeros((len(self.records), len(TYPE_NAMES)), dtype=bool)
+        for row, record in enumerate(self.records):
+            for type_name in record.types:
+                if type_name in TYPE_INDEX:
+                    self.types[row, TYPE_INDEX[type_name]] = True
+
+        self.flags = {
+            flag: np.array([getattr(record, f"is_{flag}") for record in self.records], dtype=bool)
+            for flag in FLAG_NAMES
+        }
+
+        # Stat vectors scaled to unit variance, so every stat counts equally in distances
+        scale = stats.std(axis=0) if len(stats) else np.ones(len(STAT_NAMES))
+        self.stat_scale = np.where(scale > 0, scale, 1.0)
+        self.stat_vectors = stats / self.stat_scale
+        self._kdtree = cKDTree(self.stat_vectors) if cKDTree is not None and len(stats) else None
+
+        # Sorted columns and each row's percentile (share of the dex with an equal or lower value)
+        self.sorted_columns = {column: np.sort(self.columns[column]) for column in PERCENTILE_COLUMNS}
+        self.percentiles = {
+            column: self.percentile(column, self.columns[column]) for column in PERCENTILE_COLUMNS
+        }
+
+        # Inverted index: ability -> rows that can have it
+        abilities: Dict[str, List[int]] = {}
+        for row, record in enumerate(self.records):
+            for ability in record.abilities:
+                abilities.setdefault(ability, []).append(row)
+        self.abilities = {ability: np.array(rows, dtype=np.int64) for ability, rows in abilities.items()}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def type_mask(self, type_name: str) -> np.ndarray:
+        if type_name not in TYPE_INDEX:
+            raise ValueError(f"Unknown type '{type_name}'")
+        return self.types[:, TYPE_INDEX[type_name]]
+
+    def ability_mask(self, ability: str) -> np.ndarray:
+        mask = np.zeros(len(self.records), dtype=bool)
+        rows = self.abilities.get(ability)
+        if rows is not None:
+            mask[rows] = True
+        return mask
+
+    def top_k(self, mask: np.ndarray, column: Optional[str], descending: bool = True, limit: int = 10) -> np.ndarray:
+        """Rows selected by mask, ordered by a column (dex order when None), truncated to limit."""
+        rows = np.flatnonzero(mask)
+        if column is None:
+            return rows[:limit]
+        values = self.columns[column][rows]
+        # Unknown values sort last either way
+        keys = np.where(np.isnan(values), -np.inf if descending else np.inf, values)
+        keys = -keys if descending else keys
+        if limit < len(rows):
+            part = np.argpartition(keys, limit - 1)[:limit]
+            rows, keys = rows[part], keys[part]
+        # Ties keep dex order
+        return rows[np.lexsort((rows, keys))]
+
+    def percentile(self, column: str, value):
+        """Percent of the dex whose value in column is equal or lower."""
+        ranked = self.sorted_columns[column]
+        return np.searchsorted(ranked, value, side='right') / max(1, len(ranked)) * 100
+
+    def rank(self, column: str, value):
+        """Rank of a value in column, 1 being the highest in the dex; ties share a rank."""
+        ranked = self.sorted_columns[column]
+        return len(ranked) - np.searchsorted(ranked, value, side='right') + 1
+
+    def nearest(
+        self,
+        stats: Sequence[int],
+        k: int = 5,
+        mask: Optional[np.ndarray] = None,
+        exclude: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows with the closest base stat spread, as (rows, distances), closest first.
+
+        Uses the KD-tree when scipy is installed and no mask narrows the
+        candidates; otherwise a vectorized brute-force scan.
+        """
+        target = np.asarray(stats, dtype=np.float64) / self.stat_scale
+        if mask is None and self._kdtree is not None:
+            wanted = min(k + (exclude is not None), len(self))
+            distances, rows = self._kdtree.query(target, k=wanted)
+            rows, distances = np.atleast_1d(rows), np.atleast_1d(distances)
+            keep = rows != exclude
+            return rows[keep][:k], distances[keep][:k]
+
+        candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(self))
+        if exclude is not None:
+            candidates = candidates[candidates != exclude]
+        distances = np.linalg.norm(self.stat_vectors[candidates] - target, axis=1)
+        if k < len(candidates):
+            part = np.argpartition(distances, k - 1)[:k]
+            candidates, distances = candidates[part], distances[part]
+        order = np.lexsort((candidates, distances))
+        return candidates[order], distances[order]
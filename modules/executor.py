@@ -0,0 +1,177 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+EXECUTOR_KINDS = ('thread', 'process')
+
+# Objects installed in each worker process, looked up by name
+_preloaded: Dict[str, Any] = {}
+
+_executor: Optional["ComputeExecutor"] = None
+
+class JobCancelled(Exception):
+    """Raised inside a job that was abandoned by its caller or ran past its deadline."""
+
+class JobControl:
+    """Cooperative cancellation handle passed to long-running jobs.
+
+    Jobs call check() between steps; it raises JobCancelled once the deadline
+    has passed or, for thread jobs, once the caller has gone away.
+    """
+
+    def __init__(self, deadline: Optional[float] = None, event: Optional[threading.Event] = None):
+        self.deadline = deadline
+        self.event = event
+
+    def check(self) -> None:
+        if self.event is not None and self.event.is_set():
+            raise JobCancelled("Job was cancelled")
+        # time.monotonic is system-wide, so the deadline also holds in worker processes
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise JobCancelled("Job ran past its deadline")
+
+def _install(preloaded: Dict[str, Any]) -> None:
+    _preloaded.update(preloaded)
+
+def _call_preloaded(name: str, method: str, args: tuple, kwargs: dict) -> Any:
+    return getattr(_preloaded[name], method)(*args, **kwargs)
+
+def _call_preloaded_cancellable(name: str, method: str, args: tuple, kwargs: dict, control: JobControl) -> Any:
+    return getattr(_preloaded[name], method)(*args, control=control, **kwargs)
+
+class ComputeExecutor:
+    """Runs CPU-bound work off the event loop with per-job deadlines and cancellation.
+
+    The thread pool suits NumPy-heavy jobs that release the GIL; the process
+    pool isolates pure-Python work from the server. Large objects such as a
+    team optimizer are preloaded once per worker instead of being pickled
+    with every job. At most `max_workers` jobs run at once; the rest queue
+    without ever blocking the event loop.
+    """
+
+    def __init__(self, kind: str = 'thread', max_workers: Optional[int] = None, timeout: Optional[float] = 30.0):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind '{kind}', expected one of {', '.join(EXECUTOR_KINDS)}")
+        self.kind = kind
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.timeout = timeout
+        self._pool: Optional[Executor] = None
+        self._preloaded: Dict[str, Any] = {}
+        self.completed = 0
+        self.cancelled = 0
+        self.timed_out = 0
+
+    @classmethod
+    def from_env(cls) -> "ComputeExecutor":
+        """Create an executor configured from POKEMON_COMPUTE_* environment variables."""
+        workers = int(os.getenv("POKEMON_COMPUTE_WORKERS", "0"))
+        timeout = float(os.getenv("POKEMON_COMPUTE_TIMEOUT", "30"))
+        return cls(
+            kind=os.getenv("POKEMON_COMPUTE_EXECUTOR", "thread"),
+            max_workers=workers or None,
+            timeout=timeout if timeout > 0 else None
+        )
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == 'process':
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_install,
+                    initargs=(dict(self._preloaded),)
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pokemon-compute')
+        return self._pool
+
+    def preload(self, name: str, obj: Any) -> None:
+        """Make obj available to run_preloaded; process workers are restarted to receive it."""
+        self._preloaded[name] = obj
+        if self.kind == 'process' and self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=False, cancel_futures=False)
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        cancellable: bool = False,
+        **kwargs: Any
+    ) -> Any:
+        """Run fn(*args, **kwargs) in the pool and await its result.
+
+        With cancellable=True the job receives a `control` keyword argument
+        (a JobControl) to poll. Raises asyncio.TimeoutError after `timeout`
+        seconds (the executor default when None).
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        control = None
+        if cancellable:
+            event = threading.Event() if self.kind == 'thread' else None
+            control = JobControl(deadline, event)
+            kwargs['control'] = control
+
+        future = self._get_pool().submit(fn, *args, **kwargs)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            self._abandon(future, control)
+            raise
+        except asyncio.CancelledError:
+            # The MCP request was abandoned; drop the job if it has not started
+            self.cancelled += 1
+            self._abandon(future, control)
+            raise
+        self.completed += 1
+        return result
+
+    async def run_preloaded(self, name: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Call a method of a preloaded object in the pool; accepts the same options as run."""
+        if self.kind == 'thread':
+            return await self.run(getattr(self._preloaded[name], method), *args, **kwargs)
+        options = {key: kwargs.pop(key) for key in ('timeout', 'cancellable') if key in kwargs}
+        if options.get('cancellable'):
+            return await self.run(_call_preloaded_cancellable, name, method, args, kwargs, **options)
+        return await self.run(_call_preloaded, name, method, args, kwargs, **options)
+
+    @staticmethod
+    def _abandon(future, control: Optional[JobControl]) -> None:
+        future.cancel()
+        if control is not None and control.event is not None:
+            control.event.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'workers': self.max_workers,
+            'completed': self.completed,
+            'cancelled': self.cancelled,
+            'timed_out': self.timed_out
+        }
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping queued jobs."""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+def get_executor() -> ComputeExecutor:
+    """Return the process-wide compute executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ComputeExecutor.from_env()
+    return _executor
+
+def shutdown_executor() -> None:
+    """Shut down the process-wide compute executor."""
+    global _executor
+    if _executor is not None:
+        executor, _executor = _executor, None
+        executor.shutdown()
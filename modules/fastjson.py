@@ -0,0 +1,20 @@
+import json
+from typing import Any
+
+# orjson is an optional speed-up (pip install "pokemon[fast]"); fall back to the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(value: Any) -> str:
+    """Encode value as compact JSON text, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, separators=(',', ':'))
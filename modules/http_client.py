@@ -0,0 +1,49 @@
+import os
+from typing import Optional
+import httpx
+
+POKEMON_API_BASE = "https://pokeapi.co/api/v2"
+USER_AGENT = "pokemon-app/1.0"
+
+_client: Optional[httpx.AsyncClient] = None
+
+def _http2_available() -> bool:
+    """Check whether the optional h2 package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create an AsyncClient configured from POKEMON_HTTP_* environment variables."""
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("POKEMON_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("POKEMON_HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("POKEMON_HTTP_KEEPALIVE_EXPIRY", "60")),
+    )
+    http2 = os.getenv("POKEMON_HTTP2", "1") != "0" and _http2_available()
+    return httpx.AsyncClient(
+        base_url=POKEMON_API_BASE,
+        headers={
+            "User-Agent": USER_AGENT,
+            "Accept": "application/json"
+        },
+        timeout=float(os.getenv("POKEMON_HTTP_TIMEOUT", "30")),
+        limits=limits,
+        http2=http2,
+    )
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide AsyncClient, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+async def close_http_client() -> None:
+    """Close the process-wide AsyncClient and its pooled connections."""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
@@ -1,53 +1,373 @@
-from typing import Any, Optional
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
 import httpx
+from .cache import LRUCache, TieredCache
+from .fastjson import loads
+from .http_client import POKEMON_API_BASE, USER_AGENT, get_http_client
+from .move_db import MoveDatabase
+from .names import NameIndex, normalize_name
+from .records import PokemonRecord, evolution_stages
+from .refresher import RefreshQueue
+from .singleflight import SingleFlight
+from .snapshot import DEFAULT_SNAPSHOT, DexSnapshot, compact_resource
+
+DATA_MODES = ('online', 'offline', 'online-with-fallback')
+
+# Resource kinds cached as compact record objects instead of JSON
+RECORD_TYPES = {'pokemon': PokemonRecord}
+
+# Listing used to build the local name index in online modes
+POKEMON_LIST_PATH = "pokemon?limit=100000&offset=0"
+
+# Returned by _fetch_upstream when a conditional request finds the resource unchanged
+NOT_MODIFIED = object()
+
+# Seconds to wait before retrying a failed name index load
+NAME_INDEX_RETRY_DELAY = 60.0
+
+def _id_from_url(url: str) -> int:
+    return int(url.rstrip('/').rsplit('/', 1)[1])
 
 class InfoRetrievalModule:
-    def __init__(self):
-        self.POKEMON_API_BASE = "https://pokeapi.co/api/v2"
-        self.USER_AGENT = "pokemon-app/1.0"
+    def __init__(
+        self,
+        cache: Optional[TieredCache] = None,
+        mode: Optional[str] = None,
+        snapshot: Optional[DexSnapshot] = None
+    ):
+        self.POKEMON_API_BASE = POKEMON_API_BASE
+        self.USER_AGENT = USER_AGENT
+        self.mode = mode or os.getenv("POKEMON_DATA_MODE", "online")
+        if self.mode not in DATA_MODES:
+            raise ValueError(f"Unknown data mode '{self.mode}', expected one of {', '.join(DATA_MODES)}")
+        self.cache = cache if cache is not None else TieredCache.from_env()
+        self.snapshot = snapshot
+        if self.snapshot is None:
+            # Dex-wide tools read the snapshot in every mode; only offline mode cannot run without it
+            snapshot_path = os.getenv("POKEMON_SNAPSHOT", str(DEFAULT_SNAPSHOT))
+            if self.mode == 'offline' or os.path.isfile(snapshot_path):
+                self.snapshot = DexSnapshot(snapshot_path)
+        # Confirmed upstream misses, so retries of a bad name skip the network
+        self.negative_cache = LRUCache(
+            maxsize=int(os.getenv("POKEMON_NEGATIVE_CACHE_SIZE", "2048")),
+            ttl=float(os.getenv("POKEMON_NEGATIVE_CACHE_TTL", "300"))
+        )
+        # Revalidates stale cache entries in the background
+        self.refresher = RefreshQueue.from_env()
+        self.name_index: Optional[NameIndex] = None
+        self._name_index_retry_at = 0.0
+        self.dex_records: Optional[List[PokemonRecord]] = None
+        self.move_database: Optional[MoveDatabase] = None
+        self._inflight = SingleFlight()
     
-    async def make_pokemon_request(self, pokemon_name: str) -> Optional[dict[str, Any]]:
-        """Make a request to the Pokemon API with proper error handling."""
-        url = f"{self.POKEMON_API_BASE}/pokemon/{pokemon_name.lower()}"
-        headers = {
-            "User-Agent": self.USER_AGENT,
-            "Accept": "application/json"
-        }
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=headers, timeout=30.0)
-                response.raise_for_status()
-                return response.json()
-            except Exception:
+    async def fetch_resource(self, path: str) -> Optional[Any]:
+        """Fetch a PokeAPI resource such as 'pokemon/pikachu', serving it from cache when possible.
+
+        Pokémon come back as PokemonRecord objects, other kinds as compacted JSON.
+        Expired entries still within the stale window are returned at once and
+        revalidated in the background.
+        """
+        record_type = RECORD_TYPES.get(path.partition('/')[0])
+        key = f"{path}@v{record_type.VERSION}" if record_type else path
+        
+        if self.mode == 'offline':
+            # The snapshot is the source of truth; only the memory tier fronts it
+            cached = self.cache.memory.get(key)
+        else:
+            cached, fresh = await self.cache.alookup(key, decode=record_type.from_dict if record_type else None)
+            if cached is not None and not fresh:
+                self.refresher.schedule(key, lambda: self._refresh(path, key))
+            elif cached is None and self.negative_cache.get(path) is not None:
                 return None
+        if cached is not None:
+            return cached
+        
+        # Concurrent misses for the same path share a single load
+        return await self._inflight.do(key, lambda: self._load(path, key))
+    
+    async def revalidate(self, path: str) -> None:
+        """Refresh a cached resource now if it is stale or missing; offline data is left alone."""
+        if self.mode == 'offline':
+            return
+        record_type = RECORD_TYPES.get(path.partition('/')[0])
+        key = f"{path}@v{record_type.VERSION}" if record_type else path
+        _, fresh = await self.cache.alookup(key, decode=record_type.from_dict if record_type else None)
+        if not fresh:
+            await self._refresh(path, key)
+    
+    async def _load(self, path: str, key: str, fetched: Optional[Tuple[Any, Optional[str]]] = None) -> Optional[Any]:
+        """Load a resource from its source, project it and cache the result.
+
+        fetched is a (payload, etag) pair already read from upstream, e.g. by a revalidation.
+        """
+        record_type = RECORD_TYPES.get(path.partition('/')[0])
+        if record_type is PokemonRecord:
+            data, etag = await self._load_pokemon(path, fetched)
+        else:
+            raw, etag = fetched if fetched is not None else await self._get_raw(path)
+            data = self._project(path, raw) if raw is not None else None
+        
+        if data is not None:
+            if self.mode == 'offline':
+                self.cache.memory.set(key, data)
+            else:
+                await self.cache.aset(key, data, encode=record_type.to_dict if record_type else None, etag=etag)
+        return data
+    
+    async def _refresh(self, path: str, key: str) -> None:
+        """Revalidate a stale entry with a conditional request, reloading it only if it changed.
+
+        On failure the stale entry is left in place until its stale window ends.
+        """
+        raw, etag = await self._fetch_upstream(path, await self.cache.aetag(key))
+        if raw is NOT_MODIFIED:
+            await self.cache.atouch(key)
+        elif raw is not None:
+            await self._load(path, key, (raw, etag))
+    
+    async def _load_pokemon(
+        self,
+        path: str,
+        fetched: Optional[Tuple[Any, Optional[str]]] = None
+    ) -> Tuple[Optional[PokemonRecord], Optional[str]]:
+        """Load a Pokémon joined with its species and evolution chain into one record, plus its ETag."""
+        name = path.partition('/')[2]
+        
+        async def get_raw() -> Tuple[Optional[Any], Optional[str]]:
+            return fetched if fetched is not None else await self._get_raw(path)
+        
+        # Species usually shares the Pokémon's name, so both are requested together
+        (raw, etag), species = await asyncio.gather(
+            get_raw(),
+            self.fetch_resource(f"pokemon-species/{name}")
+        )
+        if raw is None:
+            return None, None
+        
+        record = PokemonRecord.from_api(raw)
+        if species is None and record.species and record.species != name:
+            # Alternate forms such as 'raichu-alola' belong to a differently named species
+            species = await self.fetch_resource(f"pokemon-species/{record.species}")
+        if species:
+            record.apply_species(species)
+            chain_url = (species.get('evolution_chain') or {}).get('url')
+            if chain_url:
+                chain = await self.fetch_resource(f"evolution-chain/{_id_from_url(chain_url)}")
+                if chain:
+                    record.evolution_chain = evolution_stages(chain)
+        return record, etag
+    
+    def _project(self, path: str, data: Any) -> Any:
+        """Reduce a raw payload to the compact form that is cached."""
+        kind = path.partition('/')[0]
+        record_type = RECORD_TYPES.get(kind)
+        if record_type is not None:
+            return record_type.from_api(data)
+        return compact_resource(kind, data)
+    
+    async def _get_raw(self, path: str) -> Tuple[Optional[Any], Optional[str]]:
+        """Read a raw payload and its ETag from the snapshot or PokeAPI, depending on the data mode."""
+        if self.mode == 'offline':
+            return self.snapshot.get(path), None
+        data, etag = await self._fetch_upstream(path)
+        if data is None and self.mode == 'online-with-fallback' and self.snapshot is not None:
+            return self.snapshot.get(path), None
+        return data, etag
+    
+    async def _fetch_upstream(self, path: str, etag: Optional[str] = None) -> Tuple[Optional[Any], Optional[str]]:
+        """Fetch a raw payload and its ETag from PokeAPI, remembering confirmed misses.
+
+        Given an etag the request is conditional, and an unchanged resource
+        comes back as NOT_MODIFIED without a body.
+        """
+        url = f"{self.POKEMON_API_BASE}/{path}"
+        client = get_http_client()
+        try:
+            response = await client.get(url, headers={"If-None-Match": etag} if etag else None)
+            if response.status_code == 304:
+                return NOT_MODIFIED, etag
+            response.raise_for_status()
+            return loads(response.content), response.headers.get("ETag")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                self.negative_cache.set(path, True)
+            return None, None
+        except Exception:
+            return None, None
+    
+    async def get_name_index(self) -> Optional[NameIndex]:
+        """Return the Pokémon name index, loading it on first use."""
+        if self.name_index is None and time.monotonic() >= self._name_index_retry_at:
+            self.name_index = await self._inflight.do('name-index', self._load_name_index)
+            if self.name_index is None:
+                self._name_index_retry_at = time.monotonic() + NAME_INDEX_RETRY_DELAY
+        return self.name_index
+    
+    async def _load_name_index(self) -> Optional[NameIndex]:
+        if self.mode != 'offline':
+            listing = await self.fetch_resource(POKEMON_LIST_PATH)
+            if listing:
+                return NameIndex(
+                    (entry['name'], _id_from_url(entry['url'])) for entry in listing.get('results', [])
+                )
+        if self.snapshot is not None:
+            return NameIndex(self.snapshot.name_ids('pokemon'))
+        return None
+    
+    async def resolve_pokemon_name(self, pokemon_name: str) -> Optional[str]:
+        """Resolve a user-typed name to its PokeAPI name locally; None means it is unknown."""
+        normalized = normalize_name(pokemon_name)
+        if not normalized:
+            return None
+        index = await self.get_name_index()
+        if index is None or normalized.isdigit():
+            return normalized
+        return index.resolve(normalized)
+    
+    async def make_pokemon_request(self, pokemon_name: str) -> Optional[PokemonRecord]:
+        """Make a request to the Pokemon API with proper error handling."""
+        name = await self.resolve_pokemon_name(pokemon_name)
+        if name is None:
+            return None
+        return await self.fetch_resource(f"pokemon/{name}")
+    
+    async def _gather_limited(
+        self,
+        keys: List[str],
+        fetch: Callable[[str], Awaitable[Optional[Any]]],
+        concurrency: Optional[int],
+        timeout: Optional[float]
+    ) -> List[Optional[Any]]:
+        """Run fetch(key) for every distinct key with bounded concurrency and a per-key timeout.
+
+        The result lines up with keys; keys that failed or timed out map to None.
+        """
+        concurrency = concurrency or int(os.getenv("POKEMON_BATCH_CONCURRENCY", "8"))
+        timeout = timeout or float(os.getenv("POKEMON_BATCH_TIMEOUT", "10"))
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch_one(key: str) -> Optional[Any]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(fetch(key), timeout)
+                except Exception:
+                    return None
+        
+        unique = list(dict.fromkeys(keys))
+        results = dict(zip(unique, await asyncio.gather(*[fetch_one(key) for key in unique])))
+        return [results[key] for key in keys]
+    
+    async def fetch_resources(
+        self,
+        paths: List[str],
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> List[Optional[Any]]:
+        """Fetch several resources concurrently, with the same limits as make_pokemon_requests."""
+        return await self._gather_limited(paths, self.fetch_resource, concurrency, timeout)
+    
+    async def make_pokemon_requests(
+        self,
+        pokemon_names: List[str],
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> List[Optional[PokemonRecord]]:
+        """Fetch several Pokémon concurrently.
+
+        Repeated names are fetched once, at most `concurrency` lookups run at a
+        time and each one is abandoned after `timeout` seconds. The result lines
+        up with pokemon_names; entries that were not found, failed or timed out
+        are None.
+        """
+        names = [normalize_name(name) for name in pokemon_names]
+        return await self._gather_limited(names, self.make_pokemon_request, concurrency, timeout)
+    
+    async def get_dex_records(self) -> Optional[List[PokemonRecord]]:
+        """Return a species-joined record for the default form of every species in the snapshot.
+
+        Returns None when no snapshot is available; the records are built once.
+        """
+        if self.snapshot is None:
+            return None
+        if self.dex_records is None:
+            self.dex_records = await self._inflight.do(
+                'dex-records', lambda: asyncio.to_thread(self._load_dex_records)
+            )
+        return self.dex_records
+    
+    def _load_dex_records(self) -> List[PokemonRecord]:
+        records = []
+        for species in self.snapshot.iter_kind('pokemon-species'):
+            default = next((v for v in species.get('varieties', []) if v.get('is_default')), None)
+            data = self.snapshot.get(f"pokemon/{default['pokemon']['name'] if default else species['name']}")
+            if data is None:
+                continue
+            record = PokemonRecord.from_api(data)
+            record.apply_species(species)
+            records.append(record)
+        records.sort(key=lambda record: record.id or 0)
+        return records
+    
+    async def get_move_database(self) -> Optional[MoveDatabase]:
+        """Return the move table and learnset index built from the snapshot.
+
+        Returns None when no snapshot is available; the database is built once.
+        """
+        if self.snapshot is None:
+            return None
+        if self.move_database is None:
+            self.move_database = await self._inflight.do(
+                'move-database', lambda: asyncio.to_thread(self._load_move_database)
+            )
+        return self.move_database
+    
+    def _load_move_database(self) -> MoveDatabase:
+        return MoveDatabase(
+            self.snapshot.iter_kind('move'),
+            self.snapshot.iter_kind('pokemon'),
+            self.snapshot.iter_kind('version-group')
+        )
+    
+    def not_found_message(self, pokemon_name: str) -> str:
+        """Build the 'Unable to find' reply, with close matches when the name index has any."""
+        message = f"Unable to find Pokémon '{pokemon_name}'."
+        suggestions = self.name_index.suggest(pokemon_name) if self.name_index is not None else []
+        if suggestions:
+            return f"{message} Did you mean: {', '.join(s.title() for s in suggestions)}?"
+        return f"{message} Please check the spelling and try again."
+    
+    def cache_stats(self) -> dict[str, dict[str, int]]:
+        """Return hit/miss/eviction counters of the response cache and the background refresher."""
+        return {**self.cache.stats(), 'refresh': self.refresher.stats()}
 
-    def format_pokemon_data(self, pokemon_data: dict) -> str:
+    def format_pokemon_data(self, pokemon: PokemonRecord) -> str:
         """Format Pokemon data into a detailed readable string."""
-        name = pokemon_data.get('name', 'Unknown').title()
-        height = pokemon_data.get('height', 0) / 10  # Convert to meters
-        weight = pokemon_data.get('weight', 0) / 10  # Convert to kg
-        types = [t['type']['name'].title() for t in pokemon_data.get('types', [])]
-        abilities = [a['ability']['name'].title() for a in pokemon_data.get('abilities', [])]
+        name = pokemon.display_name
+        height = pokemon.height / 10  # Convert to meters
+        weight = pokemon.weight / 10  # Convert to kg
+        types = [t.title() for t in pokemon.types]
+        abilities = [a.title() for a in pokemon.abilities]
         
         # Extract base stats
-        stats = {stat['stat']['name']: stat['base_stat'] for stat in pokemon_data.get('stats', [])}
+        stats = pokemon.stats_by_name
         
         # Extract moves (limited to first 5)
-        moves = [move['move']['name'].title() for move in pokemon_data.get('moves', [])[:5]]
+        moves = [move.title() for move in pokemon.moves[:5]]
         
         # Calculate total base stats
-        total_stats = sum(stats.values())
+        total_stats = pokemon.total_stats
         
         # Get held items
-        held_items = [item['item']['name'].title() for item in pokemon_data.get('held_items', [])]
+        held_items = [item.title() for item in pokemon.held_items]
         
         # Get game appearances
-        game_indices = [game['version']['name'].title() for game in pokemon_data.get('game_indices', [])]
+        game_indices = [game.title() for game in pokemon.game_versions]
         
         # Get sprites
-        sprites = pokemon_data.get('sprites', {})
-        front_sprite = sprites.get('front_default', 'Not available')
-        back_sprite = sprites.get('back_default', 'Not available')
+        front_sprite = pokemon.front_sprite or 'Not available'
+        back_sprite = pokemon.back_sprite or 'Not available'
         
         return f"""
 Pokemon Information for {name}
@@ -58,7 +378,7 @@ Basic Information:
 Height: {height} m
 Weight: {weight} kg
 Types: {', '.join(types) if types else 'Unknown'}
-Base Experience: {pokemon_data.get('base_experience', 'Unknown')}
+Base Experience: {pokemon.base_experience if pokemon.base_experience is not None else 'Unknown'}
 
 Abilities:
 ----------
@@ -93,9 +413,10 @@ Back: {back_sprite}
 
 Additional Information:
 ---------------------
-- Order: #{pokemon_data.get('order', 'Unknown')}
-- Base Happiness: {pokemon_data.get('base_happiness', 'Unknown')}
-- Capture Rate: {pokemon_data.get('capture_rate', 'Unknown')}
-- Is Legendary: {'Yes' if pokemon_data.get('is_legendary', False) else 'No'}
-- Is Mythical: {'Yes' if pokemon_data.get('is_mythical', False) else 'No'}
+- Order: #{pokemon.order if pokemon.order is not None else 'Unknown'}
+- Base Happiness: {pokemon.base_happiness if pokemon.base_happiness is not None else 'Unknown'}
+- Capture Rate: {pokemon.capture_rate if pokemon.capture_rate is not None else 'Unknown'}
+- Is Legendary: {'Yes' if pokemon.is_legendary else 'No'}
+- Is Mythical: {'Yes' if pokemon.is_mythical else 'No'}
+- Evolution Chain: {' → '.join(stage.title() for stage in pokemon.evolution_chain) if pokemon.evolution_chain else 'Unknown'}
 """ 
\ No newline at end of file
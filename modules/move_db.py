@@ -0,0 +1,142 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .damage import DAMAGE_CLASSES
+from .type_chart import TYPE_INDEX
+
+# damage_class codes; status moves and unknown classes share the last code
+MOVE_CLASSES = DAMAGE_CLASSES + ('status',)
+
+# Learn methods listed first when a move can be learned several ways
+LEARN_METHODS = ('level-up', 'machine', 'tutor', 'egg')
+
+def learnset_entries(pokemon: dict) -> Iterable[Tuple[str, str, str, int]]:
+    """Yield (move, version_group, method, level) for every version-group detail of a /pokemon payload."""
+    for move in pokemon.get('moves', []):
+        name = move['move']['name']
+        for detail in move.get('version_group_details', []):
+            yield (
+                name,
+                detail['version_group']['name'],
+                (detail.get('move_learn_method') or {}).get('name') or 'unknown',
+                detail.get('level_learned_at') or 0
+            )
+
+class Learnset:
+    """One Pokémon's learnable moves as parallel arrays, one entry per (move, method, level).
+
+    groups is a bitmask of the version groups in which the entry applies
+    (PokeAPI has fewer than 64, so one int64 each is enough).
+    """
+
+    __slots__ = ('rows', 'methods', 'levels', 'groups')
+
+    def __init__(self, rows: np.ndarray, methods: np.ndarray, levels: np.ndarray, groups: np.ndarray):
+        self.rows = rows
+        self.methods = methods
+        self.levels = levels
+        self.groups = groups
+
+class MoveDatabase:
+    """In-memory table of every move plus a learnset index for every Pokémon.
+
+    Move attributes are NumPy columns indexed by row, so ranking a
+    Pokémon's whole movepool is a handful of vector operations instead
+    of one request per move.
+    """
+
+    def __init__(self, moves: Iterable[dict], pokemon: Iterable[dict], version_groups: Iterable[dict] = ()):
+        self.payloads = sorted(moves, key=lambda move: move.get('id') or 0)
+        self.names = [move['name'] for move in self.payloads]
+        self.rows = {name: i for i, name in enumerate(self.names)}
+
+        def numeric(key: str) -> np.ndarray:
+            return np.array([np.nan if move.get(key) is None else move[key] for move in self.payloads], dtype=np.float64)
+
+        self.power = numeric('power')
+        self.accuracy = numeric('accuracy')
+        self.pp = numeric('pp')
+        self.priority = np.array([move.get('priority') or 0 for move in self.payloads], dtype=np.int64)
+        self.type = np.array(
+            [TYPE_INDEX.get((move.get('type') or {}).get('name'), -1) for move in self.payloads], dtype=np.int64
+        )
+        self.damage_class = np.array([
+            MOVE_CLASSES.index(name) if name in DAMAGE_CLASSES else len(DAMAGE_CLASSES)
+            for name in ((move.get('damage_class') or {}).get('name') for move in self.payloads)
+        ], dtype=np.int64)
+
+        # Version groups in release order, and each game version's group
+        ordered = sorted(version_groups, key=lambda group: group.get('order') or 0)
+        self.version_groups: List[str] = [group['name'] for group in ordered]
+        self.versions: Dict[str, str] = {
+            version['name']: group['name'] for group in ordered for version in group.get('versions', [])
+        }
+        self.methods: List[str] = list(LEARN_METHODS)
+
+        # Snapshots built before learnsets were kept have no version group details
+        self.learnsets: Dict[str, Learnset] = {}
+        for data in pokemon:
+            learnset = self._index(data)
+            if len(learnset.rows):
+                self.learnsets[data['name']] = learnset
+
+    def _code(self, names: List[str], name: str) -> int:
+        # Names missing from the reference lists are appended, so earlier codes stay valid
+        if name not in names:
+            names.append(name)
+        return names.index(name)
+
+    def _index(self, pokemon: dict) -> Learnset:
+        entries: Dict[Tuple[int, int, int], int] = {}
+        for move, group, method, level in learnset_entries(pokemon):
+            row = self.rows.get(move)
+            if row is None:
+                continue
+            key = (row, self._code(self.methods, method), level)
+            entries[key] = entries.get(key, 0) | (1 << self._code(self.version_groups, group))
+        keys = np.array(list(entries), dtype=np.int64).reshape(-1, 3)
+        return Learnset(
+            rows=keys[:, 0],
+            methods=keys[:, 1],
+            levels=keys[:, 2],
+            groups=np.array(list(entries.values()), dtype=np.int64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def __contains__(self, pokemon: str) -> bool:
+        return pokemon in self.learnsets
+
+    def version_group(self, name: str) -> str:
+        """Resolve a version group or game version name ('scarlet') to its version group."""
+        if name in self.versions:
+            return self.versions[name]
+        if name in self.version_groups:
+            return name
+        raise ValueError(f"Unknown version group '{name}'. Known: {', '.join(self.version_groups)}")
+
+    def latest_version_group(self, pokemon: str) -> Optional[str]:
+        """The most recent version group in which the Pokémon learns any move."""
+        learnset = self.learnsets.get(pokemon)
+        if learnset is None:
+            return None
+        mask = int(np.bitwise_or.reduce(learnset.groups))
+        return self.version_groups[mask.bit_length() - 1]
+
+    def learnable(self, pokemon: str, version_group: Optional[str] = None) -> Learnset:
+        """Entries of a Pokémon's learnset, limited to one version group when given."""
+        learnset = self.learnsets.get(pokemon)
+        if learnset is None:
+            empty = np.zeros(0, dtype=np.int64)
+            return Learnset(empty, empty, empty, empty)
+        if version_group is None:
+            return learnset
+        keep = (learnset.groups & (1 << self.version_groups.index(version_group))) != 0
+        return Learnset(learnset.rows[keep], learnset.methods[keep], learnset.levels[keep], learnset.groups[keep])
+
+    def move_rows(self, pokemon: str, version_group: Optional[str] = None) -> np.ndarray:
+        """Distinct move rows a Pokémon can learn, in move id order."""
+        return np.unique(self.learnable(pokemon, version_group).rows)
+
+    def payloads_for(self, pokemon: str, version_group: Optional[str] = None) -> List[dict]:
+        return [self.payloads[row] for row in self.move_rows(pokemon, version_group)]
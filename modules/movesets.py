@@ -0,0 +1,249 @@
+import re
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from .damage import STAB_MULTIPLIER
+from .info_retrieval import InfoRetrievalModule
+from .move_db import MOVE_CLASSES, MoveDatabase
+from .names import normalize_name
+from .records import STAT_NAMES, PokemonRecord
+from .type_chart import BATTLE_TYPES, TYPE_INDEX, TYPE_NAMES
+
+MAX_MOVESET_LIMIT = 50
+
+# Numeric move fields and their aliases
+MOVE_FIELDS = {
+    'power': 'power', 'bp': 'power',
+    'accuracy': 'accuracy', 'acc': 'accuracy',
+    'pp': 'pp',
+    'priority': 'priority', 'prio': 'priority',
+    'level': 'level', 'lvl': 'level'
+}
+METHOD_ALIASES = {
+    'level-up': 'level-up', 'levelup': 'level-up', 'level': 'level-up',
+    'machine': 'machine', 'tm': 'machine', 'hm': 'machine', 'tr': 'machine',
+    'tutor': 'tutor', 'egg': 'egg', 'egg-move': 'egg'
+}
+
+_COMPARISONS = {
+    '>': np.greater, '>=': np.greater_equal,
+    '<': np.less, '<=': np.less_equal,
+    '=': np.equal, '==': np.equal, '!=': np.not_equal
+}
+_SPLIT = re.compile(r"\s*(?:,|;|\band\b)\s*")
+_NUMERIC = re.compile(r"^(?P<field>[a-z]+)\s*(?P<op>>=|<=|==|!=|>|<|=)\s*(?P<value>-?\d+(?:\.\d+)?)$")
+_KEYED = re.compile(r"^(?P<field>type|class|category|method|version|game)\s*(?P<op>!=|:|=)\s*(?P<value>.+)$")
+_NEGATION = re.compile(r"^(?:not|no|non|exclude|without)[\s-]+|^!")
+
+_ATTACK = STAT_NAMES.index('attack')
+_SP_ATTACK = STAT_NAMES.index('special-attack')
+
+class MoveView:
+    """Columns for one Pokémon's learnset entries, with move attributes broadcast per entry."""
+
+    def __init__(self, database: MoveDatabase, record: PokemonRecord, version_group: Optional[str]):
+        learnset = database.learnable(record.name, version_group)
+        rows = learnset.rows
+        self.rows = rows
+        self.methods = np.array(database.methods, dtype=object)[learnset.methods]
+        self.columns: Dict[str, np.ndarray] = {
+            'power': database.power[rows],
+            'accuracy': database.accuracy[rows],
+            'pp': database.pp[rows],
+            'priority': database.priority[rows].astype(np.float64),
+            'level': learnset.levels.astype(np.float64)
+        }
+        self.type = database.type[rows]
+        self.damage_class = database.damage_class[rows]
+        own_types = [TYPE_INDEX[t] for t in record.types if t in TYPE_INDEX]
+        self.damaging = (self.damage_class < MOVE_CLASSES.index('status')) & (np.nan_to_num(self.columns['power']) > 0)
+        self.stab = self.damaging & np.isin(self.type, own_types)
+
+        # Power x accuracy x STAB, scaled by the matching attacking stat relative to the higher one
+        attack, sp_attack = record.stats[_ATTACK], record.stats[_SP_ATTACK]
+        stat = np.where(self.damage_class == MOVE_CLASSES.index('physical'), attack, sp_attack)
+        accuracy = np.where(np.isnan(self.columns['accuracy']), 100, self.columns['accuracy']) / 100
+        self.effective = np.where(
+            self.damaging,
+            np.nan_to_num(self.columns['power']) * accuracy * np.where(self.stab, STAB_MULTIPLIER, 1.0)
+            * stat / max(attack, sp_attack, 1),
+            0
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+Predicate = Callable[[MoveView], np.ndarray]
+
+def _parse_clause(clause: str) -> Tuple[str, Predicate]:
+    """Turn one clause such as 'stab', 'type: fire' or 'power >= 80' into a (description, predicate) pair."""
+    negate = False
+    match = _NEGATION.match(clause)
+    if match:
+        negate = True
+        clause = clause[match.end():].strip()
+
+    numeric = _NUMERIC.match(clause)
+    keyed = _KEYED.match(clause)
+    if numeric:
+        column = MOVE_FIELDS.get(numeric['field'])
+        if column is None:
+            raise ValueError(f"Unknown field '{numeric['field']}'. Numeric fields: {', '.join(sorted(set(MOVE_FIELDS.values())))}")
+        compare, value = _COMPARISONS[numeric['op']], float(numeric['value'])
+        predicate = lambda view: compare(view.columns[column], value)
+        description = f"{column} {numeric['op']} {numeric['value']}"
+    elif keyed:
+        field, value = keyed['field'], normalize_name(keyed['value'])
+        negate = negate != (keyed['op'] == '!=')
+        if field == 'type':
+            if value not in BATTLE_TYPES:
+                raise ValueError(f"Unknown type '{value}'")
+            predicate = lambda view: view.type == TYPE_INDEX[value]
+            description = f"type {value}"
+        elif field in ('class', 'category'):
+            if value not in MOVE_CLASSES:
+                raise ValueError(f"Unknown move class '{value}', expected one of {', '.join(MOVE_CLASSES)}")
+            predicate = lambda view: view.damage_class == MOVE_CLASSES.index(value)
+            description = value
+        elif field == 'method':
+            method = METHOD_ALIASES.get(value, value)
+            predicate = lambda view: view.methods == method
+            description = f"learned by {method}"
+        else:
+            raise ValueError("Give the version only once, e.g. 'version: scarlet-violet'")
+    elif clause == 'stab':
+        predicate, description = (lambda view: view.stab), 'stab'
+    elif clause in ('damaging', 'attacking', 'attacks'):
+        predicate, description = (lambda view: view.damaging), 'damaging'
+    elif clause in MOVE_CLASSES:
+        predicate, description = (lambda view: view.damage_class == MOVE_CLASSES.index(clause)), clause
+    elif clause in BATTLE_TYPES:
+        predicate, description = (lambda view: view.type == TYPE_INDEX[clause]), f"type {clause}"
+    elif normalize_name(clause) in METHOD_ALIASES:
+        method = METHOD_ALIASES[normalize_name(clause)]
+        predicate, description = (lambda view: view.methods == method), f"learned by {method}"
+    elif clause == 'priority':
+        predicate, description = (lambda view: view.columns['priority'] > 0), 'priority'
+    else:
+        raise ValueError(
+            f"Could not understand filter '{clause}'. Try 'stab', 'coverage', 'type: fire', 'physical', "
+            "'power >= 80', 'method: machine' or 'version: scarlet-violet'."
+        )
+
+    if negate:
+        return f"not {description}", lambda view: ~predicate(view)
+    return description, predicate
+
+def parse_move_filters(filters: str) -> Tuple[List[Tuple[str, Predicate]], Optional[str], bool]:
+    """Parse a filter string such as "stab, physical, power >= 80, version: scarlet-violet".
+
+    Returns the predicates, the requested version (if any) and whether
+    'coverage' asked for the best non-STAB move of each type.
+    """
+    predicates, version, coverage = [], None, False
+    text = filters.strip().lower()
+    for clause in _SPLIT.split(text) if text else []:
+        if not clause:
+            continue
+        keyed = _KEYED.match(clause)
+        if keyed and keyed['field'] in ('version', 'game'):
+            version = normalize_name(keyed['value'])
+        elif clause == 'coverage':
+            coverage = True
+            predicates.append(('coverage', lambda view: view.damaging & ~view.stab))
+        else:
+            predicates.append(_parse_clause(clause))
+    return predicates, version, coverage
+
+class MovesetModule:
+    def __init__(self, info_module: Optional[InfoRetrievalModule] = None):
+        self.info_module = info_module if info_module is not None else InfoRetrievalModule()
+
+    async def get_moveset(self, pokemon_name: str, filters: str = "", limit: int = 15) -> str:
+        """Rank a Pokémon's learnable moves from the local move database, e.g. its strongest STAB or coverage moves."""
+        try:
+            predicates, version, coverage = parse_move_filters(filters or "")
+        except ValueError as e:
+            return str(e)
+        limit = max(1, min(int(limit), MAX_MOVESET_LIMIT))
+
+        record = await self.info_module.make_pokemon_request(pokemon_name)
+        if not record:
+            return self.info_module.not_found_message(pokemon_name)
+        database = await self.info_module.get_move_database()
+        if database is None:
+            return "Movesets need the offline dex snapshot. Build it with build_dex.py and set POKEMON_SNAPSHOT."
+        if record.name not in database:
+            return f"No learnset data for {record.display_name} in the dex snapshot. Rebuild it with build_dex.py to include learnsets."
+
+        try:
+            version_group = database.version_group(version) if version else database.latest_version_group(record.name)
+        except ValueError as e:
+            return str(e)
+
+        started = time.perf_counter()
+        view = MoveView(database, record, version_group)
+        mask = np.ones(len(view), dtype=bool)
+        for _, predicate in predicates:
+            mask &= predicate(view)
+
+        # Rank moves by effective power, then name; status moves follow
+        entries = np.flatnonzero(mask)
+        names = np.array([database.names[row] for row in view.rows[entries]], dtype=str)
+        order = np.lexsort((names, -view.effective[entries]))
+        learned: Dict[int, List[str]] = {}
+        for entry in entries[order]:
+            method, level = view.methods[entry], int(view.columns['level'][entry])
+            how = f"Level {level}" if method == 'level-up' else ('TM' if method == 'machine' else method.replace('-', ' ').title())
+            learned.setdefault(int(view.rows[entry]), []).append(how)
+        ranked = list(learned)
+        if coverage:
+            best_by_type: Dict[int, int] = {}
+            for row in ranked:
+                best_by_type.setdefault(int(database.type[row]), row)
+            ranked = list(best_by_type.values())
+        matches = len(ranked)
+        ranked = ranked[:limit]
+        elapsed = (time.perf_counter() - started) * 1000
+
+        description = ', '.join(d for d, _ in predicates) or 'None'
+        if not ranked:
+            return f"{record.display_name} learns no moves matching: {description} ({version_group})."
+
+        def number(value: float) -> str:
+            return '-' if np.isnan(value) else f"{value:g}"
+
+        headers = ['Move', 'Type', 'Class', 'Power', 'Acc', 'PP', 'Prio', 'Eff.', 'Learned']
+        rows = []
+        for row in ranked:
+            entry = entries[view.rows[entries] == row][0]
+            type_index = database.type[row]
+            rows.append([
+                database.names[row].replace('-', ' ').title(),
+                TYPE_NAMES[type_index].title() if type_index >= 0 else 'Unknown',
+                MOVE_CLASSES[database.damage_class[row]].title(),
+                number(database.power[row]),
+                number(database.accuracy[row]),
+                number(database.pp[row]),
+                str(database.priority[row]),
+                f"{view.effective[entry]:.0f}" if view.damaging[entry] else '-',
+                ', '.join(dict.fromkeys(learned[row]))
+            ])
+        widths = [max(len(h), *(len(cells[i]) for cells in rows)) for i, h in enumerate(headers)]
+        header = ' | '.join(h.ljust(w) for h, w in zip(headers, widths)).rstrip()
+        table_lines = [header, '-' * len(header)] + [
+            ' | '.join(c.ljust(w) for c, w in zip(cells, widths)).rstrip() for cells in rows
+        ]
+
+        return f"""
+Moveset: {record.display_name} ({version_group})
+==============================
+
+Types: {', '.join(t.title() for t in record.types)}
+Filters: {description}{' (best move of each type)' if coverage else ''}
+Matches: {matches} of {len(np.unique(view.rows))} learnable moves (showing {len(ranked)}, {elapsed:.1f} ms)
+
+{chr(10).join(table_lines)}
+
+Eff. is power x accuracy x STAB, scaled by the matching attacking stat relative to {record.display_name}'s higher one.
+"""
@@ -0,0 +1,93 @@
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Spoken prefixes for regional and battle forms, mapped to PokeAPI name suffixes
+FORM_PREFIXES = {
+    'alolan': 'alola',
+    'galarian': 'galar',
+    'hisuian': 'hisui',
+    'paldean': 'paldea',
+    'mega': 'mega',
+    'primal': 'primal',
+    'gigantamax': 'gmax',
+    'gmax': 'gmax'
+}
+
+_SYMBOLS = {'♀': '-f', '♂': '-m', '&': ' and '}
+_DROP = re.compile(r"[.'’:%]")
+_SEPARATORS = re.compile(r"[\s_]+")
+_INVALID = re.compile(r"[^a-z0-9-]")
+_DASHES = re.compile(r"-{2,}")
+
+def normalize_name(name: str) -> str:
+    """Normalize a user-typed name to PokeAPI style, e.g. "Mr. Mime" -> "mr-mime"."""
+    for symbol, replacement in _SYMBOLS.items():
+        name = name.replace(symbol, replacement)
+    # Strip accents (Flabébé -> flabebe)
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    name = _DROP.sub('', name.strip().lower())
+    name = _SEPARATORS.sub('-', name)
+    name = _INVALID.sub('', name)
+    return _DASHES.sub('-', name).strip('-')
+
+def _trigrams(name: str) -> set:
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class NameIndex:
+    """In-memory index of every known Pokémon name for local resolution and suggestions."""
+
+    def __init__(self, names: Iterable[Tuple[str, int]]):
+        ordered = sorted(names, key=lambda item: item[1])
+        self.names = [name for name, _ in ordered]
+        self._known = set(self.names)
+        # Base species name -> its default form, e.g. "giratina" -> "giratina-altered"
+        self._default_forms: Dict[str, str] = {}
+        for name in self.names:
+            base = name.split('-', 1)[0]
+            if base != name and base not in self._known:
+                self._default_forms.setdefault(base, name)
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for gram in _trigrams(name):
+                self._postings[gram].append(i)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._known
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Map a user-typed name to a known PokeAPI name, or None if it is unknown."""
+        normalized = normalize_name(name)
+        if normalized in self._known:
+            return normalized
+
+        # "alolan raichu" -> "raichu-alola", "mega charizard x" -> "charizard-mega-x"
+        words = normalized.split('-')
+        if len(words) > 1 and words[0] in FORM_PREFIXES:
+            candidate = '-'.join([words[1], FORM_PREFIXES[words[0]], *words[2:]])
+            if candidate in self._known:
+                return candidate
+
+        return self._default_forms.get(normalized)
+
+    def suggest(self, name: str, limit: int = 3, min_score: float = 0.3) -> List[str]:
+        """Return the closest known names by trigram similarity."""
+        query = _trigrams(normalize_name(name))
+        if not query:
+            return []
+        shared = Counter()
+        for gram in query:
+            for i in self._postings.get(gram, ()):
+                shared[i] += 1
+        scored = []
+        for i, count in shared.items():
+            score = count / (len(query) + len(_trigrams(self.names[i])) - count)
+            if score >= min_score:
+                scored.append((score, self.names[i]))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [name for _, name in scored[:limit]]
@@ -0,0 +1,146 @@
+from sys import intern
+from typing import Any, Dict, Optional, Tuple
+
+STAT_NAMES = ('hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed')
+
+def _names(items: list, key: str) -> Tuple[str, ...]:
+    return tuple(intern(item[key]['name']) for item in items)
+
+def evolution_stages(chain: Dict[str, Any]) -> Tuple[str, ...]:
+    """Flatten an /evolution-chain payload into stages; branches share a stage, e.g. 'vaporeon/jolteon'."""
+    stages = []
+    links = [chain.get('chain', chain)]
+    while links:
+        stages.append(intern('/'.join(link['species']['name'] for link in links)))
+        links = [child for link in links for child in link.get('evolves_to', [])]
+    return tuple(stages)
+
+class PokemonRecord:
+    """Compact projection of a /pokemon payload holding only the fields the modules use.
+
+    Type, ability, move, item and version names are interned, so thousands of
+    cached records share a single copy of each string.
+    """
+
+    # Bump when the projection changes so stale cached records are ignored
+    VERSION = 3
+
+    __slots__ = (
+        'id', 'name', 'order', 'height', 'weight', 'base_experience', 'species',
+        'types', 'abilities', 'stats', 'moves', 'held_items', 'game_versions',
+        'front_sprite', 'back_sprite',
+        'base_happiness', 'capture_rate', 'is_legendary', 'is_mythical', 'is_baby', 'evolution_chain'
+    )
+
+    def __init__(
+        self,
+        id: Optional[int],
+        name: str,
+        order: Optional[int] = None,
+        height: int = 0,
+        weight: int = 0,
+        base_experience: Optional[int] = None,
+        species: Optional[str] = None,
+        types: Tuple[str, ...] = (),
+        abilities: Tuple[str, ...] = (),
+        stats: Tuple[int, ...] = (0, 0, 0, 0, 0, 0),
+        moves: Tuple[str, ...] = (),
+        held_items: Tuple[str, ...] = (),
+        game_versions: Tuple[str, ...] = (),
+        front_sprite: Optional[str] = None,
+        back_sprite: Optional[str] = None,
+        base_happiness: Optional[int] = None,
+        capture_rate: Optional[int] = None,
+        is_legendary: bool = False,
+        is_mythical: bool = False,
+        is_baby: bool = False,
+        evolution_chain: Tuple[str, ...] = ()
+    ):
+        self.id = id
+        self.name = name
+        self.order = order
+        self.height = height
+        self.weight = weight
+        self.base_experience = base_experience
+        self.species = species
+        self.types = types
+        self.abilities = abilities
+        self.stats = stats
+        self.moves = moves
+        self.held_items = held_items
+        self.game_versions = game_versions
+        self.front_sprite = front_sprite
+        self.back_sprite = back_sprite
+        self.base_happiness = base_happiness
+        self.capture_rate = capture_rate
+        self.is_legendary = is_legendary
+        self.is_mythical = is_mythical
+        self.is_baby = is_baby
+        self.evolution_chain = evolution_chain
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "PokemonRecord":
+        """Project a PokeAPI /pokemon payload (full or snapshot-compacted)."""
+        base_stats = {stat['stat']['name']: stat['base_stat'] for stat in data.get('stats', [])}
+        sprites = data.get('sprites') or {}
+        species = data.get('species') or {}
+        return cls(
+            id=data.get('id'),
+            name=data.get('name', 'unknown'),
+            order=data.get('order'),
+            height=data.get('height') or 0,
+            weight=data.get('weight') or 0,
+            base_experience=data.get('base_experience'),
+            species=species.get('name'),
+            types=_names(sorted(data.get('types', []), key=lambda t: t.get('slot', 0)), 'type'),
+            abilities=_names(data.get('abilities', []), 'ability'),
+            stats=tuple(base_stats.get(name, 0) for name in STAT_NAMES),
+            moves=_names(data.get('moves', []), 'move'),
+            held_items=_names(data.get('held_items', []), 'item'),
+            game_versions=_names(data.get('game_indices', []), 'version'),
+            front_sprite=sprites.get('front_default'),
+            back_sprite=sprites.get('back_default')
+        )
+
+    def apply_species(self, species: Dict[str, Any]) -> None:
+        """Merge the /pokemon-species fields shown alongside the Pokémon."""
+        self.base_happiness = species.get('base_happiness')
+        self.capture_rate = species.get('capture_rate')
+        self.is_legendary = bool(species.get('is_legendary', False))
+        self.is_mythical = bool(species.get('is_mythical', False))
+        self.is_baby = bool(species.get('is_baby', False))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PokemonRecord":
+        """Rebuild a record from the output of to_dict."""
+        record = cls(data['id'], data['name'])
+        for field in cls.__slots__:
+            value = data.get(field)
+            if isinstance(value, list):
+                value = tuple(intern(v) if isinstance(v, str) else v for v in value)
+            if value is not None:
+                setattr(record, field, value)
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dict for the persistent cache."""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def stat(self, name: str) -> int:
+        """Return a base stat by its PokeAPI name, e.g. 'special-attack'."""
+        return self.stats[STAT_NAMES.index(name)]
+
+    @property
+    def stats_by_name(self) -> Dict[str, int]:
+        return dict(zip(STAT_NAMES, self.stats))
+
+    @property
+    def total_stats(self) -> int:
+        return sum(self.stats)
+
+    @property
+    def display_name(self) -> str:
+        return self.name.title()
+
+    def __repr__(self) -> str:
+        return f"PokemonRecord(id={self.id}, name={self.name!r}, types={self.types})"
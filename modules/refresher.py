@@ -0,0 +1,96 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+class RefreshQueue:
+    """Bounded queue of background refreshes, run by a few worker tasks.
+
+    Each key is queued at most once at a time, and when the queue is full
+    new refreshes are dropped rather than delaying the caller; a dropped
+    key is simply scheduled again the next time its stale value is served.
+    """
+
+    def __init__(self, maxsize: int = 256, workers: int = 4):
+        self.maxsize = maxsize
+        self.workers = max(1, workers)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pending: Set[str] = set()
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_env(cls) -> "RefreshQueue":
+        """Build a queue from POKEMON_REFRESH_QUEUE_SIZE and POKEMON_REFRESH_WORKERS."""
+        return cls(
+            maxsize=int(os.getenv("POKEMON_REFRESH_QUEUE_SIZE", "256")),
+            workers=int(os.getenv("POKEMON_REFRESH_WORKERS", "4"))
+        )
+
+    def schedule(self, key: str, refresh: Callable[[], Awaitable[object]]) -> bool:
+        """Queue refresh() to run in the background unless key is already queued; never blocks.
+
+        Returns whether the refresh was queued.
+        """
+        if key in self._pending:
+            return False
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        if self._queue is None or not self._tasks or self._tasks[0].get_loop() is not loop:
+            self._start()
+        try:
+            self._queue.put_nowait((key, refresh))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self._pending.add(key)
+        self.scheduled += 1
+        return True
+
+    def _start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._pending.clear()
+        self._tasks = [asyncio.create_task(self._work(self._queue)) for _ in range(self.workers)]
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while True:
+            key, refresh = await queue.get()
+            try:
+                await refresh()
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # The stale value stays in place and the next read retries
+                self.failed += 1
+            finally:
+                self._pending.discard(key)
+                queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued refresh has finished."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Cancel the workers and drop queued refreshes."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queue = None
+        self._pending.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'maxsize': self.maxsize,
+            'scheduled': self.scheduled,
+            'completed': self.completed,
+            'failed': self.failed,
+            'dropped': self.dropped
+        }
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from .records import STAT_NAMES, PokemonRecord
+
+ROLE_NAMES = ('attacker', 'defender', 'support', 'speed', 'tank')
+
+# Per-Pokémon features a heuristic can weight: the six base stats plus derived ones
+ROLE_FEATURES = STAT_NAMES + ('best-attack', 'total')
+
+# Each role scores a Pokémon as a weighted sum of its standardized features.
+# Bump 'version' when changing the defaults so derived indexes are rebuilt.
+DEFAULT_ROLE_HEURISTICS = {
+    'version': 1,
+    'roles': {
+        'attacker': {'best-attack': 1.0, 'speed': 0.2},
+        'defender': {'defense': 0.5, 'special-defense': 0.5, 'hp': 0.2},
+        'support': {'hp': 0.4, 'special-defense': 0.4, 'defense': 0.2, 'best-attack': -0.6},
+        'speed': {'speed': 1.0, 'best-attack': 0.5},
+        'tank': {'hp': 1.0, 'defense': 0.3, 'special-defense': 0.3, 'speed': -0.3}
+    }
+}
+
+_loaded: Dict[str, Any] = {}
+
+class RoleHeuristics:
+    """Versioned role weights; the version changes whenever the weights do."""
+
+    def __init__(self, config: Dict[str, Any]):
+        roles = config.get('roles', {})
+        unknown = set(roles) - set(ROLE_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown roles in heuristics: {', '.join(sorted(unknown))}")
+        self.weights = np.zeros((len(ROLE_FEATURES), len(ROLE_NAMES)))
+        for j, role in enumerate(ROLE_NAMES):
+            for feature, weight in roles.get(role, {}).items():
+                if feature not in ROLE_FEATURES:
+                    raise ValueError(f"Unknown role feature '{feature}', expected one of {', '.join(ROLE_FEATURES)}")
+                self.weights[ROLE_FEATURES.index(feature), j] = weight
+        digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()
+        self.version = f"{config.get('version', 0)}-{digest[:8]}"
+
+    @classmethod
+    def load(cls) -> "RoleHeuristics":
+        """Load the heuristics from POKEMON_ROLE_HEURISTICS (a JSON file) or the defaults.
+
+        The file is re-read only when its modification time changes.
+        """
+        path = os.getenv("POKEMON_ROLE_HEURISTICS", "")
+        mtime = os.path.getmtime(path) if path else None
+        if _loaded.get('key') != (path, mtime):
+            if path:
+                with open(path, encoding='utf-8') as f:
+                    config = json.load(f)
+            else:
+                config = DEFAULT_ROLE_HEURISTICS
+            _loaded['heuristics'] = cls(config)
+            _loaded['key'] = (path, mtime)
+        return _loaded['heuristics']
+
+def _features(stats: np.ndarray) -> np.ndarray:
+    """Expand an (n, 6) base stat matrix into the (n, n_features) feature matrix."""
+    attack = stats[:, STAT_NAMES.index('attack')]
+    sp_attack = stats[:, STAT_NAMES.index('special-attack')]
+    return np.column_stack([stats, np.maximum(attack, sp_attack), stats.sum(axis=1)]).astype(np.float64)
+
+class RoleIndex:
+    """Role scores for a whole dex, computed in one vectorized pass.
+
+    Every role keeps its Pokémon ranked by score, so lookups by name and
+    top-k queries per role are dictionary and slice operations.
+    """
+
+    def __init__(self, records: Sequence[PokemonRecord], heuristics: RoleHeuristics):
+        self.version = heuristics.version
+        self.names = [record.name for record in records]
+        self.rows = {name: i for i, name in enumerate(self.names)}
+        self._weights = heuristics.weights
+
+        features = _features(np.array([record.stats for record in records], dtype=np.float64).reshape(-1, 6))
+        self._feature_mean = features.mean(axis=0)
+        self._feature_std = features.std(axis=0) + 1e-9
+        raw = ((features - self._feature_mean) / self._feature_std) @ self._weights
+        # Standardize each role's scores so no role wins just by having larger weights
+        self._score_mean = raw.mean(axis=0)
+        self._score_std = raw.std(axis=0) + 1e-9
+        self.scores = (raw - self._score_mean) / self._score_std
+        self.primary = self.scores.argmax(axis=1) if len(self.names) else np.zeros(0, dtype=np.int64)
+        # role -> row indices ranked by that role's score, best first
+        self.ranked = {
+            role: np.argsort(-self.scores[:, j], kind='stable') for j, role in enumerate(ROLE_NAMES)
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def role_of(self, name: str) -> Optional[str]:
+        """Primary role of an indexed Pokémon, or None if it is not in the index."""
+        row = self.rows.get(name)
+        return ROLE_NAMES[self.primary[row]] if row is not None else None
+
+    def classify(self, stats: Sequence[int]) -> str:
+        """Primary role for base stats outside the index, scored against the indexed dex."""
+        features = _features(np.array([stats], dtype=np.float64))
+        raw = ((features - self._feature_mean) / self._feature_std) @ self._weights
+        return ROLE_NAMES[int((((raw - self._score_mean) / self._score_std)[0]).argmax())]
+
+    def primary_roles(self) -> List[str]:
+        return [ROLE_NAMES[i] for i in self.primary]
+
+    def top(self, role: str, limit: int = 10, primary_only: bool = True) -> List[str]:
+        """Best-scoring Pokémon for a role, optionally only those whose primary role it is."""
+        ranked = self.ranked[role]
+        if primary_only:
+            ranked = ranked[self.primary[ranked] == ROLE_NAMES.index(role)]
+        return [self.names[i] for i in ranked[:limit]]
@@ -0,0 +1,192 @@
+import re
+import time
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from .dex import FLAG_NAMES, NUMERIC_ALIASES, DexTable, column_name, flag_name
+from .executor import get_executor
+from .info_retrieval import InfoRetrievalModule
+from .names import normalize_name
+from .singleflight import SingleFlight
+from .type_chart import BATTLE_TYPES
+
+MAX_SEARCH_LIMIT = 100
+
+_COMPARISONS = {
+    '>': np.greater, '>=': np.greater_equal,
+    '<': np.less, '<=': np.less_equal,
+    '=': np.equal, '==': np.equal, '!=': np.not_equal
+}
+_SPLIT = re.compile(r"\s*(?:,|;|\band\b)\s*")
+_NUMERIC = re.compile(r"^(?P<field>[a-z][a-z .\-_]*?)\s*(?P<op>>=|<=|==|!=|>|<|=)\s*(?P<value>-?\d+(?:\.\d+)?)$")
+_KEYED = re.compile(rf"^(?P<field>types?|ability|name|{'|'.join(FLAG_NAMES)})\s*(?P<op>!=|:|=)\s*(?P<value>.+)$")
+_NEGATION = re.compile(r"^(?:not|no|non|exclude|without)[\s-]+|^!")
+
+Predicate = Callable[[DexTable], np.ndarray]
+
+def _truthy(value: str) -> bool:
+    if value in ('true', 'yes', '1', 'y'):
+        return True
+    if value in ('false', 'no', '0', 'n'):
+        return False
+    raise ValueError(f"Expected true or false, got '{value}'")
+
+def _parse_clause(clause: str) -> Tuple[str, Predicate]:
+    """Turn one clause such as 'speed > 100' or 'type: fire' into a (description, predicate) pair."""
+    negate = False
+    match = _NEGATION.match(clause)
+    if match:
+        negate = True
+        clause = clause[match.end():].strip()
+
+    numeric = _NUMERIC.match(clause)
+    if numeric:
+        column = column_name(numeric['field'])
+        if column is None:
+            raise ValueError(
+                f"Unknown field '{numeric['field']}'. Numeric fields: {', '.join(sorted(set(NUMERIC_ALIASES.values())))}"
+            )
+        compare, value = _COMPARISONS[numeric['op']], float(numeric['value'])
+        predicate = lambda table: compare(table.columns[column], value)
+        description = f"{column} {numeric['op']} {numeric['value']}"
+    else:
+        keyed = _KEYED.match(clause)
+        if keyed:
+            field, value = keyed['field'], keyed['value'].strip()
+            negate = negate != (keyed['op'] == '!=')
+        elif clause in BATTLE_TYPES:
+            field, value = 'type', clause
+        elif flag_name(clause):
+            field, value = flag_name(clause), 'true'
+        else:
+            raise ValueError(
+                f"Could not understand filter '{clause}'. Try 'type: fire', 'speed > 100', "
+                "'ability: levitate', 'legendary: false' or 'name: char'."
+            )
+
+        if field in ('type', 'types'):
+            # 'fire/flying' requires both types
+            wanted = [normalize_name(t) for t in re.split(r"[/+&]", value)]
+            for type_name in wanted:
+                if type_name not in BATTLE_TYPES:
+                    raise ValueError(f"Unknown type '{type_name}'")
+            predicate = lambda table: np.logical_and.reduce([table.type_mask(t) for t in wanted])
+            description = f"type {'/'.join(wanted)}"
+        elif field == 'ability':
+            ability = normalize_name(value)
+            predicate = lambda table: table.ability_mask(ability)
+            description = f"ability {ability}"
+        elif field == 'name':
+            fragment = normalize_name(value)
+            predicate = lambda table: np.array([fragment in name for name in table.names], dtype=bool)
+            description = f"name contains {fragment}"
+        else:
+            expected = _truthy(value)
+            predicate = lambda table: table.flags[field] == expected
+            description = field if expected else f"not {field}"
+
+    if negate:
+        return f"not {description}", lambda table: ~predicate(table)
+    return description, predicate
+
+def parse_filters(filters: str) -> List[Tuple[str, Predicate]]:
+    """Parse a filter string such as "type: fire, special-attack > 100, not legendary"."""
+    text = filters.strip().lower()
+    if not text:
+        return []
+    return [_parse_clause(clause) for clause in _SPLIT.split(text) if clause]
+
+def parse_sort(sort: Optional[str]) -> Tuple[Optional[str], bool]:
+    """Parse 'speed', 'speed desc', 'total asc' or '-weight' into (column, descending)."""
+    if not sort or not sort.strip():
+        return None, True
+    text = sort.strip().lower()
+    descending = True
+    if text.startswith('-'):
+        text = text[1:]
+    elif text.startswith('+'):
+        text, descending = text[1:], False
+    words = text.split()
+    if words and words[-1] in ('asc', 'ascending', 'desc', 'descending'):
+        descending = words[-1].startswith('desc')
+        text = ' '.join(words[:-1])
+    column = column_name(text)
+    if column is None:
+        raise ValueError(f"Cannot sort by '{sort}'. Sortable fields: {', '.join(sorted(set(NUMERIC_ALIASES.values())))}")
+    return column, descending
+
+class SearchModule:
+    def __init__(self, info_module: Optional[InfoRetrievalModule] = None):
+        self.info_module = info_module if info_module is not None else InfoRetrievalModule()
+        self.table: Optional[DexTable] = None
+        self._inflight = SingleFlight()
+
+    async def get_table(self) -> Optional[DexTable]:
+        """Return the columnar dex table, building it once from the snapshot."""
+        if self.table is None:
+            self.table = await self._inflight.do('dex-table', self._build_table)
+        return self.table
+
+    async def _build_table(self) -> Optional[DexTable]:
+        records = await self.info_module.get_dex_records()
+        if not records:
+            return None
+        return await get_executor().run(DexTable, records)
+
+    async def search_pokemon(self, filters: str = "", sort: Optional[str] = None, limit: int = 10) -> str:
+        """Filter, sort and rank the whole dex by stats, types, abilities and flags."""
+        try:
+            predicates = parse_filters(filters or "")
+            column, descending = parse_sort(sort)
+        except ValueError as e:
+            return str(e)
+        limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
+
+        table = await self.get_table()
+        if table is None:
+            return "Search needs the offline dex snapshot. Build it with build_dex.py and set POKEMON_SNAPSHOT."
+
+        started = time.perf_counter()
+        try:
+            mask = np.ones(len(table), dtype=bool)
+            for _, predicate in predicates:
+                mask &= predicate(table)
+        except ValueError as e:
+            return str(e)
+        rows = table.top_k(mask, column, descending, limit)
+        elapsed = (time.perf_counter() - started) * 1000
+        matches = int(mask.sum())
+
+        if not len(rows):
+            return f"No Pokémon match: {', '.join(d for d, _ in predicates) or 'all'}."
+
+        headers = ['#', 'Name', 'Types', 'HP', 'Atk', 'Def', 'SpA', 'SpD', 'Spe', 'Total']
+        extra = column if column is not None and column not in ('hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed', 'total') else None
+        if extra:
+            headers.append(extra.replace('-', ' ').title())
+        lines = []
+        for position, row in enumerate(rows, start=1):
+            record = table.records[row]
+            cells = [
+                str(position), record.display_name, '/'.join(t.title() for t in record.types),
+                *(str(v) for v in record.stats), str(record.total_stats)
+            ]
+            if extra:
+                value = table.columns[extra][row]
+                cells.append('Unknown' if np.isnan(value) else f"{value:g}")
+            lines.append(cells)
+        widths = [max(len(h), *(len(cells[i]) for cells in lines)) for i, h in enumerate(headers)]
+        header = ' | '.join(h.ljust(w) for h, w in zip(headers, widths)).rstrip()
+        table_lines = [header, '-' * len(header)] + [
+            ' | '.join(c.ljust(w) for c, w in zip(cells, widths)).rstrip() for cells in lines
+        ]
+
+        return f"""
+Pokémon Search Results
+=====================
+
+Filters: {', '.join(d for d, _ in predicates) if predicates else 'None'}
+Sorted by: {f"{column} ({'highest' if descending else 'lowest'} first)" if column else 'Pokédex number'}
+Matches: {matches} of {len(table)} (showing {len(rows)}, {elapsed:.1f} ms)
+
+{chr(10).join(table_lines)}
+"""
@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from .fastjson import dumps, loads
+
+DEFAULT_SNAPSHOT = Path(__file__).resolve().parent.parent / "data" / "dex.sqlite3"
+
+# PokeAPI resource kinds copied into a snapshot
+SNAPSHOT_KINDS = ('pokemon', 'pokemon-species', 'evolution-chain', 'type', 'move', 'version-group')
+
+def _name(ref: Optional[dict]) -> Optional[str]:
+    return ref.get('name') if ref else None
+
+def _compact_pokemon(data: dict) -> dict:
+    """Keep only the parts of a /pokemon payload the modules read."""
+    sprites = data.get('sprites') or {}
+    return {
+        'id': data.get('id'),
+        'name': data.get('name'),
+        'order': data.get('order'),
+        'height': data.get('height'),
+        'weight': data.get('weight'),
+        'base_experience': data.get('base_experience'),
+        'species': {'name': _name(data.get('species'))},
+        'types': [{'slot': t['slot'], 'type': {'name': t['type']['name']}} for t in data.get('types', [])],
+        'abilities': [
+            {'ability': {'name': a['ability']['name']}, 'is_hidden': a.get('is_hidden', False)}
+            for a in data.get('abilities', [])
+        ],
+        'stats': [
+            {'base_stat': s['base_stat'], 'stat': {'name': s['stat']['name']}}
+            for s in data.get('stats', [])
+        ],
+        'moves': [
+            {
+                'move': {'name': m['move']['name']},
+                'version_group_details': [
+                    {
+                        'level_learned_at': d.get('level_learned_at', 0),
+                        'move_learn_method': {'name': _name(d.get('move_learn_method'))},
+                        'version_group': {'name': _name(d.get('version_group'))}
+                    }
+                    for d in m.get('version_group_details', [])
+                ]
+            }
+            for m in data.get('moves', [])
+        ],
+        'held_items': [{'item': {'name': i['item']['name']}} for i in data.get('held_items', [])],
+        'game_indices': [{'version': {'name': g['version']['name']}} for g in data.get('game_indices', [])],
+        'sprites': {
+            'front_default': sprites.get('front_default'),
+            'back_default': sprites.get('back_default')
+        }
+    }
+
+def _compact_species(data: dict) -> dict:
+    """Keep only the species fields the modules read."""
+    return {
+        'id': data.get('id'),
+        'name': data.get('name'),
+        'order': data.get('order'),
+        'base_happiness': data.get('base_happiness'),
+        'capture_rate': data.get('capture_rate'),
+        'is_legendary': data.get('is_legendary', False),
+        'is_mythical': data.get('is_mythical', False),
+        'is_baby': data.get('is_baby', False),
+        'generation': {'name': _name(data.get('generation'))},
+        'evolution_chain': {'url': (data.get('evolution_chain') or {}).get('url')},
+        'varieties': [
+            {'is_default': v.get('is_default', False), 'pokemon': {'name': v['pokemon']['name']}}
+            for v in data.get('varieties', [])
+        ]
+    }
+
+def _compact_chain_link(link: dict) -> dict:
+    return {
+        'species': {'name': link['species']['name']},
+        'evolves_to': [_compact_chain_link(child) for child in link.get('evolves_to', [])]
+    }
+
+def _compact_evolution_chain(data: dict) -> dict:
+    """Keep only the species names of an evolution chain."""
+    return {'id': data.get('id'), 'chain': _compact_chain_link(data['chain'])}
+
+def _compact_relations(relations: dict) -> dict:
+    return {key: [{'name': r['name']} for r in value] for key, value in relations.items()}
+
+def _compact_type(data: dict) -> dict:
+    """Keep a type's current and historical damage relations."""
+    return {
+        'id': data.get('id'),
+        'name': data.get('name'),
+        'generation': {'name': _name(data.get('generation'))},
+        'damage_relations': _compact_relations(data.get('damage_relations', {})),
+        'past_damage_relations': [
+            {
+                'generation': {'name': _name(past.get('generation'))},
+                'damage_relations': _compact_relations(past.get('damage_relations', {}))
+            }
+            for past in data.get('past_damage_relations', [])
+        ]
+    }
+
+def _compact_move(data: dict) -> dict:
+    """Keep the battle-relevant fields of a move."""
+    return {
+        'id': data.get('id'),
+        'name': data.get('name'),
+        'type': {'name': _name(data.get('type'))},
+        'damage_class': {'name': _name(data.get('damage_class'))},
+        'power': data.get('power'),
+        'accuracy': data.get('accuracy'),
+        'pp': data.get('pp'),
+        'priority': data.get('priority', 0),
+        'generation': {'name': _name(data.get('generation'))}
+    }
+
+def _compact_version_group(data: dict) -> dict:
+    """Keep a version group's release order and the game versions it covers."""
+    return {
+        'id': data.get('id'),
+        'name': data.get('name'),
+        'order': data.get('order'),
+        'generation': {'name': _name(data.get('generation'))},
+        'versions': [{'name': v['name']} for v in data.get('versions', [])]
+    }
+
+_COMPACTORS = {
+    'pokemon': _compact_pokemon,
+    'pokemon-species': _compact_species,
+    'evolution-chain': _compact_evolution_chain,
+    'type': _compact_type,
+    'move': _compact_move,
+    'version-group': _compact_version_group
+}
+
+def compact_resource(kind: str, data: Any) -> Any:
+    """Strip a PokeAPI payload down to the fields the modules read; unknown kinds pass through."""
+    compact = _COMPACTORS.get(kind)
+    return compact(data) if compact is not None else data
+
+def _encode(data: Any) -> bytes:
+    return zlib.compress(dumps(data).encode('utf-8'))
+
+def _decode(blob: bytes) -> Any:
+    return loads(zlib.decompress(blob))
+
+def find_api_root(source: str | os.PathLike) -> Path:
+    """Locate the directory holding per-kind folders in a PokeAPI api-data checkout."""
+    source = Path(source)
+    for candidate in (source, source / "data" / "api" / "v2", source / "api" / "v2"):
+        if (candidate / "pokemon").is_dir():
+            return candidate
+    raise FileNotFoundError(f"No PokeAPI 'pokemon' directory found under {source}")
+
+def _iter_resources(root: Path, kind: str) -> Iterator[dict]:
+    kind_dir = root / kind
+    if not kind_dir.is_dir():
+        return
+    for entry in kind_dir.iterdir():
+        index = entry / "index.json"
+        if entry.is_dir() and index.is_file():
+            with open(index, encoding='utf-8') as f:
+                yield json.load(f)
+
+def build_snapshot(source: str | os.PathLike, output: str | os.PathLike = DEFAULT_SNAPSHOT) -> Dict[str, int]:
+    """Build a compact SQLite snapshot from a directory of PokeAPI-format JSON.
+
+    Returns the number of resources stored per kind.
+    """
+    root = find_api_root(source)
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_output = output.with_suffix(output.suffix + ".tmp")
+    if tmp_output.exists():
+        tmp_output.unlink()
+
+    counts = {}
+    conn = sqlite3.connect(tmp_output)
+    try:
+        conn.executescript("""
+            CREATE TABLE resources (path TEXT PRIMARY KEY, kind TEXT NOT NULL, data BLOB NOT NULL);
+            CREATE TABLE aliases (path TEXT PRIMARY KEY, target TEXT NOT NULL);
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE INDEX resources_kind ON resources (kind);
+        """)
+        for kind in SNAPSHOT_KINDS:
+            count = 0
+            for data in _iter_resources(root, kind):
+                # Evolution chains are unnamed and only addressable by id
+                name = data.get('name') or data.get('id')
+                if name is None:
+                    continue
+                path = f"{kind}/{name}"
+                conn.execute(
+                    "INSERT OR REPLACE INTO resources (path, kind, data) VALUES (?, ?, ?)",
+                    (path, kind, _encode(compact_resource(kind, data)))
+                )
+                if data.get('id') is not None and data.get('name'):
+                    conn.execute(
+                        "INSERT OR REPLACE INTO aliases (path, target) VALUES (?, ?)",
+                        (f"{kind}/{data['id']}", path)
+                    )
+                count += 1
+            counts[kind] = count
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)",
+            [('built_at', str(time.time())), ('source', str(root)), ('counts', json.dumps(counts))]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_output, output)
+    return counts
+
+class DexSnapshot:
+    """Read-only access to a snapshot built by build_snapshot."""
+
+    def __init__(self, path: str | os.PathLike = DEFAULT_SNAPSHOT):
+        self.path = Path(path)
+        if not self.path.is_file():
+            raise FileNotFoundError(f"Dex snapshot not found at {self.path}; run build_dex.py first")
+        self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+    def get(self, path: str) -> Optional[Any]:
+        """Return the stored resource for a path such as 'pokemon/pikachu' or 'type/10'."""
+        path = path.strip('/')
+        row = self._conn.execute(
+            "SELECT data FROM resources WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            row = self._conn.execute(
+                "SELECT r.data FROM aliases a JOIN resources r ON r.path = a.target WHERE a.path = ?",
+                (path,)
+            ).fetchone()
+        return _decode(row[0]) if row else None
+
+    def names(self, kind: str) -> List[str]:
+        """Return the names of every stored resource of a kind."""
+        rows = self._conn.execute(
+            "SELECT path FROM resources WHERE kind = ? ORDER BY path", (kind,)
+        ).fetchall()
+        prefix = len(kind) + 1
+        return [row[0][prefix:] for row in rows]
+
+    def name_ids(self, kind: str) -> List[tuple[str, int]]:
+        """Return (name, id) pairs for every stored resource of a kind."""
+        rows = self._conn.execute(
+            "SELECT a.path, a.target FROM aliases a JOIN resources r ON r.path = a.target WHERE r.kind = ?",
+            (kind,)
+        ).fetchall()
+        prefix = len(kind) + 1
+        return [(target[prefix:], int(path[prefix:])) for path, target in rows]
+
+    def iter_kind(self, kind: str) -> Iterator[Any]:
+        """Yield every stored resource of a kind."""
+        for (blob,) in self._conn.execute("SELECT data FROM resources WHERE kind = ?", (kind,)):
+            yield _decode(blob)
+
+    def meta(self) -> Dict[str, str]:
+        return dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+
+    def close(self) -> None:
+        self._conn.close()
@@ -1,85 +1,346 @@
-from typing import Any, Optional, Dict
-import httpx
+import asyncio
+import time
+from typing import Any, Optional, Dict, List
+import numpy as np
+from .damage import battle_stats, damage_rolls, hits_to_ko, move_arrays, pick_moves
 from .info_retrieval import InfoRetrievalModule
+from .names import normalize_name
+from .singleflight import SingleFlight
+from .type_chart import BATTLE_TYPES, TYPE_NAMES, TypeChart, normalize_generation
 
 class StrategyModule:
-    def __init__(self):
-        self.info_module = InfoRetrievalModule()
-        self.POKEMON_API_BASE = "https://pokeapi.co/api/v2"
-        self.USER_AGENT = "pokemon-app/1.0"
-        self.type_effectiveness_cache = {}
+    def __init__(self, info_module: Optional[InfoRetrievalModule] = None):
+        self.info_module = info_module if info_module is not None else InfoRetrievalModule()
+        self.type_charts: Dict[Optional[str], TypeChart] = {}
+        self._chart_built_at: Dict[Optional[str], float] = {}
+        self._inflight = SingleFlight()
+    
+    async def get_type_chart(self, generation: Optional[str] = None) -> Optional[TypeChart]:
+        """Return the type effectiveness matrix for a generation (current by default), building it once.
+
+        A chart older than the cache TTL is still returned at once while it
+        is rebuilt from revalidated type data in the background.
+        """
+        if generation in self.type_charts:
+            ttl = self.info_module.cache.memory.ttl
+            if (
+                self.info_module.mode != 'offline' and ttl is not None
+                and time.monotonic() - self._chart_built_at[generation] > ttl
+            ):
+                self.info_module.refresher.schedule(
+                    f"chart:{generation}", lambda: self._rebuild_type_chart(generation)
+                )
+            return self.type_charts[generation]
+        
+        return await self._inflight.do(f"chart:{generation}", lambda: self._build_type_chart(generation))
+    
+    async def _rebuild_type_chart(self, generation: Optional[str]) -> None:
+        await asyncio.gather(*[self.info_module.revalidate(f"type/{type_name}") for type_name in BATTLE_TYPES])
+        await self._build_type_chart(generation)
+    
+    async def _build_type_chart(self, generation: Optional[str]) -> Optional[TypeChart]:
+        """Fetch every battle type concurrently (cached or offline) and build the chart."""
+        results = await asyncio.gather(
+            *[self.info_module.fetch_resource(f"type/{type_name}") for type_name in BATTLE_TYPES]
+        )
+        if not all(results):
+            return None
+        
+        chart = TypeChart.from_type_data(dict(zip(BATTLE_TYPES, results)), generation)
+        self.type_charts[generation] = chart
+        self._chart_built_at[generation] = time.monotonic()
+        return chart
     
     async def get_type_effectiveness(self, type_name: str) -> Dict[str, float]:
-        """Get type effectiveness data from PokeAPI."""
-        if type_name in self.type_effectiveness_cache:
-            return self.type_effectiveness_cache[type_name]
-            
-        url = f"{self.POKEMON_API_BASE}/type/{type_name.lower()}"
-        headers = {
-            "User-Agent": self.USER_AGENT,
-            "Accept": "application/json"
-        }
+        """Get the damage multipliers other types deal to a single type, omitting neutral ones."""
+        chart = await self.get_type_chart()
+        if chart is None or type_name.lower() not in TYPE_NAMES:
+            return {}
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=headers, timeout=30.0)
-                response.raise_for_status()
-                type_data = response.json()
-                
-                # Process defensive damage relations
-                effectiveness = {}
-                
-                # Super effective against this type (2x damage)
-                for relation in type_data.get('damage_relations', {}).get('double_damage_from', []):
-                    effectiveness[relation['name']] = 2.0
-                
-                # Not very effective against this type (0.5x damage)
-                for relation in type_data.get('damage_relations', {}).get('half_damage_from', []):
-                    effectiveness[relation['name']] = 0.5
-                
-                # No effect against this type (0x damage)
-                for relation in type_data.get('damage_relations', {}).get('no_damage_from', []):
-                    effectiveness[relation['name']] = 0.0
-                
-                # Cache the results
-                self.type_effectiveness_cache[type_name] = effectiveness
-                return effectiveness
-                
-            except Exception:
-                return {}
+        profile = chart.defensive_profile([type_name.lower()])
+        return {
+            attacking: float(multiplier)
+            for attacking, multiplier in zip(BATTLE_TYPES, profile)
+            if multiplier != 1.0
+        }
     
-    async def get_type_matchups(self, pokemon_name: str) -> str:
+    async def get_type_matchups(self, pokemon_name: str, generation: Optional[str] = None) -> str:
         """Get type effectiveness and counter-strategy recommendations for a Pokémon."""
+        try:
+            generation = normalize_generation(generation)
+        except ValueError as e:
+            return str(e)
+        
         pokemon_data = await self.info_module.make_pokemon_request(pokemon_name)
         
         if not pokemon_data:
-            return f"Unable to find Pokémon '{pokemon_name}'. Please check the spelling and try again."
+            return self.info_module.not_found_message(pokemon_name)
         
-        name = pokemon_data.get('name', 'Unknown').title()
-        types = [t['type']['name'] for t in pokemon_data.get('types', [])]
+        chart = await self.get_type_chart(generation)
+        if chart is None:
+            return "Type data is currently unavailable. Please try again later."
         
-        # Get effectiveness against this Pokemon's types
-        weaknesses = {}
-        for type_name in types:
-            effectiveness = await self.get_type_effectiveness(type_name)
-            for defending_type, multiplier in effectiveness.items():
-                if multiplier >= 2.0:  # Super effective
-                    weaknesses[defending_type] = weaknesses.get(defending_type, 0) + 1
+        name = pokemon_data.display_name
+        types = list(pokemon_data.types)
+        
+        # Multiply the columns of both types so resistances and immunities cancel weaknesses
+        profile = chart.defensive_profile(types)
+        mask = chart.battle_type_mask()
+        attacking = np.array(TYPE_NAMES)
+        
+        def types_taking(selector: np.ndarray) -> list:
+            return [t.title() for t in attacking[mask & selector]]
         
         # Sort weaknesses by effectiveness
-        sorted_weaknesses = sorted(
-            weaknesses.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        order = np.argsort(-profile, kind='stable')
+        sorted_weaknesses = [
+            (TYPE_NAMES[i], profile[i]) for i in order if mask[i] and profile[i] > 1.0
+        ]
+        
+        profile_lines = [
+            ('4x damage from', types_taking(profile >= 4.0)),
+            ('2x damage from', types_taking((profile >= 2.0) & (profile < 4.0))),
+            ('1/2x damage from', types_taking((profile == 0.5))),
+            ('1/4x damage from', types_taking((profile > 0.0) & (profile < 0.5))),
+            ('No damage from', types_taking(profile == 0.0)),
+        ]
         
         strategy = f"""
-Type Matchup Analysis for {name}
+Type Matchup Analysis for {name}{f" ({generation.replace('-', ' ').title()})" if generation else ''}
 
 Pokemon Types: {', '.join([t.title() for t in types])}
 
+Defensive Profile:
+{chr(10).join([f"- {label}: {', '.join(found)}" for label, found in profile_lines if found])}
+
 Counter-Strategy Recommendations:
 - Use Pokemon with these types: {', '.join([w.title() for w, _ in sorted_weaknesses[:3]]) if sorted_weaknesses else 'Any type'}
-- These types are super effective: {', '.join([f"{w.title()} (x{w_count})" for w, w_count in sorted_weaknesses]) if sorted_weaknesses else 'None identified'}
+- These types are super effective: {', '.join([f"{w.title()} (x{multiplier:g})" for w, multiplier in sorted_weaknesses]) if sorted_weaknesses else 'None identified'}
+"""
+        return strategy
+    
+    async def analyze_team_matchups(self, names: List[str], generation: Optional[str] = None) -> str:
+        """Analyze the combined weaknesses, resistances and coverage of a whole team."""
+        try:
+            generation = normalize_generation(generation)
+        except ValueError as e:
+            return str(e)
+        if not names:
+            return "Please provide at least one Pokémon to analyze."
+        
+        # Fetch every member and the chart at the same time
+        chart, records = await asyncio.gather(
+            self.get_type_chart(generation),
+            self.info_module.make_pokemon_requests(names)
+        )
+        if chart is None:
+            return "Type data is currently unavailable. Please try again later."
+        
+        members = [record for record in records if record]
+        missing = [name for name, record in zip(names, records) if not record]
+        if not members:
+            return "\n".join(self.info_module.not_found_message(name) for name in missing)
+        
+        # Members x attacking types multiplier matrix in one vectorized pass
+        mask = chart.battle_type_mask()
+        attacking = np.array(TYPE_NAMES)[mask]
+        pairs = np.array([chart.pair_indices(member.types) for member in members])
+        profiles = chart.defensive_profiles(pairs)[:, mask]
+        
+        weak_counts = (profiles > 1.0).sum(axis=0)
+        resist_counts = (profiles < 1.0).sum(axis=0)
+        worst = profiles.max(axis=0)
+        
+        # Weaknesses shared by two or more members, most widespread first
+        shared = [
+            i for i in np.lexsort((-worst, -weak_counts))
+            if weak_counts[i] >= 2
+        ]
+        # Types that hit someone super effectively while nobody resists them
+        uncovered = [
+            i for i in np.lexsort((-worst, -weak_counts))
+            if weak_counts[i] >= 1 and resist_counts[i] == 0
+        ]
+        
+        # Defending types the team's STAB moves cannot hit super effectively
+        team_types = sorted({t for member in members for t in member.types})
+        offense = chart.offensive_profile(team_types)[mask]
+        coverage_gaps = [t.title() for t in attacking[offense < 2.0]]
+        
+        # Types that would resist the most uncovered threats
+        recommended = []
+        if uncovered:
+            threats = np.flatnonzero(mask)[uncovered]
+            resisted = (chart.matrix[np.ix_(threats, np.flatnonzero(mask))] < 1.0).sum(axis=0)
+            recommended = [
+                f"{attacking[i].title()} (resists {resisted[i]})"
+                for i in np.argsort(-resisted, kind='stable')[:3]
+                if resisted[i] > 0
+            ]
+        
+        def describe(member, row) -> str:
+            weak = [f"{t.title()} x{m:g}" for t, m in zip(attacking, row) if m > 1.0]
+            resist = [t.title() for t, m in zip(attacking, row) if 0.0 < m < 1.0]
+            immune = [t.title() for t, m in zip(attacking, row) if m == 0.0]
+            return (
+                f"{member.display_name} ({', '.join(t.title() for t in member.types)})\n"
+                f"  Weak to: {', '.join(weak) if weak else 'Nothing'}\n"
+                f"  Resists: {', '.join(resist) if resist else 'Nothing'}"
+                + (f"\n  Immune to: {', '.join(immune)}" if immune else '')
+            )
+        
+        analysis = f"""
+Team Matchup Analysis{f" ({generation.replace('-', ' ').title()})" if generation else ''}
+
+Team: {', '.join(member.display_name for member in members)}
+{f"Not found: {', '.join(missing)}" + chr(10) if missing else ''}
+Member Profiles:
+{chr(10).join(describe(member, row) for member, row in zip(members, profiles))}
+
+Shared Weaknesses:
+{chr(10).join(f"- {attacking[i].title()}: {weak_counts[i]} weak, {resist_counts[i]} resist or immune" for i in shared) if shared else '- None'}
+
+Uncovered Threats (no member resists):
+{chr(10).join(f"- {attacking[i].title()}: hits {weak_counts[i]} member(s) super effectively" for i in uncovered) if uncovered else '- None'}
+
+Offensive Coverage Gaps (no super-effective STAB):
+{', '.join(coverage_gaps) if coverage_gaps else 'None'}
+
+Recommendations:
+- {f"Add a Pokémon of these types to cover the gaps: {', '.join(recommended)}" if recommended else 'Every threat is resisted by at least one member'}
+- {f"Watch out for {', '.join(attacking[i].title() for i in shared[:3])} attacks, which pressure several members" if shared else 'No single type pressures several members'}
+"""
+        return analysis
+    
+    async def get_movesets(self, records: List[Any]) -> List[List[dict]]:
+        """Pick each Pokémon's strongest damaging move of each type from its own movepool."""
+        database = await self.info_module.get_move_database()
+        if database is not None and all(record.name in database for record in records):
+            learnsets = [database.payloads_for(record.name) for record in records]
+        else:
+            learnsets = await asyncio.gather(*[
+                self.info_module.fetch_resources([f"move/{move}" for move in record.moves])
+                for record in records
+            ])
+        return [
+            pick_moves(record.stats, record.types, learnset)
+            for record, learnset in zip(records, learnsets)
+        ]
+    
+    async def damage_matrix(
+        self,
+        attackers: List[str],
+        defenders: List[str],
+        moves: Optional[List[str]] = None,
+        level: int = 50,
+        generation: Optional[str] = None
+    ) -> str:
+        """Estimate damage and OHKO/2HKO odds for every attacker x defender x move in one pass."""
+        try:
+            generation = normalize_generation(generation)
+        except ValueError as e:
+            return str(e)
+        if not attackers or not defenders:
+            return "Please provide at least one attacker and one defender."
+        level = max(1, min(int(level), 100))
+        
+        chart, records = await asyncio.gather(
+            self.get_type_chart(generation),
+            self.info_module.make_pokemon_requests(list(attackers) + list(defenders))
+        )
+        if chart is None:
+            return "Type data is currently unavailable. Please try again later."
+        for name, record in zip(list(attackers) + list(defenders), records):
+            if not record:
+                return self.info_module.not_found_message(name)
+        attacker_records, defender_records = records[:len(attackers)], records[len(attackers):]
+        
+        attacker_base = np.array([record.stats for record in attacker_records], dtype=np.float64)
+        if moves:
+            # The same named moves are evaluated for every attacker
+            move_data = await self.info_module.fetch_resources([f"move/{normalize_name(move)}" for move in moves])
+            missing = [move for move, data in zip(moves, move_data) if not data]
+            if missing:
+                return f"Unable to find move(s): {', '.join(missing)}."
+            movesets = [move_data for _ in attacker_records]
+        else:
+            movesets = await self.get_movesets(attacker_records)
+        width = max(1, max(len(moveset) for moveset in movesets))
+        arrays = move_arrays(movesets, width)
+        
+        attacker_stats = battle_stats(attacker_base, level)
+        defender_stats = battle_stats(
+            np.array([record.stats for record in defender_records], dtype=np.float64), level
+        )
+        rolls = damage_rolls(
+            chart,
+            attacker_stats,
+            np.array([chart.pair_indices(record.types) for record in attacker_records]),
+            defender_stats,
+            np.array([chart.pair_indices(record.types) for record in defender_records]),
+            arrays['power'], arrays['type'], arrays['physical'],
+            level
+        )
+        hp = defender_stats[:, 0]
+        low, high = rolls[..., 0], rolls[..., -1]
+        guaranteed = hits_to_ko(low[..., None], hp)[..., 0]
+        possible = hits_to_ko(high[..., None], hp)[..., 0]
+        ohko_chance = (rolls >= hp[None, :, None, None]).mean(axis=-1)
+        # Best move per pairing: fewest guaranteed hits, then highest minimum damage
+        best = np.lexsort((-low, guaranteed), axis=-1)[..., 0]
+        
+        def verdict(i: int, j: int, k: int) -> str:
+            if high[i, j, k] == 0:
+                return 'No damage'
+            if guaranteed[i, j, k] == 1:
+                return 'OHKO'
+            if possible[i, j, k] == 1:
+                return f"{ohko_chance[i, j, k]:.0%} OHKO"
+            hits = int(guaranteed[i, j, k])
+            return f"{hits}HKO" if hits < 10 else '10+HKO'
+        
+        attacker_names = [record.display_name for record in attacker_records]
+        defender_names = [record.display_name for record in defender_records]
+        label_width = max(len(name) for name in attacker_names)
+        cells = [[verdict(i, j, best[i, j]) for j in range(len(defender_records))] for i in range(len(attacker_records))]
+        widths = [max(len(name), *(len(row[j]) for row in cells)) for j, name in enumerate(defender_names)]
+        header = ' | '.join([' ' * label_width] + [n.ljust(w) for n, w in zip(defender_names, widths)]).rstrip()
+        table = [header, '-' * len(header)] + [
+            ' | '.join([name.ljust(label_width)] + [c.ljust(w) for c, w in zip(row, widths)]).rstrip()
+            for name, row in zip(attacker_names, cells)
+        ]
+        
+        def describe_move(moveset: list, k: int) -> str:
+            move = moveset[k]
+            return (
+                f"{move['name'].replace('-', ' ').title()} "
+                f"({move['type']['name'].title()}, {move['damage_class']['name'].title()}, {move['power']})"
+            )
+        
+        details = []
+        for i, attacker in enumerate(attacker_records):
+            details.append(f"{attacker_names[i]}:")
+            for j in range(len(defender_records)):
+                for k in np.argsort(-low[i, j], kind='stable'):
+                    if k >= len(movesets[i]) or arrays['power'][i, k] == 0:
+                        continue
+                    percent_low = low[i, j, k] / hp[j] * 100
+                    percent_high = high[i, j, k] / hp[j] * 100
+                    details.append(
+                        f"  vs {defender_names[j]}: {describe_move(movesets[i], k)} "
+                        f"{percent_low:.0f}-{percent_high:.0f}% - {verdict(i, j, k)}"
+                    )
+        
+        matrix = f"""
+Damage Matrix (Level {level}, neutral nature, 31 IVs, 0 EVs{f", {generation.replace('-', ' ').title()} type chart" if generation else ''})
+====================================
+
+KO Table (best move per matchup; rows attack, columns defend):
+{chr(10).join(table)}
+
+Damage by Move (percent of the defender's HP, lowest to highest roll):
+{chr(10).join(details) if details else 'No damaging moves found.'}
+
+Note: Abilities, items, weather, critical hits and stat changes are not included.
 """
-        return strategy 
\ No newline at end of file
+        return matrix
@@ -1,97 +1,113 @@
+import asyncio
+import time
 from typing import Any, Optional, List, Dict
+from .executor import JobCancelled, get_executor
 from .info_retrieval import InfoRetrievalModule
+from .records import PokemonRecord
+from .singleflight import SingleFlight
+from .strategy import StrategyModule
+from .roles import RoleHeuristics, RoleIndex
+from .team_optimizer import SCORE_WEIGHTS, TeamConstraints, TeamOptimizer
 
 class TeamCompositionModule:
-    def __init__(self):
-        self.info_module = InfoRetrievalModule()
-        self.role_pokemon = {
-            'attacker': ['Charizard', 'Dragonite', 'Tyranitar', 'Gengar', 'Alakazam'],
-            'defender': ['Blastoise', 'Steelix', 'Skarmory', 'Umbreon', 'Chansey'],
-            'support': ['Clefable', 'Blissey', 'Togekiss', 'Whimsicott', 'Amoonguss'],
-            'speed': ['Jolteon', 'Crobat', 'Aerodactyl', 'Weavile', 'Noivern'],
-            'tank': ['Snorlax', 'Aggron', 'Metagross', 'Goodra', 'Toxapex']
-        }
-        
-        self.type_coverage = {
-            'fire': ['water', 'ground', 'rock'],
-            'water': ['electric', 'grass'],
-            'grass': ['fire', 'ice', 'poison', 'flying', 'bug'],
-            'electric': ['ground'],
-            'psychic': ['bug', 'ghost', 'dark'],
-            'ice': ['fire', 'fighting', 'rock', 'steel'],
-            'dragon': ['ice', 'dragon', 'fairy'],
-            'dark': ['fighting', 'bug', 'fairy'],
-            'fairy': ['poison', 'steel'],
-            'fighting': ['flying', 'psychic', 'fairy'],
-            'poison': ['ground', 'psychic'],
-            'ground': ['water', 'grass', 'ice'],
-            'flying': ['electric', 'ice', 'rock'],
-            'bug': ['fire', 'flying', 'rock'],
-            'rock': ['water', 'grass', 'fighting', 'ground', 'steel'],
-            'ghost': ['ghost', 'dark'],
-            'steel': ['fire', 'fighting', 'ground'],
-            'normal': ['fighting']
-        }
+    def __init__(
+        self,
+        info_module: Optional[InfoRetrievalModule] = None,
+        strategy_module: Optional[StrategyModule] = None
+    ):
+        self.info_module = info_module if info_module is not None else InfoRetrievalModule()
+        self.strategy_module = strategy_module if strategy_module is not None else StrategyModule(self.info_module)
+        # Candidate pool used when no dex snapshot is available
+        self.fallback_pool = [
+            'Charizard', 'Dragonite', 'Tyranitar', 'Gengar', 'Alakazam',
+            'Blastoise', 'Steelix', 'Skarmory', 'Umbreon', 'Chansey',
+            'Clefable', 'Blissey', 'Togekiss', 'Whimsicott', 'Amoonguss',
+            'Jolteon', 'Crobat', 'Aerodactyl', 'Weavile', 'Noivern',
+            'Snorlax', 'Aggron', 'Metagross', 'Goodra', 'Toxapex'
+        ]
+        # Keyed by whether the full dex is used; rebuilt when the role heuristics change
+        self.role_indexes: Dict[bool, RoleIndex] = {}
+        self.optimizers: Dict[bool, TeamOptimizer] = {}
+        self._inflight = SingleFlight()
     
-    async def get_pokemon_role(self, pokemon_data: dict) -> str:
-        """Determine a Pokemon's role based on its stats."""
-        stats = {stat['stat']['name']: stat['base_stat'] for stat in pokemon_data.get('stats', [])}
-        
-        attack = stats.get('attack', 0)
-        sp_attack = stats.get('special-attack', 0)
-        defense = stats.get('defense', 0)
-        sp_defense = stats.get('special-defense', 0)
-        speed = stats.get('speed', 0)
-        hp = stats.get('hp', 0)
-        
-        # Calculate total defensive and offensive stats
-        total_defense = defense + sp_defense + hp
-        total_attack = attack + sp_attack
-        
-        if speed > 100 and total_attack > 150:
-            return 'speed'
-        elif total_attack > 150:
-            return 'attacker'
-        elif total_defense > 200:
-            return 'defender'
-        elif hp > 100 and total_defense > 150:
-            return 'tank'
-        else:
+    async def get_pokemon_role(self, pokemon_data: PokemonRecord) -> str:
+        """Look up a Pokemon's role in the role index."""
+        index = await self.get_role_index()
+        if index is None:
             return 'support'
+        return index.role_of(pokemon_data.name) or index.classify(pokemon_data.stats)
     
-    async def suggest_team(self, description: str) -> str:
-        """Suggest a balanced Pokémon team based on a natural language description."""
-        description_lower = description.lower()
-        
-        # Determine team focus from description
-        team_focus = []
-        if 'balanced' in description_lower:
-            team_focus = ['attacker', 'defender', 'support', 'speed', 'tank']
-        elif 'offensive' in description_lower or 'attack' in description_lower:
-            team_focus = ['attacker', 'attacker', 'speed', 'attacker', 'support', 'tank']
-        elif 'defensive' in description_lower or 'defense' in description_lower:
-            team_focus = ['defender', 'tank', 'support', 'defender', 'tank', 'support']
+    async def get_role_index(self) -> Optional[RoleIndex]:
+        """Return the role index for the candidate pool, building it when the heuristics change."""
+        await self._ensure_current()
+        return self.role_indexes.get(self.info_module.snapshot is not None)
+    
+    async def get_optimizer(self) -> Optional[TeamOptimizer]:
+        """Return the team optimizer over the full dex, or over the fallback pool without a snapshot."""
+        await self._ensure_current()
+        return self.optimizers.get(self.info_module.snapshot is not None)
+    
+    async def _ensure_current(self) -> None:
+        full_dex = self.info_module.snapshot is not None
+        heuristics = RoleHeuristics.load()
+        index = self.role_indexes.get(full_dex)
+        if index is None or index.version != heuristics.version:
+            await self._inflight.do(
+                f"team-data:{full_dex}:{heuristics.version}", lambda: self._build(full_dex, heuristics)
+            )
+    
+    async def _build(self, full_dex: bool, heuristics: RoleHeuristics) -> None:
+        if full_dex:
+            records, chart = await asyncio.gather(
+                self.info_module.get_dex_records(),
+                self.strategy_module.get_type_chart()
+            )
         else:
-            team_focus = ['attacker', 'defender', 'support', 'speed', 'tank', 'attacker']
+            records, chart = await asyncio.gather(
+                self.info_module.make_pokemon_requests(self.fallback_pool),
+                self.strategy_module.get_type_chart()
+            )
+            records = [record for record in records if record]
+        if not records or chart is None:
+            return
         
-        # Select Pokemon for each role
-        selected_team = []
-        for role in team_focus:
-            if role in self.role_pokemon:
-                selected_team.append(self.role_pokemon[role][0])  # Take first Pokemon from each role
-                self.role_pokemon[role].append(self.role_pokemon[role].pop(0))  # Rotate the list
+        # Score roles and build the candidate arrays off the event loop, then install them in the compute workers
+        executor = get_executor()
+        index = await executor.run(RoleIndex, records, heuristics)
+        optimizer = await executor.run(TeamOptimizer, records, chart, index.primary_roles())
+        executor.preload(f"team-optimizer:{full_dex}", optimizer)
+        self.optimizers[full_dex] = optimizer
+        self.role_indexes[full_dex] = index
+    
+    async def suggest_team(self, description: str) -> str:
+        """Suggest a Pokémon team for a natural language description by searching for the best-scoring team."""
+        constraints = TeamConstraints.from_description(description)
+        optimizer = await self.get_optimizer()
+        if optimizer is None:
+            return "Pokémon data is currently unavailable. Please try again later."
         
-        # Get data for each team member
-        team_details = []
-        for pokemon in selected_team:
-            pokemon_data = await self.info_module.make_pokemon_request(pokemon)
-            if pokemon_data:
-                name = pokemon_data.get('name', 'Unknown').title()
-                types = [t['type']['name'].title() for t in pokemon_data.get('types', [])]
-                role = await self.get_pokemon_role(pokemon_data)
-                team_details.append(f"{name} ({', '.join(types)}) - {role.title()}")
-            else:
-                team_details.append(f"{pokemon} - Data unavailable")
+        started = time.perf_counter()
+        try:
+            plan = await get_executor().run_preloaded(
+                f"team-optimizer:{self.info_module.snapshot is not None}", 'search', constraints, cancellable=True
+            )
+        except (asyncio.TimeoutError, JobCancelled):
+            return "The team search took too long. Try a description with fewer constraints."
+        elapsed = (time.perf_counter() - started) * 1000
+        if plan is None:
+            return f"""
+Team Suggestion Based On: "{description}"
+
+No team satisfies these constraints:
+{chr(10).join(f"- {line}" for line in constraints.describe())}
+"""
+        
+        breakdown = plan.breakdown
+        n_types = len(optimizer.type_names)
+        team_details = [
+            f"{member.display_name} ({', '.join(t.title() for t in member.types)}) - {role.title()} (BST {member.total_stats})"
+            for member, role in zip(plan.members, plan.roles)
+        ]
         
         team_response = f"""
 Team Suggestion Based On: "{description}"
@@ -99,12 +115,21 @@ Team Suggestion Based On: "{description}"
 Recommended Team:
 {chr(10).join([f"{i+1}. {detail}" for i, detail in enumerate(team_details)])}
 
+Constraints Applied:
+{chr(10).join(f"- {line}" for line in constraints.describe()) or '- None'}
+
+Score Breakdown (overall {plan.score:.2f} of 1.00):
+- Offensive coverage: {round(breakdown['offense'] * n_types)}/{n_types} types hit super effectively by STAB (weight {SCORE_WEIGHTS['offense']:.0%})
+- Defensive balance: {round(breakdown['defense'] * n_types)}/{n_types} attacking types resisted at least as often as they are super effective (weight {SCORE_WEIGHTS['defense']:.0%})
+- Role balance: {breakdown['roles']:.0%} of the target roles filled ({', '.join(constraints.focus)}) (weight {SCORE_WEIGHTS['roles']:.0%})
+- Base stats: average total {plan.average_total:.0f} (weight {SCORE_WEIGHTS['stats']:.0%})
+
 Team Strategy:
-- Balanced type coverage
-- Mix of offensive and defensive roles
-- Synergistic team composition
-- Adaptable to various battle scenarios
+- Not hit super effectively: {', '.join(t.title() for t in plan.offense_gaps) if plan.offense_gaps else 'None'}
+- Attacking types that outnumber the team's resists: {', '.join(t.title() for t in plan.defensive_holes) if plan.defensive_holes else 'None'}
+
+Searched {plan.candidates} candidates in {elapsed:.0f} ms.
 
 Note: This is a basic suggestion. Consider individual Pokemon movesets, abilities, and your specific battle format for optimal team building.
 """
-        return team_response 
\ No newline at end of file
+        return team_response
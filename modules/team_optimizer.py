@@ -0,0 +1,298 @@
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .dex import FLAG_NAMES, FLAG_PLURALS, FLAG_WORDS
+from .executor import JobControl
+from .records import PokemonRecord
+from .roles import ROLE_NAMES
+from .type_chart import BATTLE_TYPES, TYPE_NAMES, TypeChart
+
+# Roles a team is built around for each focus keyword
+TEAM_FOCUS = {
+    'balanced': ['attacker', 'defender', 'support', 'speed', 'tank'],
+    'offensive': ['attacker', 'attacker', 'speed', 'attacker', 'support', 'tank'],
+    'defensive': ['defender', 'tank', 'support', 'defender', 'tank', 'support'],
+    'default': ['attacker', 'defender', 'support', 'speed', 'tank', 'attacker']
+}
+
+# Relative weight of each part of a team's score
+SCORE_WEIGHTS = {'offense': 0.35, 'defense': 0.30, 'roles': 0.20, 'stats': 0.15}
+
+# Words that name a role in a description; None accepts any role
+_ROLE_WORDS = {
+    'attacker': 'attacker', 'attackers': 'attacker',
+    'sweeper': 'speed', 'sweepers': 'speed', 'speedster': 'speed',
+    'defender': 'defender', 'defenders': 'defender', 'wall': 'defender', 'walls': 'defender',
+    'support': 'support', 'supporter': 'support',
+    'tank': 'tank', 'tanks': 'tank',
+    'type': None, 'types': None, 'pokemon': None, 'pokémon': None, 'member': None
+}
+_TYPE_PATTERN = '|'.join(BATTLE_TYPES)
+_TYPE_MENTION = re.compile(
+    rf"\b(?:(no|without|exclud\w*|avoid\w*)\s+)?({_TYPE_PATTERN})\b([- ]types?\b)?(?:\s+({'|'.join(_ROLE_WORDS)})\b)?"
+)
+# Text between two types of one list, as in "fire, water or grass types"
+_LIST_JOIN = re.compile(r"\s*,?\s*(?:(?:and|or|&)\s+)?")
+_EXCLUDE = r"\b(?:no|without|non|exclud\w*|avoid\w*)\b[^.,;]*?"
+
+def _type_lists(text: str) -> List[List[re.Match]]:
+    """Group the type mentions in text into lists such as "no fire or water" or "fire and water types"."""
+    lists: List[List[re.Match]] = []
+    for mention in _TYPE_MENTION.finditer(text):
+        if lists:
+            previous = lists[-1][-1]
+            joined = _LIST_JOIN.fullmatch(text, previous.end(), mention.start())
+            if joined and not (previous[3] or previous[4] or mention[1]):
+                lists[-1].append(mention)
+                continue
+        lists.append([mention])
+    return lists
+
+class TeamConstraints:
+    """User constraints for a team search, usually parsed from a description."""
+
+    def __init__(
+        self,
+        focus: Sequence[str] = TEAM_FOCUS['default'],
+        requirements: Sequence[Tuple[Optional[str], Optional[str]]] = (),
+        excluded_types: Sequence[str] = (),
+        excluded_flags: Sequence[str] = ()
+    ):
+        self.focus = list(focus)
+        self.requirements = list(requirements)
+        self.excluded_types = set(excluded_types)
+        # Flags such as 'legendary' whose Pokémon may not be picked
+        self.excluded_flags = set(excluded_flags)
+
+    @classmethod
+    def from_description(cls, description: str) -> "TeamConstraints":
+        """Parse constraints such as "must include a fire attacker, no legendaries or babies"."""
+        text = description.lower()
+        if 'balanced' in text:
+            focus = TEAM_FOCUS['balanced']
+        elif 'offensive' in text or 'attack' in text:
+            focus = TEAM_FOCUS['offensive']
+        elif 'defensive' in text or 'defense' in text:
+            focus = TEAM_FOCUS['defensive']
+        else:
+            focus = TEAM_FOCUS['default']
+
+        requirements = []
+        excluded_types = []
+        for mentions in _type_lists(text):
+            # A list shares its leading negation and its trailing "type(s)" or role word
+            negation, suffix, role_word = mentions[0][1], mentions[-1][3], mentions[-1][4]
+            type_names = [mention[2] for mention in mentions]
+            if negation:
+                excluded_types.extend(type_names)
+            elif role_word:
+                requirements.extend((type_name, _ROLE_WORDS[role_word]) for type_name in type_names)
+            elif suffix:
+                requirements.extend((type_name, None) for type_name in type_names)
+
+        return cls(
+            focus=focus,
+            requirements=requirements,
+            excluded_types=excluded_types,
+            excluded_flags=[
+                flag for flag in FLAG_NAMES
+                if re.search(_EXCLUDE + rf"\b(?:{'|'.join(w for w, f in FLAG_WORDS.items() if f == flag)})\b", text)
+            ]
+        )
+
+    def describe(self) -> List[str]:
+        """Human-readable list of the constraints in effect."""
+        lines = [
+            f"Include a {type_name.title()} type" + (f" in the {role} role" if role else '')
+            for type_name, role in self.requirements
+        ]
+        if self.excluded_types:
+            lines.append(f"No {', '.join(t.title() for t in sorted(self.excluded_types))} types")
+        lines.extend(f"No {FLAG_PLURALS[flag]}" for flag in FLAG_NAMES if flag in self.excluded_flags)
+        return lines
+
+class TeamPlan:
+    """Result of a team search: the members and how the team scored."""
+
+    def __init__(
+        self,
+        members: List[PokemonRecord],
+        roles: List[str],
+        score: float,
+        breakdown: Dict[str, float],
+        offense_gaps: List[str],
+        defensive_holes: List[str],
+        average_total: float,
+        candidates: int
+    ):
+        self.members = members
+        self.roles = roles
+        self.score = score
+        self.breakdown = breakdown
+        self.offense_gaps = offense_gaps
+        self.defensive_holes = defensive_holes
+        self.average_total = average_total
+        self.candidates = candidates
+
+class _BeamState:
+    __slots__ = ('chosen', 'offense', 'weak', 'resist', 'roles', 'total', 'score')
+
+    def __init__(self, chosen, offense, weak, resist, roles, total, score=0.0):
+        self.chosen = chosen
+        self.offense = offense
+        self.weak = weak
+        self.resist = resist
+        self.roles = roles
+        self.total = total
+        self.score = score
+
+class TeamOptimizer:
+    """Beam search for the team with the best type coverage, role balance and base stats.
+
+    Each candidate is reduced to boolean vectors over the battle types: the
+    types its STAB attacks hit super effectively, and the attacking types it
+    is weak to or resists. Extending a partial team with every candidate is
+    then a handful of array operations, so a full-dex search stays fast.
+    """
+
+    def __init__(
+        self,
+        records: Sequence[PokemonRecord],
+        chart: TypeChart,
+        roles: Sequence[str],
+        beam_width: Optional[int] = None
+    ):
+        self.records = list(records)
+        self.beam_width = beam_width or int(os.getenv("POKEMON_TEAM_BEAM_WIDTH", "32"))
+        mask = chart.battle_type_mask()
+        self.type_names = [name for name, keep in zip(TYPE_NAMES, mask) if keep]
+
+        pairs = np.array([chart.pair_indices(record.types) for record in self.records], dtype=np.int64).reshape(-1, 2)
+        defensive = chart.defensive_profiles(pairs)[:, mask]
+        self.weak = (defensive > 1.0).astype(np.int16)
+        self.resist = (defensive < 1.0).astype(np.int16)
+
+        # Extra zero row lets a missing second type be indexed as -1
+        attacks = np.vstack([chart.matrix[:, mask], np.zeros((1, int(mask.sum())))])
+        rows = np.where(pairs < 0, len(chart.matrix), pairs)
+        self.offense = np.maximum(attacks[rows[:, 0]], attacks[rows[:, 1]]) > 1.0
+
+        self.totals = np.array([record.total_stats for record in self.records], dtype=np.float64)
+        self.max_total = float(self.totals.max()) if len(self.totals) else 1.0
+        self.roles = np.array([ROLE_NAMES.index(role) for role in roles], dtype=np.int64)
+        self.role_onehot = np.eye(len(ROLE_NAMES), dtype=np.int16)[self.roles]
+        self.flags = {
+            flag: np.array([getattr(record, f"is_{flag}") for record in self.records], dtype=bool)
+            for flag in FLAG_NAMES
+        }
+
+    def _types_mask(self, type_names: Sequence[str]) -> np.ndarray:
+        wanted = set(type_names)
+        return np.array([bool(wanted.intersection(record.types)) for record in self.records], dtype=bool)
+
+    def _allowed(self, constraints: TeamConstraints) -> np.ndarray:
+        allowed = np.ones(len(self.records), dtype=bool)
+        for flag in constraints.excluded_flags:
+            allowed &= ~self.flags[flag]
+        if constraints.excluded_types:
+            allowed &= ~self._types_mask(constraints.excluded_types)
+        return allowed
+
+    def _score(self, offense, weak, resist, roles, total, size: int, target: np.ndarray):
+        """Score partial teams of `size` members; the inputs may carry a leading candidate axis."""
+        n_types = offense.shape[-1]
+        parts = {
+            'offense': offense.sum(axis=-1) / n_types,
+            # Attacking types resisted by at least as many members as they hit super effectively
+            'defense': (weak <= resist).sum(axis=-1) / n_types,
+            'roles': np.minimum(roles, target).sum(axis=-1) / max(1, min(size, int(target.sum()))),
+            'stats': total / size / self.max_total
+        }
+        score = sum(SCORE_WEIGHTS[name] * value for name, value in parts.items())
+        return score, parts
+
+    def search(
+        self,
+        constraints: TeamConstraints,
+        team_size: int = 6,
+        control: Optional[JobControl] = None
+    ) -> Optional[TeamPlan]:
+        """Find the best-scoring team under the constraints, or None if too few candidates qualify.
+
+        When run as an executor job, `control` is checked between steps so an
+        abandoned or overdue search stops early.
+        """
+        allowed = self._allowed(constraints)
+        # Requirements are filled first, one slot each, then the rest is open
+        pools = []
+        for type_name, role in constraints.requirements[:team_size]:
+            pool = allowed & self._types_mask([type_name])
+            if role is not None:
+                pool &= self.roles == ROLE_NAMES.index(role)
+            pools.append(np.flatnonzero(pool))
+        open_pool = np.flatnonzero(allowed)
+        if len(open_pool) < team_size or any(len(pool) == 0 for pool in pools):
+            return None
+
+        target = np.bincount(
+            [ROLE_NAMES.index(role) for role in constraints.focus], minlength=len(ROLE_NAMES)
+        ).astype(np.int16)
+        n_types = len(self.type_names)
+        beam = [_BeamState(
+            (), np.zeros(n_types, dtype=bool), np.zeros(n_types, dtype=np.int16),
+            np.zeros(n_types, dtype=np.int16), np.zeros(len(ROLE_NAMES), dtype=np.int16), 0.0
+        )]
+
+        for step in range(team_size):
+            pool = pools[step] if step < len(pools) else open_pool
+            size = step + 1
+            expansions = []
+            for state in beam:
+                if control is not None:
+                    control.check()
+                candidates = pool[~np.isin(pool, state.chosen)]
+                if len(candidates) == 0:
+                    continue
+                scores, _ = self._score(
+                    state.offense | self.offense[candidates],
+                    state.weak + self.weak[candidates],
+                    state.resist + self.resist[candidates],
+                    state.roles + self.role_onehot[candidates],
+                    state.total + self.totals[candidates],
+                    size, target
+                )
+                keep = min(self.beam_width, len(candidates))
+                best = np.argpartition(-scores, keep - 1)[:keep]
+                expansions.extend((float(scores[i]), state, int(candidates[i])) for i in best)
+
+            expansions.sort(key=lambda item: -item[0])
+            seen = set()
+            beam = []
+            for score, state, i in expansions:
+                key = frozenset(state.chosen + (i,))
+                if key in seen:
+                    continue
+                seen.add(key)
+                beam.append(_BeamState(
+                    state.chosen + (i,), state.offense | self.offense[i], state.weak + self.weak[i],
+                    state.resist + self.resist[i], state.roles + self.role_onehot[i],
+                    state.total + self.totals[i], score
+                ))
+                if len(beam) == self.beam_width:
+                    break
+            if not beam:
+                return None
+
+        best = beam[0]
+        score, parts = self._score(best.offense, best.weak, best.resist, best.roles, best.total, team_size, target)
+        return TeamPlan(
+            members=[self.records[i] for i in best.chosen],
+            roles=[ROLE_NAMES[self.roles[i]] for i in best.chosen],
+            score=float(score),
+            breakdown={name: float(value) for name, value in parts.items()},
+            offense_gaps=[t for t, covered in zip(self.type_names, best.offense) if not covered],
+            defensive_holes=[t for t, w, r in zip(self.type_names, best.weak, best.resist) if w > r],
+            average_total=best.total / team_size,
+            candidates=len(open_pool)
+        )
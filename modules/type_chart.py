@@ -0,0 +1,126 @@
+from typing import Dict, Iterable, Optional, Sequence
+import numpy as np
+
+# PokeAPI type order; stellar and unknown have no damage relations and stay neutral
+TYPE_NAMES = (
+    'normal', 'fighting', 'flying', 'poison', 'ground', 'rock', 'bug', 'ghost', 'steel',
+    'fire', 'water', 'grass', 'electric', 'psychic', 'ice', 'dragon', 'dark', 'fairy',
+    'stellar', 'unknown'
+)
+BATTLE_TYPES = TYPE_NAMES[:18]
+TYPE_INDEX = {name: i for i, name in enumerate(TYPE_NAMES)}
+
+GENERATIONS = (
+    'generation-i', 'generation-ii', 'generation-iii', 'generation-iv', 'generation-v',
+    'generation-vi', 'generation-vii', 'generation-viii', 'generation-ix'
+)
+
+_RELATION_MULTIPLIERS = {
+    'double_damage_to': 2.0,
+    'half_damage_to': 0.5,
+    'no_damage_to': 0.0
+}
+_DEFENSIVE_MULTIPLIERS = {
+    'double_damage_from': 2.0,
+    'half_damage_from': 0.5,
+    'no_damage_from': 0.0
+}
+
+def normalize_generation(generation: Optional[str | int]) -> Optional[str]:
+    """Accept 5, '5', 'v', 'gen 5' or 'generation-v' and return the PokeAPI generation name."""
+    if generation is None or generation == '':
+        return None
+    value = str(generation).strip().lower().replace('generation', '').replace('gen', '').strip(' -')
+    if value.isdigit() and 1 <= int(value) <= len(GENERATIONS):
+        return GENERATIONS[int(value) - 1]
+    name = f"generation-{value}"
+    if name in GENERATIONS:
+        return name
+    raise ValueError(f"Unknown generation '{generation}'")
+
+def _relations_for(type_data: dict, generation: Optional[str]) -> dict:
+    """Pick the damage relations that applied in a generation.
+
+    Each past_damage_relations entry holds the relations used up to and
+    including its generation, so the earliest entry not before the requested
+    generation wins; otherwise the current relations apply.
+    """
+    if generation is not None:
+        target = GENERATIONS.index(generation)
+        past = [
+            (GENERATIONS.index(entry['generation']['name']), entry['damage_relations'])
+            for entry in type_data.get('past_damage_relations', [])
+            if entry.get('generation', {}).get('name') in GENERATIONS
+        ]
+        for index, relations in sorted(past, key=lambda item: item[0]):
+            if index >= target:
+                return relations
+    return type_data.get('damage_relations', {})
+
+class TypeChart:
+    """Attacking x defending type effectiveness matrix."""
+
+    def __init__(self, matrix: np.ndarray, available: Optional[np.ndarray] = None, generation: Optional[str] = None):
+        self.matrix = matrix
+        self.available = available if available is not None else np.ones(len(TYPE_NAMES), dtype=bool)
+        self.generation = generation
+        # Extra neutral column lets a missing second type be indexed as -1
+        self._padded = np.hstack([matrix, np.ones((matrix.shape[0], 1))])
+
+    @classmethod
+    def from_type_data(cls, type_data: Dict[str, dict], generation: Optional[str] = None) -> "TypeChart":
+        """Build the chart from /type payloads keyed by type name."""
+        matrix = np.ones((len(TYPE_NAMES), len(TYPE_NAMES)))
+        available = np.zeros(len(TYPE_NAMES), dtype=bool)
+        limit = GENERATIONS.index(generation) if generation is not None else len(GENERATIONS)
+        for name, data in type_data.items():
+            if name not in TYPE_INDEX or not data:
+                continue
+            introduced = data.get('generation', {}).get('name')
+            if introduced in GENERATIONS and GENERATIONS.index(introduced) > limit:
+                continue
+            available[TYPE_INDEX[name]] = True
+            relations = _relations_for(data, generation)
+            # Both sides of a matchup are recorded; read the attacker's and defender's view
+            for relation, multiplier in _RELATION_MULTIPLIERS.items():
+                for target in relations.get(relation, []):
+                    if target['name'] in TYPE_INDEX:
+                        matrix[TYPE_INDEX[name], TYPE_INDEX[target['name']]] = multiplier
+            for relation, multiplier in _DEFENSIVE_MULTIPLIERS.items():
+                for source in relations.get(relation, []):
+                    if source['name'] in TYPE_INDEX:
+                        matrix[TYPE_INDEX[source['name']], TYPE_INDEX[name]] = multiplier
+        return cls(matrix, available, generation)
+
+    @staticmethod
+    def type_indices(types: Iterable[str]) -> list:
+        return [TYPE_INDEX[t] for t in types if t in TYPE_INDEX]
+
+    def defensive_profile(self, types: Sequence[str]) -> np.ndarray:
+        """Damage multiplier taken from each attacking type by a Pokémon with these types."""
+        columns = self.type_indices(types)
+        return self.matrix[:, columns].prod(axis=1) if columns else np.ones(len(TYPE_NAMES))
+
+    def defensive_profiles(self, type_pairs: np.ndarray) -> np.ndarray:
+        """Vectorized defensive profiles for an (n, 2) array of type indices, -1 for no second type.
+
+        Returns an (n, n_types) matrix of multipliers taken from each attacking type.
+        """
+        pairs = np.where(type_pairs < 0, self.matrix.shape[1], type_pairs)
+        return (self._padded[:, pairs[:, 0]] * self._padded[:, pairs[:, 1]]).T
+
+    def offensive_profile(self, types: Sequence[str]) -> np.ndarray:
+        """Best multiplier dealt to each defending type using attacks of these types."""
+        rows = self.type_indices(types)
+        return self.matrix[rows, :].max(axis=0) if rows else np.ones(len(TYPE_NAMES))
+
+    def pair_indices(self, types: Sequence[str]) -> tuple:
+        """Return the (first, second) type indices of a Pokémon, -1 when it is single-typed."""
+        indices = self.type_indices(types)[:2]
+        return tuple((indices + [-1, -1])[:2])
+
+    def battle_type_mask(self) -> np.ndarray:
+        """Mask of the types that exist in this chart's generation, excluding stellar/unknown."""
+        mask = self.available.copy()
+        mask[len(BATTLE_TYPES):] = False
+        return mask
@@ -1,9 +1,16 @@
-from mcp.server.fastmcp import FastMCP
+import asyncio
+from typing import Optional
+from mcp.server.fastmcp import Context, FastMCP
 from modules import (
     InfoRetrievalModule,
     ComparisonModule,
     StrategyModule,
-    TeamCompositionModule
+    TeamCompositionModule,
+    SearchModule,
+    BattleModule,
+    MovesetModule,
+    close_http_client,
+    shutdown_executor
 )
 
 # Initialize FastMCP server
@@ -11,9 +18,12 @@ mcp = FastMCP("pokemon")
 
 # Initialize modules
 info_module = InfoRetrievalModule()
-comparison_module = ComparisonModule()
-strategy_module = StrategyModule()
-team_module = TeamCompositionModule()
+search_module = SearchModule(info_module)
+comparison_module = ComparisonModule(info_module, search_module)
+strategy_module = StrategyModule(info_module)
+team_module = TeamCompositionModule(info_module, strategy_module)
+battle_module = BattleModule(info_module, strategy_module)
+moveset_module = MovesetModule(info_module)
 
 @mcp.tool()
 async def get_pokemon(name: str) -> str:
@@ -25,7 +35,7 @@ async def get_pokemon(name: str) -> str:
     pokemon_data = await info_module.make_pokemon_request(name)
     
     if not pokemon_data:
-        return f"Unable to find Pokémon '{name}'. Please check the spelling and try again."
+        return info_module.not_found_message(name)
     
     return info_module.format_pokemon_data(pokemon_data)
 
@@ -40,22 +50,143 @@ async def compare_pokemon(pokemon1: str, pokemon2: str) -> str:
     return await comparison_module.compare_pokemon(pokemon1, pokemon2)
 
 @mcp.tool()
-async def get_type_matchups(pokemon_name: str) -> str:
+async def compare_many(names: list[str]) -> str:
+    """Compare any number of Pokémon side by side with per-stat ranks, differences and totals.
+
+    Args:
+        names: Names of the Pokémon to compare (two or more)
+    """
+    return await comparison_module.compare_many(names)
+
+@mcp.tool()
+async def similar_pokemon(
+    pokemon_name: str,
+    limit: int = 5,
+    better_stat: Optional[str] = None,
+    filters: str = ""
+) -> str:
+    """Find Pokémon with the most similar base stat spread, e.g. "something like Garchomp but faster".
+
+    Args:
+        pokemon_name: Name of the Pokémon to match
+        limit: Number of similar Pokémon to return (1-25)
+        better_stat: Optional stat the results must beat the original in (e.g. "speed", "special-attack", "total")
+        filters: Optional extra conditions in search_pokemon syntax (e.g. "type: water, not legendary")
+    """
+    return await comparison_module.similar_pokemon(pokemon_name, limit, better_stat, filters)
+
+@mcp.tool()
+async def stat_percentiles(pokemon_name: str) -> str:
+    """Show how each of a Pokémon's base stats ranks against the whole Pokédex (percentile and rank).
+
+    Args:
+        pokemon_name: Name of the Pokémon to rate
+    """
+    return await comparison_module.stat_percentiles(pokemon_name)
+
+@mcp.tool()
+async def get_type_matchups(pokemon_name: str, generation: Optional[str] = None) -> str:
     """Get type effectiveness and counter-strategy recommendations for a Pokémon.
 
     Args:
         pokemon_name: Name of the Pokémon to analyze
+        generation: Optional generation whose type chart to use (e.g. "5" or "generation-v"); defaults to the current chart
+    """
+    return await strategy_module.get_type_matchups(pokemon_name, generation)
+
+@mcp.tool()
+async def analyze_team_matchups(names: list[str], generation: Optional[str] = None) -> str:
+    """Analyze a whole team's shared weaknesses, uncovered threats and type coverage in one call.
+
+    Args:
+        names: Names of the team members (e.g. an opposing team of six)
+        generation: Optional generation whose type chart to use (e.g. "5" or "generation-v"); defaults to the current chart
+    """
+    return await strategy_module.analyze_team_matchups(names, generation)
+
+@mcp.tool()
+async def get_moveset(pokemon_name: str, filters: str = "", limit: int = 15) -> str:
+    """List a Pokémon's learnable moves with type, power, accuracy, class and priority, strongest first.
+
+    Args:
+        pokemon_name: Name of the Pokémon
+        filters: Optional comma-separated conditions, e.g. "stab", "coverage" (best non-STAB move per type), "physical, power >= 80", "method: machine", "version: scarlet-violet" (defaults to the latest game)
+        limit: Maximum number of moves to list (1-50)
     """
-    return await strategy_module.get_type_matchups(pokemon_name)
+    return await moveset_module.get_moveset(pokemon_name, filters, limit)
+
+@mcp.tool()
+async def damage_matrix(
+    attackers: list[str],
+    defenders: list[str],
+    moves: Optional[list[str]] = None,
+    level: int = 50,
+    generation: Optional[str] = None
+) -> str:
+    """Estimate damage ranges and OHKO/2HKO results for every attacker against every defender in one call.
+
+    Args:
+        attackers: Names of the attacking Pokémon (e.g. a team of six)
+        defenders: Names of the defending Pokémon
+        moves: Optional move names evaluated for every attacker; by default each attacker's four strongest moves of different types
+        level: Level of every Pokémon (1-100, default 50)
+        generation: Optional generation whose type chart to use (e.g. "5" or "generation-v"); defaults to the current chart
+    """
+    return await strategy_module.damage_matrix(attackers, defenders, moves, level, generation)
+
+@mcp.tool()
+async def simulate_battle(
+    team_a: list[str],
+    team_b: list[str],
+    battles: int = 2000,
+    level: int = 50,
+    ctx: Context = None
+) -> str:
+    """Estimate how often one team beats another by simulating thousands of battles across all CPU cores.
+
+    Args:
+        team_a: Names of the first team's Pokémon
+        team_b: Names of the second team's Pokémon
+        battles: Number of battles to simulate (1-100000, default 2000)
+        level: Level of every Pokémon (1-100, default 50)
+    """
+    async def report(done: int, total: int, message: str) -> None:
+        await ctx.report_progress(done, total)
+        await ctx.info(message)
+
+    return await battle_module.simulate_battle(
+        team_a, team_b, battles, level, progress=report if ctx is not None else None
+    )
 
 @mcp.tool()
 async def suggest_team(description: str) -> str:
-    """Suggest a balanced Pokémon team based on a natural language description.
+    """Suggest a Pokémon team for a natural language description by searching the whole dex for the best type coverage, role balance and stats.
 
     Args:
-        description: Description of desired team (e.g., "balanced team with strong defense and fire attacker")
+        description: Description of desired team (e.g., "balanced team with a fire attacker, no legendaries")
     """
     return await team_module.suggest_team(description)
 
+@mcp.tool()
+async def search_pokemon(filters: str = "", sort: Optional[str] = None, limit: int = 10) -> str:
+    """Search the whole Pokédex by stats, types, abilities and flags, with sorting and top-k.
+
+    Args:
+        filters: Comma-separated conditions, e.g. "type: fire, special-attack > 100, not legendary", "type: water/ground", "ability: levitate"
+        sort: Field to rank by, highest first (e.g. "speed", "bulk", "total"); add "asc" for lowest first
+        limit: Maximum number of results (1-100)
+    """
+    return await search_module.search_pokemon(filters, sort, limit)
+
+async def serve() -> None:
+    """Run the SSE server and release the shared HTTP client, cache refresher and compute workers on shutdown."""
+    try:
+        await mcp.run_sse_async()
+    finally:
+        await info_module.refresher.close()
+        battle_module.close()
+        shutdown_executor()
+        await close_http_client()
+
 if __name__ == "__main__":
-    mcp.run(transport='sse')
\ No newline at end of file
+    asyncio.run(serve())
@@ -0,0 +1,231 @@
+"""
+Answer Pokémon questions with one LLM call instead of a ReAct loop.
+
+The router predicts MCP tool calls from a free-form query with simple
+keyword rules; the predicted tools run first, in parallel, and the model
+only formats their results. Every word of a routed query must be a known
+Pokémon, a type, an intent keyword or filler; queries the router is unsure
+about return None so callers can fall back to the ReAct agent.
+"""
+
+import asyncio
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from modules import InfoRetrievalModule, close_http_client
+from modules.names import NameIndex
+from modules.type_chart import BATTLE_TYPES
+
+ToolCall = Tuple[str, Dict[str, Any]]
+
+SUMMARY_PROMPT = """You are a Pokémon expert assistant. The results of Pokémon MCP tools that were
+already run for the user's question are given below. Answer the question using only these results;
+do not ask follow-up questions.
+
+Format your responses in a clear, README-style format:
+- Use markdown headers (##) for main sections
+- Use bullet points for lists
+- Use tables for comparisons
+- Use bold for important information
+- Keep responses concise but informative"""
+
+# Most Pokémon a single routed query may mention
+MAX_ROUTED_NAMES = 6
+
+# Longest Pokémon name in words, e.g. 'mega charizard x'
+MAX_NAME_WORDS = 3
+
+_TEAM = re.compile(r"\bteams?\b")
+_TOKEN = re.compile(r"[\w'’.-]+|[,;&]")
+
+# Words that set what a query asks for
+INTENT_WORDS = {
+    **dict.fromkeys(
+        "compare comparison vs versus difference differences better stronger weaker".split(), 'compare'
+    ),
+    **dict.fromkeys("""
+        matchup matchups weak weakness weaknesses strength strengths counter counters countering
+        resist resists resistance resistances effective against beat beats
+    """.split(), 'matchups'),
+    **dict.fromkeys("tell about info information details detail stats stat describe overview".split(), 'info')
+}
+
+# Matchup words that put one Pokémon on each side, as in "garchomp against dragonite"
+VERSUS_WORDS = frozenset("against beat beats counter counters countering vs versus".split())
+
+# Words that separate the Pokémon in a list
+SEPARATOR_WORDS = frozenset([",", ";", "&", "and", "or", "with"])
+
+# Words that never change which tools answer a question
+FILLER_WORDS = frozenset("""
+    a an the of for to in on at by from me my i you your it its is are was be been being
+    what which who how why when can could should would will do does did show give get find
+    please pokemon pokémon between best good great type types typing super strong them they their
+    this that these those use using some any all
+""".split())
+
+class ParsedQuery:
+    """What a query mentions: Pokémon (resolved to PokeAPI names), types and intents."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.types: List[str] = []
+        self.intents: set = set()
+        # How many Pokémon came before the first versus word, if any
+        self.versus_at: Optional[int] = None
+
+    @property
+    def versus(self) -> bool:
+        """Whether the query sets exactly two Pokémon against each other."""
+        return self.versus_at == 1 and len(self.names) == 2
+
+def router_enabled() -> bool:
+    """The router can be turned off with POKEMON_QUERY_ROUTER=0 to always use the ReAct agent."""
+    return os.getenv("POKEMON_QUERY_ROUTER", "1") != "0"
+
+def _tokens(query: str) -> List[str]:
+    text = re.sub(r"['’]s\b", "", query.lower())
+    return [token.strip(".'’-") or token for token in _TOKEN.findall(text)]
+
+def parse_query(query: str, names: NameIndex, strict: bool = True) -> Optional[ParsedQuery]:
+    """Account for every word of a query, or return None if any word is not understood.
+
+    With strict=False, words that are not understood are skipped instead.
+    """
+    parsed = ParsedQuery()
+    tokens = _tokens(query)
+    i = 0
+    while i < len(tokens):
+        # Multi-word names first, so 'great tusk' is not read as filler plus 'tusk'
+        for size in range(min(MAX_NAME_WORDS, len(tokens) - i), 1, -1):
+            span = tokens[i:i + size]
+            name = None if SEPARATOR_WORDS.intersection(span) else names.resolve(" ".join(span))
+            if name:
+                break
+        else:
+            size, name = 1, None
+
+        token = tokens[i]
+        if name:
+            parsed.names.append(name)
+        # Single words are checked against the vocabulary before the index, whose
+        # default forms would otherwise turn 'type' into 'type-null' or 'iron' into 'iron-valiant'
+        elif token in INTENT_WORDS:
+            parsed.intents.add(INTENT_WORDS[token])
+            if token in VERSUS_WORDS and parsed.versus_at is None:
+                parsed.versus_at = len(parsed.names)
+        elif token in FILLER_WORDS or token in SEPARATOR_WORDS:
+            pass
+        elif token in BATTLE_TYPES or (token.endswith("-type") and token[:-5] in BATTLE_TYPES):
+            parsed.types.append(token.removesuffix("-type"))
+        elif names.resolve(token):
+            parsed.names.append(names.resolve(token))
+        elif strict:
+            return None
+        i += size
+    parsed.names = list(dict.fromkeys(parsed.names))
+    return parsed
+
+def route_query(query: str, names: Optional[NameIndex]) -> Optional[List[ToolCall]]:
+    """Predict the tool calls that answer a free-form query, or None when unsure.
+
+    Without a name index no query can be checked, so nothing is routed.
+    """
+    if names is None:
+        return None
+    if _TEAM.search(query.lower()):
+        # Team descriptions are free text, but a team built around named Pokémon needs the agent
+        if parse_query(query, names, strict=False).names:
+            return None
+        return [("suggest_team", {"description": query.strip()})]
+
+    parsed = parse_query(query, names)
+    # Type-level questions ("best water type against fire") have no single tool to answer them
+    if parsed is None or not parsed.names or parsed.types or len(parsed.names) > MAX_ROUTED_NAMES:
+        return None
+
+    found = parsed.names
+    if 'compare' in parsed.intents:
+        if len(found) == 2:
+            return [("compare_pokemon", {"pokemon1": found[0], "pokemon2": found[1]})]
+        if len(found) > 2:
+            return [("compare_many", {"names": found})]
+        return None
+
+    if parsed.versus_at and len(found) > parsed.versus_at and not parsed.versus:
+        # Several Pokémon on one side of "against" need the agent to pick the matchups
+        return None
+    if parsed.versus:
+        # "Is Garchomp good against Dragonite?": damage both ways
+        return [
+            ("damage_matrix", {"attackers": [found[0]], "defenders": [found[1]]}),
+            ("damage_matrix", {"attackers": [found[1]], "defenders": [found[0]]})
+        ]
+
+    calls: List[ToolCall] = []
+    wants_matchups = 'matchups' in parsed.intents
+    if 'info' in parsed.intents or not wants_matchups:
+        calls += [("get_pokemon", {"name": name}) for name in found]
+    if wants_matchups:
+        calls += [("get_type_matchups", {"pokemon_name": name}) for name in found]
+    return calls
+
+async def load_name_index() -> Optional[NameIndex]:
+    """Load the Pokémon name index the server resolves names with, from the snapshot or the PokeAPI listing."""
+    try:
+        return await InfoRetrievalModule().get_name_index()
+    finally:
+        await close_http_client()
+
+async def run_tool(tools_by_name: Dict[str, Any], name: str, args: Dict[str, Any]) -> str:
+    """Run one MCP tool, returning errors as text so one failed call does not sink the answer."""
+    tool = tools_by_name.get(name)
+    if tool is None:
+        return f"Tool '{name}' is not available."
+    try:
+        result = await tool.ainvoke(args)
+    except Exception as e:
+        return f"Error calling {name}: {e}"
+    if isinstance(result, list):
+        result = "\n".join(part if isinstance(part, str) else str(part) for part in result)
+    return str(result)
+
+async def run_tools(tools_by_name: Dict[str, Any], calls: List[ToolCall]) -> List[str]:
+    """Run every tool call concurrently, returning their outputs in order."""
+    return list(await asyncio.gather(*[run_tool(tools_by_name, name, args) for name, args in calls]))
+
+def summary_messages(query: str, calls: List[ToolCall], results: List[str]) -> List[Any]:
+    """The prompt asking the model to answer a query from the results of already-run tool calls."""
+    sections = [
+        f"### {name}({', '.join(f'{key}={value!r}' for key, value in args.items())})\n{result.strip()}"
+        for (name, args), result in zip(calls, results)
+    ]
+    return [
+        SystemMessage(content=SUMMARY_PROMPT),
+        HumanMessage(content=f"Question: {query}\n\nTool results:\n\n" + "\n\n".join(sections))
+    ]
+
+async def prefetch_and_summarize(llm: Any, tools_by_name: Dict[str, Any], query: str, calls: List[ToolCall]) -> str:
+    """Run every tool call concurrently, then have the model format the results in a single call."""
+    results = await run_tools(tools_by_name, calls)
+    message = await llm.ainvoke(summary_messages(query, calls, results))
+    return message.content
+
+async def answer_query(
+    query: str,
+    llm: Any,
+    tools_by_name: Dict[str, Any],
+    agent: Any = None,
+    names: Optional[NameIndex] = None
+) -> str:
+    """Answer with one routed LLM call when the router is confident, otherwise with the ReAct agent."""
+    calls = route_query(query, names) if router_enabled() else None
+    if calls:
+        return await prefetch_and_summarize(llm, tools_by_name, query, calls)
+    if agent is None:
+        raise ValueError(f"Could not route query: {query}")
+    agent_response = await agent.ainvoke({"messages": query})
+    return agent_response['messages'][-1].content
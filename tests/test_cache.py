@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from modules import InfoRetrievalModule, LRUCache, SQLiteCache, TieredCache
+from modules.info_retrieval import NOT_MODIFIED
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("modules.cache.time.monotonic", clock)
+    return clock
+
+def test_fresh_hit_and_miss(clock):
+    cache = LRUCache(ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_stale_window(clock):
+    cache = LRUCache(ttl=60, stale_ttl=30)
+    cache.set("a", 1)
+    clock.now += 61
+    assert cache.get("a") is None
+    assert cache.lookup("a") == (1, False)
+    cache.touch("a")
+    assert cache.lookup("a") == (1, True)
+    clock.now += 91
+    assert cache.lookup("a") == (None, False)
+    assert cache.expirations == 1
+
+def test_disk_hit_is_promoted_to_memory(tmp_path):
+    disk = SQLiteCache(tmp_path / "cache.sqlite3")
+    disk.set("a", {"name": "pikachu"}, etag='"v1"')
+    cache = TieredCache(LRUCache(), disk)
+    assert asyncio.run(cache.aget("a")) == {"name": "pikachu"}
+    assert cache.memory.get("a") == {"name": "pikachu"}
+    assert cache.memory.etag("a") == '"v1"'
+    disk.close()
+
+def _module(clock, responses):
+    """An online module whose upstream answers with responses[i] on the i-th request."""
+    module = InfoRetrievalModule(cache=TieredCache(LRUCache(ttl=60, stale_ttl=600)), mode='online')
+    requests = []
+
+    async def fetch_upstream(path, etag=None):
+        requests.append(etag)
+        return responses[len(requests) - 1]
+
+    module._fetch_upstream = fetch_upstream
+    return module, requests
+
+def test_stale_entry_is_served_and_revalidated_with_304(clock):
+    module, requests = _module(clock, [({"name": "cheri"}, '"v1"'), (NOT_MODIFIED, '"v1"')])
+
+    async def run():
+        assert await module.fetch_resource("berry/cheri") == {"name": "cheri"}
+        assert await module.fetch_resource("berry/cheri") == {"name": "cheri"}
+        clock.now += 61
+        # Served stale at once while a conditional request runs in the background
+        assert await module.fetch_resource("berry/cheri") == {"name": "cheri"}
+        await module.refresher.join()
+        await module.refresher.close()
+
+    asyncio.run(run())
+    assert requests == [None, '"v1"']
+    assert module.cache.lookup("berry/cheri") == ({"name": "cheri"}, True)
+
+def test_changed_entry_is_reloaded(clock):
+    module, requests = _module(clock, [({"name": "cheri"}, '"v1"'), ({"name": "cheri", "size": 20}, '"v2"')])
+
+    async def run():
+        await module.fetch_resource("berry/cheri")
+        clock.now += 61
+        await module.revalidate("berry/cheri")
+
+    asyncio.run(run())
+    assert requests == [None, '"v1"']
+    assert module.cache.get("berry/cheri") == {"name": "cheri", "size": 20}
+    assert module.cache.etag("berry/cheri") == '"v2"'
@@ -0,0 +1,51 @@
+import numpy as np
+from modules.damage import battle_stats, damage_rolls, hits_to_ko
+from modules.type_chart import TYPE_INDEX, TYPE_NAMES, TypeChart
+
+GARCHOMP = [108, 130, 95, 80, 85, 102]
+HEATRAN = [91, 90, 106, 130, 106, 77]
+
+def _chart():
+    matrix = np.ones((len(TYPE_NAMES), len(TYPE_NAMES)))
+    for defender, multiplier in (("fire", 2.0), ("steel", 2.0), ("flying", 0.0), ("grass", 0.5)):
+        matrix[TYPE_INDEX["ground"], TYPE_INDEX[defender]] = multiplier
+    return TypeChart(matrix)
+
+def _types(*pairs):
+    return np.array([[TYPE_INDEX[t] for t in pair] + [-1] * (2 - len(pair)) for pair in pairs])
+
+def _earthquake(defender_stats, defender_types, power=100.0):
+    return damage_rolls(
+        _chart(),
+        battle_stats(np.array([GARCHOMP])),
+        _types(("dragon", "ground")),
+        defender_stats,
+        defender_types,
+        power=np.array([[power]]),
+        move_types=np.array([[TYPE_INDEX["ground"]]]),
+        physical=np.array([[True]])
+    )[0, 0, 0]
+
+def test_battle_stats_at_level_50():
+    assert battle_stats(np.array([GARCHOMP])).tolist() == [[183, 150, 115, 100, 105, 122]]
+    assert battle_stats(np.array([HEATRAN]), level=100).tolist() == [[323, 216, 248, 296, 248, 190]]
+
+def test_stab_super_effective_damage():
+    # 54 base damage, rolls 45-54, STAB 67-81, 4x against Fire/Steel
+    heatran = battle_stats(np.array([HEATRAN]))
+    rolls = _earthquake(heatran, _types(("fire", "steel")))
+    assert rolls.shape == (16,)
+    assert (rolls.min(), rolls.max()) == (268, 324)
+    assert hits_to_ko(rolls[None, None, None, :], heatran[:, 0]).max() == 1
+
+def test_immunity_and_minimum_damage():
+    heatran = battle_stats(np.array([HEATRAN]))
+    assert not _earthquake(heatran, _types(("flying",))).any()
+    # A weak resisted hit still deals at least 1
+    tough = np.array([[300, 999, 999, 999, 999, 100]], dtype=float)
+    assert _earthquake(tough, _types(("grass",)), power=10.0).min() == 1
+
+def test_zero_power_deals_no_damage():
+    heatran = battle_stats(np.array([HEATRAN]))
+    assert not _earthquake(heatran, _types(("fire",)), power=0.0).any()
+    assert np.isinf(hits_to_ko(np.zeros((1, 1, 1, 16)), heatran[:, 0])).all()
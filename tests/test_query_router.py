@@ -0,0 +1,51 @@
+import pytest
+from modules.names import NameIndex
+from query_router import route_query
+
+NAMES = NameIndex([
+    ("charizard", 6), ("pikachu", 25), ("raichu", 26), ("alakazam", 65), ("gengar", 94),
+    ("mr-mime", 122), ("eevee", 133), ("dragonite", 149), ("garchomp", 445), ("type-null", 772),
+    ("great-tusk", 984), ("raichu-alola", 10100)
+])
+
+@pytest.mark.parametrize("query", [
+    "hello there",
+    "What's the weather like?",
+    "how do I evolve eevee",
+    "What is the best water type against fire?",
+    "Is Garchomp good against Dragonite and Gengar?",
+    "Compare Pikachu",
+    "What type is good against everything?",
+    "Build a team around Charizard",
+])
+def test_unsure_queries_are_not_routed(query):
+    assert route_query(query, NAMES) is None
+
+def test_nothing_is_routed_without_a_name_index():
+    assert route_query("Tell me about Charizard", None) is None
+
+@pytest.mark.parametrize("query, calls", [
+    ("Tell me about Charizard", [("get_pokemon", {"name": "charizard"})]),
+    ("Compare Pikachu and Raichu", [("compare_pokemon", {"pokemon1": "pikachu", "pokemon2": "raichu"})]),
+    ("compare pikachu, raichu, alakazam", [("compare_many", {"names": ["pikachu", "raichu", "alakazam"]})]),
+    ("What are Gengar's weaknesses?", [("get_type_matchups", {"pokemon_name": "gengar"})]),
+    ("What are Gengar's weaknesses and how can I counter them?", [("get_type_matchups", {"pokemon_name": "gengar"})]),
+    ("Mr. Mime stats and weaknesses", [
+        ("get_pokemon", {"name": "mr-mime"}), ("get_type_matchups", {"pokemon_name": "mr-mime"})
+    ]),
+    ("tell me about great tusk", [("get_pokemon", {"name": "great-tusk"})]),
+    ("alolan raichu", [("get_pokemon", {"name": "raichu-alola"})]),
+    ("Is Garchomp good against Dragonite?", [
+        ("damage_matrix", {"attackers": ["garchomp"], "defenders": ["dragonite"]}),
+        ("damage_matrix", {"attackers": ["dragonite"], "defenders": ["garchomp"]})
+    ]),
+    ("Suggest a balanced team with a strong fire attacker", [
+        ("suggest_team", {"description": "Suggest a balanced team with a strong fire attacker"})
+    ]),
+])
+def test_routes(query, calls):
+    assert route_query(query, NAMES) == calls
+
+def test_filler_words_are_not_read_as_names():
+    # 'type' and 'great' are the base names of Type: Null and Great Tusk
+    assert route_query("what type is great", NAMES) is None
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from modules.dex import DexTable, flag_name
+from modules.records import PokemonRecord
+from modules.search import parse_filters, parse_sort
+
+def _record(name, types, stats, **flags):
+    return PokemonRecord(id=None, name=name, types=types, stats=stats, **flags)
+
+@pytest.fixture
+def table():
+    return DexTable([
+        _record('pichu', ('electric',), (20, 40, 15, 35, 35, 60), is_baby=True),
+        _record('pikachu', ('electric',), (35, 55, 40, 50, 50, 90)),
+        _record('charizard', ('fire', 'flying'), (78, 84, 78, 109, 85, 100)),
+        _record('moltres', ('fire', 'flying'), (90, 100, 90, 125, 85, 90), is_legendary=True),
+        _record('victini', ('psychic', 'fire'), (100, 100, 100, 100, 100, 100), is_mythical=True),
+    ])
+
+def _matches(table, filters):
+    mask = np.ones(len(table.names), dtype=bool)
+    for _, predicate in parse_filters(filters):
+        mask &= predicate(table)
+    return [name for name, keep in zip(table.names, mask) if keep]
+
+@pytest.mark.parametrize("word, flag", [
+    ("legendaries", "legendary"), ("mythicals", "mythical"), ("babies", "baby"), ("Legendary", "legendary"),
+])
+def test_flag_words(word, flag):
+    assert flag_name(word) == flag
+
+def test_plural_flags_are_understood(table):
+    assert _matches(table, "type: fire, no legendaries") == ['charizard', 'victini']
+    assert _matches(table, "not mythicals, fire") == ['charizard', 'moltres']
+    assert _matches(table, "babies") == ['pichu']
+    assert _matches(table, "baby: false, type: electric") == ['pikachu']
+
+def test_numeric_and_dual_type_filters(table):
+    assert _matches(table, "type: fire/flying, special-attack > 110") == ['moltres']
+    assert _matches(table, "speed >= 100") == ['charizard', 'victini']
+
+def test_unknown_filter_is_an_error():
+    with pytest.raises(ValueError, match="Could not understand filter 'legendarie'"):
+        parse_filters("legendarie")
+
+def test_sort():
+    assert parse_sort("-speed") == ('speed', True)
+    assert parse_sort("total asc") == ('total', False)
+    with pytest.raises(ValueError):
+        parse_sort("colour")
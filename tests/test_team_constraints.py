@@ -0,0 +1,33 @@
+import pytest
+from modules.team_optimizer import TeamConstraints
+
+@pytest.mark.parametrize("description, requirements", [
+    ("must include a water type", [("water", None)]),
+    ("team with fire and water types", [("fire", None), ("water", None)]),
+    ("fire, water, or grass types", [("fire", None), ("water", None), ("grass", None)]),
+    ("must include a dragon-type", [("dragon", None)]),
+    ("a fire type attacker", [("fire", "attacker")]),
+    ("fire attacker and water defender", [("fire", "attacker"), ("water", "defender")]),
+    ("balanced team strong against fire", []),
+])
+def test_type_requirements(description, requirements):
+    assert TeamConstraints.from_description(description).requirements == requirements
+
+def test_type_requirement_is_described():
+    constraints = TeamConstraints.from_description("must include a water type")
+    assert constraints.describe() == ["Include a Water type"]
+
+def test_negation_covers_the_whole_list():
+    constraints = TeamConstraints.from_description("no fire or water types, must have a grass attacker")
+    assert constraints.excluded_types == {"fire", "water"}
+    assert constraints.requirements == [("grass", "attacker")]
+
+def test_focus_and_legendary_exclusion():
+    constraints = TeamConstraints.from_description("defensive team, no legendaries or mythicals")
+    assert constraints.focus == ["defender", "tank", "support", "defender", "tank", "support"]
+    assert constraints.excluded_flags == {"legendary", "mythical"}
+
+def test_baby_exclusion_is_described():
+    constraints = TeamConstraints.from_description("offensive team without babies")
+    assert constraints.excluded_flags == {"baby"}
+    assert constraints.describe() == ["No babies"]
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from modules.type_chart import TYPE_INDEX, TypeChart, normalize_generation
+
+def _names(*names):
+    return [{"name": name} for name in names]
+
+# Steel resisted Ghost and Dark until Generation VI, when Fairy was introduced
+TYPE_DATA = {
+    "ghost": {
+        "generation": {"name": "generation-i"},
+        "damage_relations": {"double_damage_to": _names("ghost"), "no_damage_to": _names("normal")}
+    },
+    "steel": {
+        "generation": {"name": "generation-ii"},
+        "damage_relations": {"half_damage_from": _names("steel", "dragon")},
+        "past_damage_relations": [{
+            "generation": {"name": "generation-v"},
+            "damage_relations": {"half_damage_from": _names("steel", "dragon", "ghost", "dark")}
+        }]
+    },
+    "dragon": {
+        "generation": {"name": "generation-i"},
+        "damage_relations": {"double_damage_to": _names("dragon"), "no_damage_to": _names("fairy")}
+    },
+    "fairy": {
+        "generation": {"name": "generation-vi"},
+        "damage_relations": {"no_damage_from": _names("dragon"), "double_damage_to": _names("dragon")}
+    }
+}
+
+def _effectiveness(chart, attacker, defender):
+    return chart.matrix[TYPE_INDEX[attacker], TYPE_INDEX[defender]]
+
+@pytest.mark.parametrize("generation, expected", [
+    ("5", "generation-v"), (5, "generation-v"), ("gen 5", "generation-v"), ("v", "generation-v"),
+    ("generation-ix", "generation-ix"), (None, None)
+])
+def test_normalize_generation(generation, expected):
+    assert normalize_generation(generation) == expected
+
+def test_unknown_generation():
+    with pytest.raises(ValueError):
+        normalize_generation("10")
+
+def test_generation_5_chart_has_no_fairy():
+    chart = TypeChart.from_type_data(TYPE_DATA, "generation-v")
+    assert not chart.available[TYPE_INDEX["fairy"]]
+    assert not chart.battle_type_mask()[TYPE_INDEX["fairy"]]
+    assert chart.battle_type_mask().sum() == 3
+    assert _effectiveness(chart, "ghost", "steel") == 0.5
+    assert _effectiveness(chart, "dark", "steel") == 0.5
+
+def test_current_chart():
+    chart = TypeChart.from_type_data(TYPE_DATA)
+    assert chart.available[TYPE_INDEX["fairy"]]
+    assert _effectiveness(chart, "dragon", "fairy") == 0.0
+    assert _effectiveness(chart, "fairy", "dragon") == 2.0
+    assert _effectiveness(chart, "ghost", "steel") == 1.0
+    assert _effectiveness(chart, "ghost", "normal") == 0.0
+
+def test_dual_type_profiles():
+    chart = TypeChart.from_type_data(TYPE_DATA)
+    pairs = np.array([chart.pair_indices(["steel", "fairy"]), chart.pair_indices(["ghost"])])
+    profiles = chart.defensive_profiles(pairs)
+    assert profiles[0, TYPE_INDEX["dragon"]] == 0.0
+    assert profiles[1, TYPE_INDEX["ghost"]] == 2.0
+    assert np.array_equal(profiles[0], chart.defensive_profile(["steel", "fairy"]))
@@ -1,15 +1,21 @@
-from fastapi import FastAPI, HTTPException, WebSocket
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 import json
 import asyncio
-from typing import Dict, Any, List
+import hashlib
+import re
+import time
+from typing import Dict, Any, AsyncIterator, List, Optional
 import os
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
-from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.prebuilt import create_react_agent
+from mcp_session_pool import MCPSessionPool
+from modules.cache import DEFAULT_CACHE_DB, LRUCache, SQLiteCache, TieredCache
+from modules.singleflight import SingleFlight
+from query_router import SUMMARY_PROMPT, prefetch_and_summarize, run_tools, summary_messages
 
 # Load environment variables
 load_dotenv()
@@ -25,10 +31,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Groq LLM
+# Initialize Groq LLM; it is only needed for the opt-in "summarize" and "explain" modes
+LLM_MODEL = "qwen-qwq-32b"
+llm = None
 if os.getenv('GROQ_API_KEY'):
     llm = ChatGroq(
-        model="qwen-qwq-32b",
+        model=LLM_MODEL,
         temperature=0,
         max_tokens=None,
         timeout=None,
@@ -36,30 +44,29 @@ if os.getenv('GROQ_API_KEY'):
     )
     print("Using Groq with Qwen-qwq-32b")
 else:
-    print('Export GROQ_API_KEY to initialize Qwen LLM.')
+    print('Export GROQ_API_KEY to enable summarize and explain modes with the Qwen LLM.')
     print('Get your API key from: https://console.groq.com/')
-    exit(1)
 
-# Initialize MCP client
-mcp_client = MultiServerMCPClient({
-    "pokemon_server": {
-        "url": os.getenv("POKEMON_MCP_URL", "http://localhost:8000/sse"),
-        "transport": "sse"
-    }
-})
+# Persistent MCP sessions shared by every tool call
+mcp_pool = MCPSessionPool.from_env()
 
 # Create agent
 agent = None
 
-async def initialize_agent():
-    global agent
-    tools = await mcp_client.get_tools()
-    print("Loaded Pokémon MCP tools: " + ", ".join(tool.name for tool in tools))
-    
-    agent = create_react_agent(
-        llm,
-        tools=tools,
-        prompt="""You are a Pokémon expert assistant. You have access to tools that can:
+# MCP tools by name, called directly in the default mode
+tools_by_name: Dict[str, Any] = {}
+
+# Tools the buttons can call, with their required parameters and the question asked in the LLM modes
+QUERY_TOOLS = {
+    "get_pokemon": (("name",), "Tell me about {name}"),
+    "compare_pokemon": (("pokemon1", "pokemon2"), "Compare {pokemon1} and {pokemon2}"),
+    "get_type_matchups": (("pokemon_name",), "What are the type matchups for {pokemon_name}?"),
+    "suggest_team": (("description",), "Suggest a team based on this description: {description}")
+}
+
+QUERY_MODES = ("direct", "summarize", "explain")
+
+AGENT_PROMPT = """You are a Pokémon expert assistant. You have access to tools that can:
         - Get detailed information about any Pokémon
         - Compare two Pokémon's attributes  
         - Analyze type matchups and strategies
@@ -78,16 +85,148 @@ async def initialize_agent():
         - Keep responses concise but informative
         - Structure information in a logical flow
         - Use emojis sparingly for visual appeal"""
+
+# Cached answers are keyed by the prompts, so editing either one invalidates them
+PROMPT_VERSION = hashlib.sha256((AGENT_PROMPT + SUMMARY_PROMPT).encode()).hexdigest()[:12]
+
+def create_answer_cache() -> TieredCache:
+    """Cache of LLM answers, configured by POKEMON_ANSWER_CACHE_* variables.
+
+    The SQLite tier is shared by every web interface process; setting
+    POKEMON_ANSWER_CACHE_DB to an empty string keeps answers in memory only.
+    """
+    ttl = float(os.getenv("POKEMON_ANSWER_CACHE_TTL", "86400"))
+    memory = LRUCache(maxsize=int(os.getenv("POKEMON_ANSWER_CACHE_SIZE", "512")), ttl=ttl)
+    db_path = os.getenv("POKEMON_ANSWER_CACHE_DB", str(DEFAULT_CACHE_DB.with_name("answers.sqlite3")))
+    return TieredCache(memory, SQLiteCache(db_path, ttl=ttl) if db_path else None)
+
+answer_cache = create_answer_cache()
+
+# Concurrent identical LLM queries share one run
+answer_flight = SingleFlight()
+
+def answer_key(tool_name: str, mode: str, args: Dict[str, str]) -> str:
+    # Case and spacing do not change an answer, so they do not split the cache either
+    normalized = {name: " ".join(value.split()).lower() for name, value in args.items()}
+    return f"answer:{LLM_MODEL}:{PROMPT_VERSION}:{mode}:{tool_name}:{json.dumps(normalized, sort_keys=True)}"
+
+async def initialize_agent():
+    global agent
+    await mcp_pool.start()
+    tools = await mcp_pool.get_tools()
+    tools_by_name.update((tool.name, tool) for tool in tools)
+    print("Loaded Pokémon MCP tools: " + ", ".join(tool.name for tool in tools))
+    
+    if llm is None:
+        return
+    agent = create_react_agent(
+        llm,
+        tools=tools,
+        prompt=AGENT_PROMPT
     )
 
 @app.on_event("startup")
 async def startup_event():
     await initialize_agent()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await mcp_pool.close()
+
+@app.get("/health")
+async def health():
+    """Report the MCP session pool and answer cache counters."""
+    return {"mcp_pool": mcp_pool.stats(), "answer_cache": answer_cache.stats()}
+
+_UNDERLINE = re.compile(r"^\s*(=+|-+)\s*$")
+_LABEL = re.compile(r"^([A-Z][\w .'/()%-]{0,40}):\s*(.*)$")
+_LIST_ITEM = re.compile(r"^(?:[-*]|\d+\.)\s")
+
+def _table(header: str, rows: List[str]) -> List[str]:
+    cells = [[cell.strip() for cell in line.split("|")] for line in [header] + rows]
+    lines = ["| " + " | ".join(cells[0]) + " |", "|" + "---|" * len(cells[0])]
+    return [""] + lines + ["| " + " | ".join(row) + " |" for row in cells[1:]] + [""]
+
+def render_markdown(text: str) -> str:
+    """Cheaply turn the plain-text layout MCP tools return into markdown.
+
+    Titles underlined with ==== or ---- become headers, pipe-separated blocks
+    become tables and 'Label: value' lines get a bold label; anything else
+    passes through with its line breaks kept.
+    """
+    lines = text.strip("\n").splitlines()
+    out: List[str] = []
+    i = 0
+    while i < len(lines):
+        line = lines[i].rstrip()
+        following = lines[i + 1] if i + 1 < len(lines) else ""
+        underlined = bool(line.strip()) and bool(_UNDERLINE.match(following))
+        if underlined and " | " in line:
+            rows = []
+            i += 2
+            while i < len(lines) and "|" in lines[i]:
+                rows.append(lines[i])
+                i += 1
+            out.extend(_table(line, rows))
+            continue
+        if underlined or (not out and line.strip()):
+            # The first line is the tool's title even when it is not underlined
+            level = "##" if not out or following.strip().startswith("=") else "###"
+            out.extend([f"{level} {line.strip().rstrip(':')}", ""])
+            i += 2 if underlined else 1
+            continue
+        is_item = bool(_LIST_ITEM.match(line))
+        if line and not is_item and out and _LIST_ITEM.match(out[-1]):
+            # End the list, otherwise the line would continue its last item
+            out.append("")
+        label = _LABEL.match(line)
+        if label:
+            line = f"**{label[1]}:** {label[2]}".rstrip()
+        # Two trailing spaces keep consecutive lines from merging into one paragraph
+        out.append(f"{line}  " if line and not is_item else line)
+        i += 1
+    return "\n".join(out).strip() + "\n"
+
+async def call_tool(tool_name: str, params: Dict[str, Any]) -> str:
+    """Call an MCP tool directly with structured parameters and return its text output."""
+    tool = tools_by_name.get(tool_name)
+    if tool is None:
+        raise HTTPException(status_code=503, detail=f"Tool '{tool_name}' is not available from the MCP server")
+    try:
+        result = await tool.ainvoke(params)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Error calling {tool_name}: {str(e)}")
+    if isinstance(result, list):
+        result = "\n".join(part if isinstance(part, str) else str(part) for part in result)
+    return str(result)
+
+async def answer_with_llm(tool_name: str, args: Dict[str, str], mode: str) -> str:
+    """Answer a button query with the LLM, caching the answer in memory and on disk."""
+    key = answer_key(tool_name, mode, args)
+    cached = await answer_cache.aget(key)
+    if cached is not None:
+        return cached
+
+    async def run() -> str:
+        question = QUERY_TOOLS[tool_name][1].format(**args)
+        if mode == "explain":
+            response = await process_query(question)
+        else:
+            if llm is None:
+                raise HTTPException(status_code=503, detail="Summarize mode needs GROQ_API_KEY; use direct mode instead")
+            try:
+                response = await prefetch_and_summarize(llm, tools_by_name, question, [(tool_name, args)])
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
+        await answer_cache.aset(key, response)
+        return response
+
+    return await answer_flight.do(key, run)
+
 async def process_query(query: str) -> str:
     """Process a query using the MCP agent."""
     if not agent:
-        raise HTTPException(status_code=500, detail="Agent not initialized")
+        raise HTTPException(status_code=503, detail="Explain mode needs GROQ_API_KEY; use direct mode instead")
     
     try:
         agent_response = await agent.ainvoke({"messages": query})
@@ -95,25 +234,208 @@ async def process_query(query: str) -> str:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
-@app.post("/query/{tool_name}")
-async def handle_query(tool_name: str, params: Dict[str, Any]):
-    """Handle queries for specific tools."""
-    if tool_name not in ["get_pokemon", "compare_pokemon", "get_type_matchups", "suggest_team"]:
+def validate_query(tool_name: str, params: Dict[str, Any], mode: str) -> Dict[str, str]:
+    """Check a query and return its arguments, stripped but otherwise as the user typed them."""
+    if not isinstance(tool_name, str) or tool_name not in QUERY_TOOLS:
         raise HTTPException(status_code=400, detail="Invalid tool name")
-    
-    # Construct a natural language query based on the tool and parameters
-    query = ""
-    if tool_name == "get_pokemon":
-        query = f"Tell me about {params.get('name', '')}"
-    elif tool_name == "compare_pokemon":
-        query = f"Compare {params.get('pokemon1', '')} and {params.get('pokemon2', '')}"
-    elif tool_name == "get_type_matchups":
-        query = f"What are the type matchups for {params.get('pokemon_name', '')}?"
-    elif tool_name == "suggest_team":
-        query = f"Suggest a team based on this description: {params.get('description', '')}"
-    
-    response = await process_query(query)
-    return {"response": response}
+    if not isinstance(mode, str) or mode not in QUERY_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode, expected one of {', '.join(QUERY_MODES)}")
+    if not isinstance(params, dict):
+        raise HTTPException(status_code=400, detail="Parameters must be an object")
+    required = QUERY_TOOLS[tool_name][0]
+    missing = [name for name in required if not str(params.get(name, "")).strip()]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing parameters: {', '.join(missing)}")
+    return {name: str(params[name]).strip() for name in required}
+
+@app.post("/query/{tool_name}")
+async def handle_query(tool_name: str, params: Dict[str, Any], mode: str = "direct", raw: bool = False):
+    """Handle queries for specific tools.
+
+    The default direct mode calls the MCP tool with the structured params and
+    renders its output as markdown (or returns it untouched with raw=true).
+    mode=summarize runs the same tool call first and has the LLM format its
+    output in a single call; mode=explain sends the equivalent question
+    through the ReAct agent, which needs at least two sequential LLM calls.
+    LLM answers are cached per model and prompt version.
+    """
+    args = validate_query(tool_name, params, mode)
+    started = time.perf_counter()
+    if mode != "direct":
+        response = await answer_with_llm(tool_name, args, mode)
+    else:
+        output = await call_tool(tool_name, args)
+        response = output if raw else render_markdown(output)
+    return {"response": response, "mode": mode, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+def tool_output(output: Any) -> str:
+    """Text of a tool result, whether a string, a list of parts or a ToolMessage."""
+    output = getattr(output, "content", output)
+    if isinstance(output, list):
+        output = "\n".join(part if isinstance(part, str) else str(part) for part in output)
+    return str(output)
+
+class AnswerStream:
+    """The events of one LLM answer so far, replayed to every client streaming the same query."""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.flight: Optional[asyncio.Future] = None
+        self._updated = asyncio.Event()
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every event published so far, then new ones until the answer is finished."""
+        sent = 0
+        while True:
+            while sent < len(self.events):
+                yield self.events[sent]
+                sent += 1
+            if self.flight.done():
+                return
+            updated = asyncio.ensure_future(self._updated.wait())
+            try:
+                await asyncio.wait([self.flight, updated], return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                updated.cancel()
+
+# Streamed answers in flight, by answer key
+answer_streams: Dict[str, AnswerStream] = {}
+
+async def answer_events(tool_name: str, args: Dict[str, str], mode: str) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the events of answering a query with the LLM: tool calls, tool results and tokens."""
+    question = QUERY_TOOLS[tool_name][1].format(**args)
+    if mode == "summarize":
+        if llm is None:
+            raise HTTPException(status_code=503, detail="Summarize mode needs GROQ_API_KEY; use direct mode instead")
+        calls = [(tool_name, args)]
+        yield {"type": "tool_start", "tool": tool_name, "input": args}
+        results = await run_tools(tools_by_name, calls)
+        yield {"type": "tool_result", "tool": tool_name, "content": render_markdown(results[0])}
+        async for chunk in llm.astream(summary_messages(question, calls, results)):
+            if chunk.content:
+                yield {"type": "token", "content": chunk.content}
+    else:
+        if not agent:
+            raise HTTPException(status_code=503, detail="Explain mode needs GROQ_API_KEY; use direct mode instead")
+        async for event in agent.astream_events({"messages": question}, version="v2"):
+            kind = event["event"]
+            if kind == "on_tool_start":
+                yield {"type": "tool_start", "tool": event["name"], "input": event["data"].get("input")}
+            elif kind == "on_tool_end":
+                output = tool_output(event["data"].get("output"))
+                yield {"type": "tool_result", "tool": event["name"], "content": render_markdown(output)}
+            elif kind == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                if content:
+                    yield {"type": "token", "content": content}
+
+async def publish_answer(key: str, tool_name: str, args: Dict[str, str], mode: str, stream: AnswerStream) -> str:
+    """Generate an answer into a shared stream, cache it and return it."""
+    parts: List[str] = []
+    try:
+        async for event in answer_events(tool_name, args, mode):
+            if event["type"] == "tool_start":
+                # Text streamed before a tool call is reasoning, not the answer
+                parts.clear()
+            elif event["type"] == "token":
+                parts.append(event["content"])
+            stream.publish(event)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
+    answer = "".join(parts)
+    if answer:
+        await answer_cache.aset(key, answer)
+    return answer
+
+def _finish_stream(key: str, stream: AnswerStream) -> None:
+    if answer_streams.get(key) is stream:
+        del answer_streams[key]
+    # Mark the exception as retrieved when every subscriber has gone
+    if not stream.flight.cancelled():
+        stream.flight.exception()
+
+async def stream_answer(tool_name: str, args: Dict[str, str], mode: str) -> AsyncIterator[Dict[str, Any]]:
+    """Yield a query's events as they happen: tool calls, tool results and LLM tokens.
+
+    Complete answers are stored in the answer cache like those of
+    /query/{tool_name}, and cached answers are sent as a single token event.
+    Identical queries in flight share one LLM run through answer_flight; a
+    client joining late first gets the events it missed.
+    """
+    if mode == "direct":
+        yield {"type": "tool_start", "tool": tool_name, "input": args}
+        yield {"type": "tool_result", "tool": tool_name, "content": render_markdown(await call_tool(tool_name, args))}
+        return
+
+    key = answer_key(tool_name, mode, args)
+    cached = await answer_cache.aget(key)
+    if cached is not None:
+        yield {"type": "token", "content": cached, "cached": True}
+        return
+
+    stream = answer_streams.get(key)
+    if stream is None:
+        stream = answer_streams[key] = AnswerStream()
+        # The run outlives any one client, so a disconnect does not cut the answer short for the others
+        stream.flight = asyncio.ensure_future(
+            answer_flight.do(key, lambda: publish_answer(key, tool_name, args, mode, stream))
+        )
+        stream.flight.add_done_callback(lambda _: _finish_stream(key, stream))
+
+    async for event in stream.follow():
+        yield event
+    answer = await asyncio.shield(stream.flight)
+    if answer and not stream.events:
+        # A non-streaming request for the same query was already running; its answer arrives whole
+        yield {"type": "token", "content": answer}
+
+@app.websocket("/ws/query")
+async def stream_query(websocket: WebSocket):
+    """Stream queries over a WebSocket.
+
+    The client sends {"tool": ..., "params": {...}, "mode": ...} and gets back
+    the events of stream_answer as JSON, ending with "done" (with timings) or
+    "error". One connection can run any number of queries in turn.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                request = json.loads(message)
+            except ValueError:
+                await websocket.send_json({"type": "error", "message": "Invalid JSON"})
+                continue
+            if not isinstance(request, dict):
+                await websocket.send_json({"type": "error", "message": "Expected a JSON object"})
+                continue
+            tool_name, mode = request.get("tool", ""), request.get("mode", "direct")
+            started = time.perf_counter()
+            first_content_ms = None
+            try:
+                args = validate_query(tool_name, request.get("params") or {}, mode)
+                async for event in stream_answer(tool_name, args, mode):
+                    if first_content_ms is None and event["type"] in ("tool_result", "token"):
+                        first_content_ms = round((time.perf_counter() - started) * 1000, 1)
+                    await websocket.send_json(event)
+            except HTTPException as e:
+                await websocket.send_json({"type": "error", "message": e.detail})
+                continue
+            await websocket.send_json({
+                "type": "done",
+                "mode": mode,
+                "first_content_ms": first_content_ms,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            })
+    except WebSocketDisconnect:
+        pass
 
 @app.get("/", response_class=HTMLResponse)
 async def get_home():
@@ -176,6 +498,25 @@ async def get_home():
                 font-size: 1.1em;
             }
 
+            .mode-toggle {
+                display: inline-flex;
+                align-items: center;
+                gap: 8px;
+                margin-top: 15px;
+                font-weight: 400;
+                cursor: pointer;
+            }
+
+            .mode-toggle input {
+                width: auto;
+            }
+
+            .timing {
+                color: #888;
+                font-size: 0.85em;
+                margin-top: 20px;
+            }
+
             .tools-grid {
                 display: flex;
                 flex-direction: column;
@@ -326,6 +667,19 @@ async def get_home():
                 padding: 20px;
             }
 
+            .tool-output {
+                margin-bottom: 15px;
+                padding: 10px 15px;
+                border: 1px solid var(--border-color);
+                border-radius: 8px;
+                background: var(--background-color);
+            }
+
+            .tool-output summary {
+                cursor: pointer;
+                font-weight: 500;
+            }
+
             .loading {
                 display: none;
                 text-align: center;
@@ -392,6 +746,10 @@ async def get_home():
             <header>
                 <h1>Pokemon MCP Interface</h1>
                 <p class="subtitle">Your Pokemon assistant</p>
+                <label class="mode-toggle">
+                    <input type="checkbox" id="explain-mode">
+                    Explain with AI (slower, needs GROQ_API_KEY)
+                </label>
             </header>
 
             <div class="tools-grid">
@@ -449,28 +807,126 @@ async def get_home():
 
         <script src="https://cdn.jsdelivr.net/npm/marked/marked.min.js"></script>
         <script>
+            async function fetchRequest(endpoint, params, mode) {
+                const result = await fetch(`/query/${endpoint}?mode=${mode}`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(params)
+                });
+                if (!result.ok) {
+                    const detail = await result.json().then(body => body.detail, () => null);
+                    throw new Error(detail || `HTTP error! status: ${result.status}`);
+                }
+                return result.json();
+            }
+
+            function streamRequest(endpoint, params, mode, onEvent) {
+                // Resolves with the final "done" event; rejects with opened=false if no WebSocket could be opened
+                return new Promise((resolve, reject) => {
+                    const protocol = location.protocol === 'https:' ? 'wss' : 'ws';
+                    const socket = new WebSocket(`${protocol}://${location.host}/ws/query`);
+                    let opened = false;
+                    let finished = false;
+                    socket.onopen = () => {
+                        opened = true;
+                        socket.send(JSON.stringify({ tool: endpoint, params, mode }));
+                    };
+                    socket.onmessage = (message) => {
+                        const event = JSON.parse(message.data);
+                        if (event.type === 'done' || event.type === 'error') {
+                            finished = true;
+                            socket.close();
+                            if (event.type === 'done') {
+                                resolve(event);
+                            } else {
+                                reject(Object.assign(new Error(event.message), { opened }));
+                            }
+                        } else {
+                            onEvent(event);
+                        }
+                    };
+                    socket.onclose = () => {
+                        if (!finished) {
+                            reject(Object.assign(new Error('Connection closed before the answer finished'), { opened }));
+                        }
+                    };
+                });
+            }
+
             async function makeRequest(endpoint, params, loadingId, responseId, errorId) {
                 const loading = document.getElementById(loadingId);
                 const response = document.getElementById(responseId);
                 const error = document.getElementById(errorId);
+                const mode = document.getElementById('explain-mode').checked ? 'summarize' : 'direct';
+                // Tool calls in order, and the LLM answer streamed so far
+                const state = { tools: [], answer: '', timing: '' };
+                let pending = false;
+
+                function render() {
+                    pending = false;
+                    let html = '';
+                    for (const tool of state.tools) {
+                        const body = tool.content === null ? '<p class="timing">Running...</p>' : marked.parse(tool.content);
+                        if (mode === 'direct') {
+                            html += body;
+                        } else {
+                            // Tool output stays open until the answer starts arriving
+                            html += `<details class="tool-output"${state.answer ? '' : ' open'}><summary>Tool: ${tool.name}</summary>${body}</details>`;
+                        }
+                    }
+                    html += marked.parse(state.answer);
+                    if (state.timing) {
+                        html += `<p class="timing">${state.timing}</p>`;
+                    }
+                    response.innerHTML = html;
+                }
+
+                function update() {
+                    if (!pending) {
+                        pending = true;
+                        requestAnimationFrame(render);
+                    }
+                }
+
+                function onEvent(event) {
+                    if (event.type === 'tool_start') {
+                        state.answer = '';
+                        state.tools.push({ name: event.tool, content: null });
+                    } else if (event.type === 'tool_result') {
+                        const tool = state.tools.find(t => t.name === event.tool && t.content === null);
+                        if (tool) {
+                            tool.content = event.content;
+                        } else {
+                            state.tools.push({ name: event.tool, content: event.content });
+                        }
+                        loading.style.display = 'none';
+                    } else if (event.type === 'token') {
+                        state.answer += event.content;
+                        loading.style.display = 'none';
+                    }
+                    update();
+                }
                 
                 try {
                     loading.style.display = 'inline';
                     response.textContent = '';
                     error.style.display = 'none';
-                    
-                    const result = await fetch(`/query/${endpoint}`, {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify(params)
-                    });
-                    
-                    if (!result.ok) {
-                        throw new Error(`HTTP error! status: ${result.status}`);
+
+                    let done;
+                    try {
+                        done = await streamRequest(endpoint, params, mode, onEvent);
+                        state.timing = `${done.mode} mode, first content in ${done.first_content_ms} ms, done in ${done.elapsed_ms} ms`;
+                    } catch (streamError) {
+                        if (streamError.opened) {
+                            throw streamError;
+                        }
+                        // No WebSocket (e.g. a proxy without upgrade support): fall back to one request
+                        const data = await fetchRequest(endpoint, params, mode);
+                        state.tools = [];
+                        state.answer = data.response;
+                        state.timing = `${data.mode} mode, ${data.elapsed_ms} ms`;
                     }
-                    
-                    const data = await result.json();
-                    response.innerHTML = marked.parse(data.response);
+                    update();
                 } catch (error) {
                     const errorElement = document.getElementById(errorId);
                     errorElement.textContent = 'Error: ' + error.message;